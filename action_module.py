@@ -15,6 +15,7 @@ from .constants import (
     REDUCED_WAYPOINT_GENERATION_ACTION_NAME,
     REVERSAL_ACTION_NAME,
     COVERAGE_LINES_ACTION_NAME,
+    COVERAGE_ANALYSIS_ACTION_NAME,
     FLOWLINE_ACTION_NAME,
     CUT_FLOWLINE_ACTION_NAME,
     RACETRACK_ACTION_NAME,
@@ -44,6 +45,7 @@ class ActionModule:
             QgsWkbTypes.GeometryType.LineGeometry,
         ],
         COVERAGE_LINES_ACTION_NAME: [QgsWkbTypes.GeometryType.PolygonGeometry],
+        COVERAGE_ANALYSIS_ACTION_NAME: [QgsWkbTypes.GeometryType.PolygonGeometry],
         FLOWLINE_ACTION_NAME: [
             QgsWkbTypes.GeometryType.PointGeometry,
             QgsWkbTypes.GeometryType.LineGeometry,
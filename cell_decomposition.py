@@ -0,0 +1,188 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from .coverage_geometry import expand_ranges
+from .line_ordering import LineGrid
+
+
+def slice_intervals(
+        rings: List[np.ndarray],
+        origin: np.ndarray,
+        direction: np.ndarray,
+        normal: np.ndarray,
+        offsets: np.ndarray,
+) -> List[np.ndarray]:
+    """Returns the parts of the parallel lines inside the polygon, given by its rings as (n, 2) arrays of vertices,
+    as (m, 2) array of start and end positions along direction per line. The lines run along the unit vector direction
+    through origin + normal * offset for the sorted offsets.
+
+    All lines are intersected in one sweep over the edges: every edge crosses the lines whose offset lies in its
+    half-open range across the lines, which gives an even number of crossings per line for closed rings."""
+    offsets = np.asarray(offsets, dtype=np.float64)
+    rings = [np.asarray(ring, dtype=np.float64).reshape(-1, 2) for ring in rings]
+    edge_starts = np.concatenate(rings)
+    edge_ends = np.concatenate([np.roll(ring, -1, axis=0) for ring in rings])
+
+    origin = np.asarray(origin, dtype=np.float64)
+    axes = np.column_stack((direction, normal)).astype(np.float64)
+    u_start, v_start = ((edge_starts - origin) @ axes).T
+    u_end, v_end = ((edge_ends - origin) @ axes).T
+
+    owners, line_ids = expand_ranges(
+        np.searchsorted(offsets, np.minimum(v_start, v_end), side="left"),
+        np.searchsorted(offsets, np.maximum(v_start, v_end), side="left"),
+    )
+    t = (offsets[line_ids] - v_start[owners]) / (v_end[owners] - v_start[owners])
+    crossings = u_start[owners] + t * (u_end[owners] - u_start[owners])
+
+    sorting = np.lexsort((crossings, line_ids))
+    crossings = crossings[sorting]
+    counts = np.bincount(line_ids, minlength=len(offsets))
+    return [part.reshape(-1, 2) for part in np.split(crossings, np.cumsum(counts)[:-1])]
+
+
+def merge_intervals(intervals: np.ndarray, min_gap: float = 0) -> np.ndarray:
+    """Returns the union of the intervals given as (m, 2) array, intervals closer than min_gap are joined"""
+    if len(intervals) == 0:
+        return intervals.reshape(0, 2)
+    intervals = intervals[np.argsort(intervals[:, 0])]
+    ends = np.maximum.accumulate(intervals[:, 1])
+    # a new interval starts where the gap to everything before it is large enough
+    new_start = np.concatenate(([True], intervals[1:, 0] - ends[:-1] > min_gap))
+    starts = np.flatnonzero(new_start)
+    return np.column_stack((intervals[starts, 0], ends[np.concatenate((starts[1:] - 1, [len(intervals) - 1]))]))
+
+
+def swath_intervals(
+        rings: List[np.ndarray],
+        origin: np.ndarray,
+        direction: np.ndarray,
+        normal: np.ndarray,
+        offsets: np.ndarray,
+        half_width: float,
+        min_gap: float = 0,
+) -> List[np.ndarray]:
+    """Returns the parts of the parallel lines to fly per line, like slice_intervals, but for the polygon as seen by
+    the swath: the parts of the line and of both swath borders are united, so voids narrower than the swath don't
+    split a line"""
+    offsets = np.asarray(offsets, dtype=np.float64)
+    slices = [
+        slice_intervals(rings, origin, direction, normal, offsets + shift)
+        for shift in (-half_width, 0, half_width)
+    ]
+    return [merge_intervals(np.concatenate(parts), min_gap) for parts in zip(*slices)]
+
+
+def boustrophedon_cells(intervals: List[np.ndarray]) -> List[np.ndarray]:
+    """Decomposes the polygon, given by the intervals inside of it per line as returned by slice_intervals, into
+    cells which every line crosses at most once. A cell continues from one line to the next as long as its interval
+    overlaps exactly one interval of the next line, which overlaps no other interval. At every split, merge, start or
+    end of a part of the polygon the cells involved are closed and new ones are started. Returns the cells as (m, 3)
+    arrays of line index, start and end position of its consecutive lines."""
+    cells = []
+    # cell of every interval of the previous line
+    open_cells = []
+    previous = np.zeros((0, 2))
+    for line_id, current in enumerate(intervals):
+        overlaps = (previous[:, None, 0] <= current[None, :, 1]) & (current[None, :, 0] <= previous[:, None, 1])
+        previous_degree = overlaps.sum(axis=1)
+        current_degree = overlaps.sum(axis=0)
+
+        current_cells = []
+        for i, (start, end) in enumerate(current):
+            predecessors = np.flatnonzero(overlaps[:, i])
+            if current_degree[i] == 1 and previous_degree[predecessors[0]] == 1:
+                cell = open_cells[predecessors[0]]
+            else:
+                cell = len(cells)
+                cells.append([])
+            cells[cell].append((line_id, start, end))
+            current_cells.append(cell)
+
+        open_cells = current_cells
+        previous = current
+    return [np.array(cell) for cell in cells]
+
+
+def cell_path_variants(path: np.ndarray) -> List[np.ndarray]:
+    """Returns the four ways to fly the legs of a path given by their start and end waypoints as (2n, 2) array: as is,
+    with every leg in the opposite direction, and both in reverse order"""
+    flipped = path.reshape(-1, 2, 2)[:, ::-1].reshape(-1, 2)
+    return [path, flipped, path[::-1], flipped[::-1]]
+
+
+def chain_paths(paths: List[np.ndarray]) -> np.ndarray:
+    """Chains the waypoint paths of the cells into one path with short connections. Every path can be flown in any
+    of its four variants, the paths are chained greedily by always flying to the closest entry of a remaining path,
+    starting from every variant of the first and last path in sweep order."""
+    if not paths:
+        return np.zeros((0, 2))
+    variants = [cell_path_variants(path) for path in paths]
+    # entry and exit point of every variant, (number of paths, 4, 2)
+    entries = np.array([[variant[0] for variant in path_variants] for path_variants in variants])
+    exits = np.array([[variant[-1] for variant in path_variants] for path_variants in variants])
+
+    best_chain, best_length = None, np.inf
+    for first_path in {0, len(paths) - 1}:
+        for first_variant in range(4):
+            visited = np.zeros(len(paths), dtype=bool)
+            chain = [(first_path, first_variant)]
+            visited[first_path] = True
+            length = 0.0
+            position = exits[first_path, first_variant]
+            for _ in range(len(paths) - 1):
+                distances = np.hypot(*(entries - position).T).T
+                distances[visited] = np.inf
+                path_id, variant = np.unravel_index(np.argmin(distances), distances.shape)
+                length += distances[path_id, variant]
+                chain.append((path_id, variant))
+                visited[path_id] = True
+                position = exits[path_id, variant]
+            if length < best_length:
+                best_chain, best_length = chain, length
+    return np.concatenate([variants[path_id][variant] for path_id, variant in best_chain])
+
+
+def cell_grids(
+        rings: List[np.ndarray],
+        origin: np.ndarray,
+        direction: np.ndarray,
+        normal: np.ndarray,
+        offsets: np.ndarray,
+        half_width: float,
+        margin: float = 0,
+) -> List[LineGrid]:
+    """Returns the legs of the boustrophedon cells of the polygon, one grid per cell. The parallel lines are given as
+    for slice_intervals, every leg covers one part of a line as seen by its swath, extended by the lead-in and run-out
+    margin. Parts closer than twice the margin are flown as one leg."""
+    offsets = np.asarray(offsets, dtype=np.float64)
+    origin = np.asarray(origin, dtype=np.float64)
+    direction = np.asarray(direction, dtype=np.float64)
+    normal = np.asarray(normal, dtype=np.float64)
+    intervals = swath_intervals(rings, origin, direction, normal, offsets, half_width, 2 * margin)
+
+    grids = []
+    for cell in boustrophedon_cells(intervals):
+        line_ids = cell[:, 0].astype(int)
+        bases = origin + np.outer(offsets[line_ids], normal)
+        grids.append(LineGrid(
+            bases + np.outer(cell[:, 1] - margin, direction),
+            bases + np.outer(cell[:, 2] + margin, direction),
+        ))
+    return grids
+
+
+def merge_grids(grids: List[LineGrid]) -> Tuple[LineGrid, List[np.ndarray]]:
+    """Returns the legs of all cells as one grid and the indices of the legs of every cell into it"""
+    counts = [len(grid) for grid in grids]
+    merged = LineGrid(
+        np.concatenate([grid.starts for grid in grids] + [np.zeros((0, 2))]),
+        np.concatenate([grid.ends for grid in grids] + [np.zeros((0, 2))]),
+    )
+    return merged, np.split(np.arange(sum(counts)), np.cumsum(counts)[:-1])
+
+
+def boustrophedon_path(grids: List[LineGrid]) -> np.ndarray:
+    """Returns the waypoints of the cells flown one after another, every cell back and forth along its legs"""
+    return chain_paths([grid.waypoints(np.arange(len(grid))) for grid in grids])
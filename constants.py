@@ -35,6 +35,10 @@ PLUGIN_SENSOR_SETTINGS_PATH = "science_flight_planner/sensors"
 PLUGIN_OVERLAP_SETTINGS_PATH = "science_flight_planner/overlap"
 PLUGIN_OVERLAP_ROTATION_SETTINGS_PATH = "science_flight_planner/overlap_rotation"
 PLUGIN_MAX_TURN_DISTANCE_SETTINGS_PATH = "science_flight_planner/max_turn_distance"
+PLUGIN_DEM_CACHE_SIZE_SETTINGS_PATH = "science_flight_planner/dem_cache_size"
+PLUGIN_COVERAGE_MODE_SETTINGS_PATH = "science_flight_planner/coverage_mode"
+PLUGIN_LINE_MARGIN_SETTINGS_PATH = "science_flight_planner/line_margin"
+PLUGIN_CELL_DECOMPOSITION_SETTINGS_PATH = "science_flight_planner/cell_decomposition"
 
 PLUGIN_TOOLBAR_NAME = "ScienceFlightPlanner Toolbar"
 
@@ -56,6 +60,12 @@ QGIS_FIELD_NAME_ID = "id"
 
 QGIS_FIELD_NAME_SIG = "sig"
 
+# id of the path feature a sensor coverage polygon was computed from
+QGIS_FIELD_NAME_SOURCE_FID = "source_fid"
+
+# lowest flyable altitude above mean sea level of a waypoint, computed from the topography profile
+QGIS_FIELD_NAME_ALTITUDE = "alt_msl"
+
 TAGS = [
     "FLYOVER",
     "FLYBY",
@@ -79,6 +89,7 @@ REDUCED_WAYPOINT_SELECTION_ACTION_NAME = "Mark Selected Waypoints as Significant
 REDUCED_WAYPOINT_GENERATION_ACTION_NAME = "Generate Reduced Flightplan from Significant Waypoints"
 REVERSAL_ACTION_NAME = "Reverse Waypoints"
 COVERAGE_LINES_ACTION_NAME = "Compute Optimal Coverage Lines"
+COVERAGE_ANALYSIS_ACTION_NAME = "Analyze Sensor Coverage"
 FLOWLINE_ACTION_NAME = "Get flowline from file"
 CUT_FLOWLINE_ACTION_NAME = "Cut flowline"
 RACETRACK_ACTION_NAME = "Create racetrack for polygon"
@@ -91,6 +102,7 @@ MAX_CLIMB_RATE_ACTION_NAME = "Set Maximum Climb Rate"
 SENSOR_COMBOBOX_DEFAULT_VALUE = "No sensor"
 FIRST_ALGO_NAME = "Meander"
 SECOND_ALGO_NAME = "Racetrack"
+THIRD_ALGO_NAME = "Shortest transit"
 
 
 def create_html_str_for_action_dict():
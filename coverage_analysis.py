@@ -0,0 +1,113 @@
+from typing import Dict, List, NamedTuple, Union
+
+from qgis.core import QgsFeedback, QgsGeometry, QgsSpatialIndex, QgsWkbTypes
+
+
+class CoverageStatistics(NamedTuple):
+    target_area: float
+    covered_area: float
+    # area inside the target covered by at least two swaths
+    double_covered_area: float
+    gaps: List[QgsGeometry]
+
+    @property
+    def covered_percentage(self) -> float:
+        if self.target_area <= 0:
+            return 0.0
+        return 100 * self.covered_area / self.target_area
+
+    @property
+    def gap_area(self) -> float:
+        return sum(gap.area() for gap in self.gaps)
+
+
+class SwathIndex:
+    """Spatial index over coverage swaths, built once and queried for every target polygon"""
+
+    def __init__(self, swaths: List[QgsGeometry]):
+        self.swaths = swaths
+        self.index = QgsSpatialIndex()
+        for swath_id, swath in enumerate(swaths):
+            if not swath.isEmpty():
+                self.index.addFeature(swath_id, swath.boundingBox())
+
+    def candidates(self, geometry: QgsGeometry) -> List[int]:
+        """Returns the ids of the swaths whose bounding box intersects the one of the geometry"""
+        return self.index.intersects(geometry.boundingBox())
+
+
+def clip_swaths(target: QgsGeometry, swath_index: SwathIndex) -> Dict[int, QgsGeometry]:
+    """Returns the parts of the swaths inside the target polygon by swath id. The target is prepared once, so
+    swaths completely inside or outside of it are resolved without computing an intersection."""
+    engine = QgsGeometry.createGeometryEngine(target.constGet())
+    engine.prepareGeometry()
+
+    clipped = {}
+    for swath_id in swath_index.candidates(target):
+        swath = swath_index.swaths[swath_id]
+        if not engine.intersects(swath.constGet()):
+            continue
+        part = swath if engine.contains(swath.constGet()) else swath.intersection(target)
+        if not part.isEmpty() and part.area() > 0:
+            clipped[swath_id] = part
+    return clipped
+
+
+def double_covered_geometry(clipped: Dict[int, QgsGeometry]) -> QgsGeometry:
+    """Returns the union of the pairwise intersections of the clipped swaths, i.e. the area covered at least
+    twice. Only pairs with intersecting bounding boxes are tested."""
+    swath_ids = list(clipped)
+    swath_index = SwathIndex([clipped[swath_id] for swath_id in swath_ids])
+
+    overlaps = []
+    for i, swath in enumerate(swath_index.swaths):
+        neighbours = [j for j in swath_index.candidates(swath) if j > i]
+        if not neighbours:
+            continue
+        engine = QgsGeometry.createGeometryEngine(swath.constGet())
+        engine.prepareGeometry()
+        for j in neighbours:
+            other = swath_index.swaths[j]
+            if not engine.intersects(other.constGet()):
+                continue
+            overlap = swath.intersection(other)
+            if overlap.type() == QgsWkbTypes.GeometryType.PolygonGeometry and overlap.area() > 0:
+                overlaps.append(overlap)
+
+    if not overlaps:
+        return QgsGeometry()
+    return QgsGeometry.unaryUnion(overlaps)
+
+
+def analyze_coverage(
+        target: QgsGeometry,
+        swath_index: SwathIndex,
+        feedback: Union[QgsFeedback, None] = None,
+) -> Union[CoverageStatistics, None]:
+    """Computes the covered and double covered area of the target polygon and its gaps. All geometries must be
+    given in the same projected CRS, areas are in its map units. Returns None if the feedback was canceled."""
+    clipped = clip_swaths(target, swath_index)
+    if feedback is not None and feedback.isCanceled():
+        return None
+
+    if clipped:
+        covered = QgsGeometry.unaryUnion(list(clipped.values()))
+        covered_area = covered.area()
+        gap_geometry = target.difference(covered)
+    else:
+        covered_area = 0.0
+        gap_geometry = QgsGeometry(target)
+    if feedback is not None and feedback.isCanceled():
+        return None
+
+    double_covered = double_covered_geometry(clipped)
+    gaps = [
+        gap for gap in gap_geometry.asGeometryCollection()
+        if gap.type() == QgsWkbTypes.GeometryType.PolygonGeometry and gap.area() > 0
+    ]
+    return CoverageStatistics(
+        target.area(),
+        covered_area,
+        0.0 if double_covered.isEmpty() else double_covered.area(),
+        gaps,
+    )
@@ -0,0 +1,273 @@
+from functools import partial
+from typing import List, Tuple
+
+from qgis.core import (
+    Qgis,
+    QgsApplication,
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransformContext,
+    QgsFeature,
+    QgsFeedback,
+    QgsField,
+    QgsGeometry,
+    QgsMapLayer,
+    QgsProject,
+    QgsTask,
+    QgsUnitTypes,
+    QgsVectorLayer,
+    QgsWkbTypes,
+)
+from qgis.gui import QgisInterface, QgsCheckableComboBox
+from qgis.PyQt.QtCore import QVariant
+from qgis.PyQt.QtWidgets import QDialog, QFormLayout, QHBoxLayout, QPushButton
+
+from .constants import DEFAULT_PUSH_MESSAGE_DURATION, QGIS_FIELD_NAME_SOURCE_FID
+from .coverage_analysis import CoverageStatistics, SwathIndex, analyze_coverage
+from .coverage_module import CoverageModule
+from .utils import LayerUtils, get_transform
+
+
+class CoverageAnalysisDialog(QDialog):
+    def __init__(self, target_layer: QgsMapLayer, coverage_layer_ids: List[str], parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Analyze Sensor Coverage")
+        self.setModal(True)
+
+        form_layout = QFormLayout(self)
+
+        # the coverage layers of the plugin are checked by default, any other polygon layer can be added
+        self.coverage_layers_combo = QgsCheckableComboBox()
+        for layer in QgsProject.instance().mapLayers().values():
+            if (
+                layer.type() == QgsMapLayer.VectorLayer
+                and layer.geometryType() == QgsWkbTypes.GeometryType.PolygonGeometry
+                and layer.id() != target_layer.id()
+            ):
+                self.coverage_layers_combo.addItem(layer.name(), layer.id())
+        self.coverage_layers_combo.setCheckedItems(
+            [
+                self.coverage_layers_combo.itemText(index)
+                for index in range(self.coverage_layers_combo.count())
+                if self.coverage_layers_combo.itemData(index) in coverage_layer_ids
+            ]
+        )
+        form_layout.addRow("Coverage layers:", self.coverage_layers_combo)
+
+        h_layout = QHBoxLayout()
+        self.ok_button = QPushButton("OK")
+        self.ok_button.clicked.connect(self.accept)
+        self.ok_button.setDefault(True)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.reject)
+        h_layout.addWidget(self.ok_button)
+        h_layout.addWidget(self.cancel_button)
+        form_layout.addRow(h_layout)
+
+    def get_coverage_layers(self) -> List[QgsVectorLayer]:
+        """Returns the checked coverage layers"""
+        layers = []
+        for layer_id in self.coverage_layers_combo.checkedItemsData():
+            layer = QgsProject.instance().mapLayer(layer_id)
+            if layer is not None:
+                layers.append(layer)
+        return layers
+
+
+class CoverageAnalysisTask(QgsTask):
+    """Compares the swaths of coverage layers with target polygons in the background. All geometries are
+    transformed into the coverage CRS, the swaths are indexed once and clipped against every prepared target."""
+
+    def __init__(
+        self,
+        targets: List[Tuple[int, QgsGeometry]],
+        target_crs: QgsCoordinateReferenceSystem,
+        swath_layers: List[Tuple[List[QgsGeometry], QgsCoordinateReferenceSystem]],
+        coverage_crs: QgsCoordinateReferenceSystem,
+        transform_context: QgsCoordinateTransformContext,
+    ):
+        super().__init__("Analyze sensor coverage", QgsTask.CanCancel)
+        self.targets = targets
+        self.target_crs = target_crs
+        self.swath_layers = swath_layers
+        self.coverage_crs = coverage_crs
+        self.transform_context = transform_context
+        # target feature id and statistics
+        self.results: List[Tuple[int, CoverageStatistics]] = []
+        self.feedback = QgsFeedback()
+
+    def cancel(self):
+        self.feedback.cancel()
+        super().cancel()
+
+    def run(self) -> bool:
+        swaths = []
+        for geometries, crs in self.swath_layers:
+            transform = get_transform(crs, self.coverage_crs, self.transform_context)
+            for geometry in geometries:
+                geometry = QgsGeometry(geometry)
+                geometry.transform(transform)
+                swaths.append(geometry)
+            if self.isCanceled():
+                return False
+        swath_index = SwathIndex(swaths)
+
+        transform = get_transform(self.target_crs, self.coverage_crs, self.transform_context)
+        for i, (feature_id, target) in enumerate(self.targets):
+            target = QgsGeometry(target)
+            target.transform(transform)
+            statistics = analyze_coverage(target, swath_index, self.feedback)
+            if statistics is None:
+                return False
+            self.results.append((feature_id, statistics))
+            self.setProgress(100 * (i + 1) / len(self.targets))
+        return True
+
+
+class CoverageAnalysisModule:
+    iface: QgisInterface
+    layer_utils: LayerUtils
+    coverage_module: CoverageModule
+
+    def __init__(self, iface: QgisInterface, coverage_module: CoverageModule):
+        self.iface = iface
+        self.layer_utils = LayerUtils(iface)
+        self.coverage_module = coverage_module
+        self.analysis_task = None
+
+    def close(self):
+        if self.analysis_task is not None:
+            self.analysis_task.cancel()
+            self.analysis_task = None
+
+    def analyze_coverage_action(self):
+        """Compares the selected (or all) polygons of the selected layer with coverage layers and adds a report
+        table and a layer of the coverage gaps to the project"""
+        target_layer = self.layer_utils.get_valid_selected_layer(
+            [QgsWkbTypes.GeometryType.PolygonGeometry]
+        )
+        if target_layer is None:
+            return
+        coverage_crs = self.coverage_module.get_valid_coverage_crs()
+        if coverage_crs is None:
+            return
+
+        registry = self.coverage_module.coverage_registry
+        dialog = CoverageAnalysisDialog(target_layer, list(registry.path_layers), self.iface.mainWindow())
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        coverage_layers = dialog.get_coverage_layers()
+        if not coverage_layers:
+            self.iface.messageBar().pushMessage(
+                "No coverage layer selected",
+                level=Qgis.MessageLevel.Warning,
+                duration=DEFAULT_PUSH_MESSAGE_DURATION,
+            )
+            return
+
+        target_features = target_layer.selectedFeatures() or list(target_layer.getFeatures())
+        targets = [
+            (feature.id(), QgsGeometry(feature.geometry()))
+            for feature in target_features
+            if feature.hasGeometry()
+        ]
+        if not targets:
+            self.iface.messageBar().pushMessage(
+                "There are no features in the currently selected layer",
+                level=Qgis.Info,
+                duration=DEFAULT_PUSH_MESSAGE_DURATION,
+            )
+            return
+        swath_layers = [
+            ([QgsGeometry(feature.geometry()) for feature in layer.getFeatures() if feature.hasGeometry()], layer.crs())
+            for layer in coverage_layers
+        ]
+
+        if self.analysis_task is not None:
+            self.analysis_task.cancel()
+        task = CoverageAnalysisTask(
+            targets, target_layer.crs(), swath_layers, coverage_crs, QgsProject.instance().transformContext()
+        )
+        task.taskCompleted.connect(partial(self.analysis_completed, task, target_layer.name(), coverage_crs))
+        task.taskTerminated.connect(partial(self.analysis_terminated, task))
+        # the reference to the task is kept, otherwise it is garbage collected before it runs
+        self.analysis_task = task
+        QgsApplication.taskManager().addTask(task)
+
+    def analysis_terminated(self, task: CoverageAnalysisTask):
+        """Reports a canceled or failed analysis"""
+        if task is not self.analysis_task:
+            return
+        self.analysis_task = None
+        self.iface.messageBar().pushMessage(
+            "The coverage analysis was canceled or failed",
+            level=Qgis.MessageLevel.Warning,
+            duration=DEFAULT_PUSH_MESSAGE_DURATION,
+        )
+
+    def analysis_completed(
+        self, task: CoverageAnalysisTask, target_layer_name: str, coverage_crs: QgsCoordinateReferenceSystem
+    ):
+        """Adds the report table and the gap layer of a finished analysis to the project"""
+        if task is not self.analysis_task:
+            return
+        self.analysis_task = None
+
+        # areas are reported in km², the map units of the coverage crs are usually meters
+        square_km_factor = QgsUnitTypes.fromUnitToUnitFactor(
+            coverage_crs.mapUnits(), QgsUnitTypes.DistanceUnit.DistanceKilometers
+        ) ** 2
+
+        report_layer = QgsVectorLayer("None", f"{target_layer_name}_coverage_report", "memory")
+        report_layer.dataProvider().addAttributes([
+            QgsField(QGIS_FIELD_NAME_SOURCE_FID, QVariant.LongLong),
+            QgsField("area_km2", QVariant.Double),
+            QgsField("cov_km2", QVariant.Double),
+            QgsField("cov_pct", QVariant.Double),
+            QgsField("double_km2", QVariant.Double),
+            QgsField("gaps", QVariant.Int),
+            QgsField("gap_km2", QVariant.Double),
+        ])
+        report_layer.updateFields()
+
+        gap_layer = QgsVectorLayer(
+            f"Polygon?crs={coverage_crs.authid()}", f"{target_layer_name}_coverage_gaps", "memory"
+        )
+        gap_layer.dataProvider().addAttributes([
+            QgsField(QGIS_FIELD_NAME_SOURCE_FID, QVariant.LongLong),
+            QgsField("area_km2", QVariant.Double),
+        ])
+        gap_layer.updateFields()
+
+        report_features = []
+        gap_features = []
+        for feature_id, statistics in task.results:
+            report_feature = QgsFeature(report_layer.fields())
+            report_feature.setAttributes([
+                feature_id,
+                statistics.target_area * square_km_factor,
+                statistics.covered_area * square_km_factor,
+                statistics.covered_percentage,
+                statistics.double_covered_area * square_km_factor,
+                len(statistics.gaps),
+                statistics.gap_area * square_km_factor,
+            ])
+            report_features.append(report_feature)
+            for gap in statistics.gaps:
+                gap_feature = QgsFeature(gap_layer.fields())
+                gap_feature.setGeometry(gap)
+                gap_feature.setAttributes([feature_id, gap.area() * square_km_factor])
+                gap_features.append(gap_feature)
+        report_layer.dataProvider().addFeatures(report_features)
+        gap_layer.dataProvider().addFeatures(gap_features)
+
+        QgsProject.instance().addMapLayer(report_layer)
+        QgsProject.instance().addMapLayer(gap_layer)
+
+        target_area = sum(statistics.target_area for _, statistics in task.results)
+        covered_area = sum(statistics.covered_area for _, statistics in task.results)
+        covered_percentage = 100 * covered_area / target_area if target_area > 0 else 0
+        self.iface.messageBar().pushMessage(
+            f"{covered_percentage:.1f}% of {target_layer_name} covered, {len(gap_features)} gaps",
+            level=Qgis.Info,
+            duration=DEFAULT_PUSH_MESSAGE_DURATION,
+        )
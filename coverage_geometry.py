@@ -0,0 +1,164 @@
+from typing import List, Tuple
+
+import numpy as np
+
+
+def segment_rectangles(points: np.ndarray, half_width: float) -> np.ndarray:
+    """Returns the rectangles covered by a sensor along every segment of a line given as (n, 2) array of vertices.
+    Every rectangle is a (4, 2) array of corners: start and end of the segment offset half_width to the right,
+    end and start offset to the left. Zero length segments give degenerate rectangles."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    vectors = np.diff(points, axis=0)
+    lengths = np.hypot(vectors[:, 0], vectors[:, 1])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # perpendicular (clockwise rotated) unit vectors
+        offsets = np.where(
+            lengths[:, None] > 0, np.column_stack((vectors[:, 1], -vectors[:, 0])) / lengths[:, None], 0.0
+        ) * half_width
+
+    rectangles = np.empty((len(vectors), 4, 2))
+    rectangles[:, 0] = points[:-1] + offsets
+    rectangles[:, 1] = points[1:] + offsets
+    rectangles[:, 2] = points[1:] - offsets
+    rectangles[:, 3] = points[:-1] - offsets
+    return rectangles
+
+
+def expand_ranges(first: np.ndarray, last: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Expands the half-open index ranges [first, last) into pairs of range number and index"""
+    counts = np.maximum(last - first, 0)
+    owners = np.repeat(np.arange(len(counts)), counts)
+    indices = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + first[owners]
+    return owners, indices
+
+
+def swath_extents(
+        rings: List[np.ndarray],
+        origin: np.ndarray,
+        direction: np.ndarray,
+        normal: np.ndarray,
+        offsets: np.ndarray,
+        half_width: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns where the swaths of parallel flight lines enter and leave a polygon. The lines run along the unit
+    vector direction through origin + normal * offset for the sorted offsets, every swath reaches half_width to both
+    sides of its line. The polygon is given by its rings as (n, 2) arrays of vertices. Returns the first and last
+    position along direction of the polygon within every swath and a mask of the swaths touching the polygon.
+
+    The polygon is only scanned once: within a swath the extreme positions lie on a vertex or where an edge
+    crosses the swath border, so all of them are collected with index ranges into the sorted offsets."""
+    offsets = np.asarray(offsets, dtype=np.float64)
+    rings = [np.asarray(ring, dtype=np.float64).reshape(-1, 2) for ring in rings]
+    # every vertex starts an edge to the next vertex of its ring
+    vertices = np.concatenate(rings)
+    edge_ends = np.concatenate([np.roll(ring, -1, axis=0) for ring in rings])
+
+    # coordinates along and across the lines
+    origin = np.asarray(origin, dtype=np.float64)
+    axes = np.column_stack((direction, normal)).astype(np.float64)
+    u, v = ((vertices - origin) @ axes).T
+    u_ends, v_ends = ((edge_ends - origin) @ axes).T
+
+    positions = []
+    swath_ids = []
+
+    # vertices inside the swaths
+    owners, indices = expand_ranges(
+        np.searchsorted(offsets, v - half_width, side="left"),
+        np.searchsorted(offsets, v + half_width, side="right"),
+    )
+    positions.append(u[owners])
+    swath_ids.append(indices)
+
+    # edges crossing the lower or upper border of the swaths, edges parallel to the lines are covered by their
+    # vertices
+    crossing = v != v_ends
+    u_start, v_start, u_end, v_end = u[crossing], v[crossing], u_ends[crossing], v_ends[crossing]
+    v_min = np.minimum(v_start, v_end)
+    v_max = np.maximum(v_start, v_end)
+    for border in (offsets - half_width, offsets + half_width):
+        owners, indices = expand_ranges(
+            np.searchsorted(border, v_min, side="left"),
+            np.searchsorted(border, v_max, side="right"),
+        )
+        t = (border[indices] - v_start[owners]) / (v_end[owners] - v_start[owners])
+        positions.append(u_start[owners] + t * (u_end[owners] - u_start[owners]))
+        swath_ids.append(indices)
+
+    positions = np.concatenate(positions)
+    swath_ids = np.concatenate(swath_ids)
+    first = np.full(len(offsets), np.inf)
+    last = np.full(len(offsets), -np.inf)
+    np.minimum.at(first, swath_ids, positions)
+    np.maximum.at(last, swath_ids, positions)
+    return first, last, np.isfinite(first)
+
+
+def line_offsets(width: float, coverage_range: float, line_spacing: float) -> np.ndarray:
+    """Returns the offsets of parallel flight lines covering a strip of the given width. The first line lies half a
+    swath inside the strip, lines are added as long as their swath still reaches into it."""
+    number_of_lines = int(np.floor((width + 2 * coverage_range) / line_spacing))
+    return line_spacing * np.arange(1, number_of_lines + 1) - coverage_range
+
+
+def sweep_frame(vertices: np.ndarray, heading: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+    """Returns the bounding box of the vertices aligned to the heading (in radians, counterclockwise from the x axis)
+    as the start and end point of its first side along the heading, the unit normal pointing into the box and the
+    width of the box along the normal"""
+    direction = np.array([np.cos(heading), np.sin(heading)])
+    normal = np.array([-np.sin(heading), np.cos(heading)])
+    u = vertices @ direction
+    v = vertices @ normal
+    point_start = direction * u.min() + normal * v.min()
+    point_end = direction * u.max() + normal * v.min()
+    return point_start, point_end, normal, float(v.max() - v.min())
+
+
+def sweep_heading_costs(
+        rings: List[np.ndarray],
+        headings: np.ndarray,
+        coverage_range: float,
+        line_spacing: float,
+        margin: float = 0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Evaluates covering a polygon, given by its rings, with parallel lines along each of the headings. The lines
+    are clipped to the polygon as seen by their swath and extended by the margin, then flown back and forth in order.
+    Returns the number of lines, the length flown on the lines and the transit length between them per heading."""
+    rings = [np.asarray(ring, dtype=np.float64).reshape(-1, 2) for ring in rings]
+    # centered coordinates keep the projections precise for large projected coordinates
+    center = np.concatenate(rings).mean(axis=0)
+    rings = [ring - center for ring in rings]
+    vertices = np.concatenate(rings)
+
+    number_of_lines = np.zeros(len(headings), dtype=int)
+    line_length = np.zeros(len(headings))
+    transit_length = np.zeros(len(headings))
+    for i, heading in enumerate(headings):
+        point_start, point_end, normal, width = sweep_frame(vertices, heading)
+        offsets = line_offsets(width, coverage_range, line_spacing)
+        direction = np.array([np.cos(heading), np.sin(heading)])
+        first, last, touched = swath_extents(rings, point_start, direction, normal, offsets, coverage_range)
+        offsets, first, last = offsets[touched], first[touched] - margin, last[touched] + margin
+
+        number_of_lines[i] = len(offsets)
+        line_length[i] = np.sum(last - first)
+        # even lines are flown forward and left at their last position, odd lines backward
+        forward = np.arange(len(offsets) - 1) % 2 == 0
+        turn_start = np.where(forward, last[:-1], first[:-1])
+        turn_end = np.where(forward, last[1:], first[1:])
+        transit_length[i] = np.sum(np.hypot(np.diff(offsets), turn_end - turn_start))
+    return number_of_lines, line_length, transit_length
+
+
+def optimal_sweep_heading(
+        rings: List[np.ndarray],
+        coverage_range: float,
+        line_spacing: float,
+        margin: float = 0,
+        heading_step: float = np.radians(1),
+) -> float:
+    """Returns the heading (in radians within [0, pi)) of the parallel lines covering the polygon with the shortest
+    total flight distance, i.e. the minimum flight time at constant speed"""
+    headings = np.arange(0, np.pi, heading_step)
+    _, line_length, transit_length = sweep_heading_costs(rings, headings, coverage_range, line_spacing, margin)
+    return float(headings[np.argmin(line_length + transit_length)])
@@ -1,14 +1,20 @@
+import ast
 import math
-from typing import Dict, Union
+from functools import partial
+from typing import Dict, Iterable, List, Tuple, Union
+
+import numpy as np
 
 from qgis.core import (
     Qgis,
+    QgsApplication,
     QgsCoordinateReferenceSystem,
-    QgsCoordinateTransform,
+    QgsCoordinateTransformContext,
     QgsExpression,
     QgsExpressionContext,
     QgsExpressionContextUtils,
     QgsFeature,
+    QgsFeatureRequest,
     QgsField,
     QgsFields,
     QgsGeometry,
@@ -18,35 +24,436 @@ from qgis.core import (
     QgsProject,
     QgsRenderContext,
     QgsSettings,
+    QgsTask,
     QgsUnitTypes,
     QgsVector,
     QgsVectorLayer,
     QgsWkbTypes,
 )
 from qgis.gui import QgisInterface
-from qgis.PyQt.QtCore import Qt, QVariant
+from qgis.PyQt.QtCore import Qt, QTimer, QVariant
 from qgis.PyQt.QtWidgets import (
     QToolBar,
     QComboBox,
     QHBoxLayout,
     QLabel,
     QMessageBox,
+    QProgressBar,
     QSpinBox,
     QWidget,
 )
 
-from .utils import LayerUtils
+from .cell_decomposition import boustrophedon_path, cell_grids
+from .coverage_geometry import line_offsets, optimal_sweep_heading, segment_rectangles, swath_extents, sweep_frame
+from .coverage_registry import CoverageLayerRegistry
+from .utils import LayerUtils, get_transform, transform_coordinates
 from .constants import (
     SENSOR_COMBOBOX_DEFAULT_VALUE,
+    PLUGIN_COVERAGE_MODE_SETTINGS_PATH,
     QGIS_FIELD_NAME_ID,
+    QGIS_FIELD_NAME_SOURCE_FID,
     PLUGIN_SENSOR_SETTINGS_PATH,
     PLUGIN_OVERLAP_SETTINGS_PATH,
     PLUGIN_OVERLAP_ROTATION_SETTINGS_PATH,
+    PLUGIN_LINE_MARGIN_SETTINGS_PATH,
+    PLUGIN_CELL_DECOMPOSITION_SETTINGS_PATH,
     PLUGIN_NAME,
     DEFAULT_PUSH_MESSAGE_DURATION
 )
 
 
+# the swath is either buffered in one pass or, for comparison, united from one rectangle per segment
+COVERAGE_MODE_BUFFER: int = 0
+COVERAGE_MODE_SEGMENT_UNION: int = 1
+
+# flight lines run along the longer side of the oriented minimum bounding box, across it, or along the heading with
+# the shortest total flight distance
+LINE_ORIENTATION_BOUNDING_BOX: int = 0
+LINE_ORIENTATION_ROTATED: int = 1
+LINE_ORIENTATION_MIN_FLIGHT_TIME: int = 2
+
+
+def coverage_polygon(
+    line_geometry: QgsGeometry,
+    sensor_coverage: float,
+    line_crs: QgsCoordinateReferenceSystem,
+    coverage_crs: QgsCoordinateReferenceSystem,
+    coverage_mode: int = COVERAGE_MODE_BUFFER,
+    transform_context: Union[QgsCoordinateTransformContext, None] = None,
+) -> QgsGeometry:
+    """Computes the coverage polygon for a given line, without touching any widget so it can run in a task"""
+    if coverage_mode == COVERAGE_MODE_SEGMENT_UNION:
+        return segment_union_coverage_polygon(
+            line_geometry, sensor_coverage, line_crs, coverage_crs, transform_context
+        )
+
+    # the whole line is buffered at once with flat caps, bevel joins close the gaps at the outside of turns
+    coverage_geometry = QgsGeometry(line_geometry)
+    coverage_geometry.transform(get_transform(line_crs, coverage_crs, transform_context))
+    coverage_geometry = coverage_geometry.buffer(
+        sensor_coverage, 1, Qgis.EndCapStyle.Flat, Qgis.JoinStyle.Bevel, 2
+    )
+    coverage_geometry.transform(get_transform(coverage_crs, line_crs, transform_context))
+
+    return coverage_geometry
+
+
+def segment_union_coverage_polygon(
+    line_geometry: QgsGeometry,
+    sensor_coverage: float,
+    line_crs: QgsCoordinateReferenceSystem,
+    coverage_crs: QgsCoordinateReferenceSystem,
+    transform_context: Union[QgsCoordinateTransformContext, None] = None,
+) -> QgsGeometry:
+    """Computes the coverage polygon for a given line as union of the rectangles covered along every segment"""
+    if QgsWkbTypes.isSingleType(line_geometry.wkbType()):
+        points_on_line = line_geometry.asPolyline()
+    else:
+        points_on_line = []
+        for part in line_geometry.asMultiPolyline():
+            points_on_line.extend(part)
+
+    # Convert points to CRS selected for coverage computation
+    x, y = transform_coordinates(
+        [point.x() for point in points_on_line],
+        [point.y() for point in points_on_line],
+        line_crs,
+        coverage_crs,
+        transform_context,
+    )
+
+    rectangles = segment_rectangles(np.column_stack((x, y)), sensor_coverage)
+    geometries = [
+        QgsGeometry.fromPolygonXY([[QgsPointXY(x, y) for x, y in rectangle]])
+        for rectangle in rectangles
+    ]
+
+    unified_geometry = QgsGeometry.unaryUnion(geometries)
+    unified_geometry.transform(get_transform(coverage_crs, line_crs, transform_context))
+
+    return unified_geometry
+
+
+def polygon_rings(polygon: QgsGeometry) -> List[np.ndarray]:
+    """Returns the exterior and interior rings of all parts of a polygon as (n, 2) arrays of vertices"""
+    parts = polygon.asMultiPolygon() if polygon.isMultipart() else [polygon.asPolygon()]
+    return [
+        np.array([(point.x(), point.y()) for point in ring], dtype=np.float64)
+        for part in parts
+        for ring in part
+        if ring
+    ]
+
+
+def clip_lines_to_polygon(
+        polygon: QgsGeometry,
+        point_start: QgsPointXY,
+        point_end: QgsPointXY,
+        vec_normalized: QgsVector,
+        distances: np.ndarray,
+        coverage_range: float,
+        margin: float = 0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Clips the parallel lines from point_start to point_end, offset along vec_normalized by the distances, to the
+    part of the polygon their swath covers and extends them by the lead-in and run-out margin. Returns the x and y
+    coordinates of the start and end points and a mask of the lines whose swath touches the polygon. All values are
+    given in the projected crs of the polygon."""
+    direction = QgsVector(point_end.x() - point_start.x(), point_end.y() - point_start.y()).normalized()
+    first, last, touched = swath_extents(
+        polygon_rings(polygon),
+        (point_start.x(), point_start.y()),
+        (direction.x(), direction.y()),
+        (vec_normalized.x(), vec_normalized.y()),
+        distances,
+        coverage_range,
+    )
+    first = first - margin
+    last = last + margin
+
+    offset_x = point_start.x() + vec_normalized.x() * distances
+    offset_y = point_start.y() + vec_normalized.y() * distances
+    return (
+        offset_x + direction.x() * first,
+        offset_y + direction.y() * first,
+        offset_x + direction.x() * last,
+        offset_y + direction.y() * last,
+        touched,
+    )
+
+
+def sweep_parameters(
+    geometry: QgsGeometry,
+    line_orientation: int,
+    coverage_range: float,
+    line_spacing: float,
+    margin: float = 0,
+) -> Tuple[QgsPointXY, QgsPointXY, QgsVector, QgsVector]:
+    """Returns the start and end point of the first side of the box in which the flight lines of a polygon are placed,
+    the vector across the box along which the lines are offset and its normalized version. The polygon must be given
+    in the projected coverage crs."""
+    if line_orientation == LINE_ORIENTATION_MIN_FLIGHT_TIME:
+        rings = polygon_rings(geometry)
+        heading = optimal_sweep_heading(rings, coverage_range, line_spacing, margin)
+        start, end, normal, width = sweep_frame(np.concatenate(rings), heading)
+        vec_normalized = QgsVector(normal[0], normal[1])
+        return QgsPointXY(*start), QgsPointXY(*end), vec_normalized * width, vec_normalized
+
+    # create bounding box and extract its corners
+    bounding_box = geometry.orientedMinimumBoundingBox()[0].asPolygon()
+    bottom_right = bounding_box[0][0]
+    top_right = bounding_box[0][1]
+    top_left = bounding_box[0][2]
+    bottom_left = bounding_box[0][3]
+
+    # compute vector along which the flight lines are placed
+    vertical_vec = QgsVector(
+        bottom_left.x() - top_left.x(), bottom_left.y() - top_left.y()
+    )
+    horizontal_vec = QgsVector(
+        bottom_left.x() - bottom_right.x(), bottom_left.y() - bottom_right.y()
+    )
+    draw_horizontal_lines = horizontal_vec.length() > vertical_vec.length()
+    if line_orientation == LINE_ORIENTATION_ROTATED:
+        draw_horizontal_lines = not draw_horizontal_lines
+    if draw_horizontal_lines:
+        return top_left, top_right, vertical_vec, vertical_vec.normalized()
+    return top_left, bottom_left, horizontal_vec, horizontal_vec.normalized() * -1
+
+
+def coverage_lines(
+    polygon: QgsGeometry,
+    polygon_crs: QgsCoordinateReferenceSystem,
+    coverage_crs: QgsCoordinateReferenceSystem,
+    coverage_range: float,
+    overlap: float,
+    line_orientation: int = LINE_ORIENTATION_BOUNDING_BOX,
+    transform_context: Union[QgsCoordinateTransformContext, None] = None,
+    margin: float = 0,
+    decompose: bool = False,
+) -> List[QgsGeometry]:
+    """Computes the flight lines covering a polygon with the given overlap of adjacent swaths. The lines run along
+    the longer side of the oriented minimum bounding box of the polygon, across it if rotated, or along the heading
+    with the minimum flight time. They are clipped to the part of the polygon covered by their swath plus the lead-in
+    and run-out margin. If decomposed, concave polygons and polygons with holes are split into cells which every line
+    crosses at most once, the lines are then returned in flight order cell by cell. The coverage range and margin are
+    given in units of the coverage crs, the lines are returned in the crs of the polygon."""
+    overlap_factor = 1 - overlap
+    line_spacing = 2 * coverage_range * overlap_factor
+    geometry = QgsGeometry(polygon)
+    geometry.transform(get_transform(polygon_crs, coverage_crs, transform_context))
+    point_start, point_end, vec, vec_normalized = sweep_parameters(
+        geometry, line_orientation, coverage_range, line_spacing, margin
+    )
+
+    # offsets of all lines along the vector, the first line lies half a swath inside the bounding box
+    distances = line_offsets(vec.length(), coverage_range, line_spacing)
+
+    if decompose:
+        # one line per part of the polygon crossed, the voids between the parts are not flown
+        direction = QgsVector(point_end.x() - point_start.x(), point_end.y() - point_start.y()).normalized()
+        waypoints = boustrophedon_path(cell_grids(
+            polygon_rings(geometry),
+            (point_start.x(), point_start.y()),
+            (direction.x(), direction.y()),
+            (vec_normalized.x(), vec_normalized.y()),
+            distances,
+            coverage_range,
+            margin,
+        ))
+        start_x, start_y = waypoints[0::2].T
+        end_x, end_y = waypoints[1::2].T
+    else:
+        # the lines only span the part of the polygon within their swath, lines whose swath misses it are dropped
+        start_x, start_y, end_x, end_y, touched = clip_lines_to_polygon(
+            geometry, point_start, point_end, vec_normalized, distances, coverage_range, margin
+        )
+        start_x, start_y, end_x, end_y = start_x[touched], start_y[touched], end_x[touched], end_y[touched]
+    number_of_lines = len(start_x)
+
+    # all line endpoints are transformed back to the polygon CRS in one call
+    x, y = transform_coordinates(
+        np.concatenate((start_x, end_x)),
+        np.concatenate((start_y, end_y)),
+        coverage_crs,
+        polygon_crs,
+        transform_context,
+    )
+
+    return [
+        QgsGeometry.fromPolyline([
+            QgsPoint(x[i], y[i]), QgsPoint(x[number_of_lines + i], y[number_of_lines + i])
+        ])
+        for i in range(number_of_lines)
+    ]
+
+
+class CoverageLinesTask(QgsTask):
+    """Computes the coverage lines of one polygon in the background"""
+
+    def __init__(
+        self,
+        feature_id: int,
+        polygon: QgsGeometry,
+        polygon_crs: QgsCoordinateReferenceSystem,
+        coverage_crs: QgsCoordinateReferenceSystem,
+        coverage_range: float,
+        overlap: float,
+        line_orientation: int,
+        transform_context: QgsCoordinateTransformContext,
+        margin: float = 0,
+        decompose: bool = False,
+    ):
+        super().__init__("Compute coverage lines", QgsTask.CanCancel)
+        self.feature_id = feature_id
+        self.polygon = polygon
+        self.polygon_crs = polygon_crs
+        self.coverage_crs = coverage_crs
+        self.coverage_range = coverage_range
+        self.overlap = overlap
+        self.line_orientation = line_orientation
+        self.transform_context = transform_context
+        self.margin = margin
+        self.decompose = decompose
+        self.lines: List[QgsGeometry] = []
+
+    def run(self) -> bool:
+        self.lines = coverage_lines(
+            self.polygon,
+            self.polygon_crs,
+            self.coverage_crs,
+            self.coverage_range,
+            self.overlap,
+            self.line_orientation,
+            self.transform_context,
+            self.margin,
+            self.decompose,
+        )
+        return not self.isCanceled()
+
+
+class CoverageUpdateTask(QgsTask):
+    """Recomputes the coverage polygons of all features of a path layer for several coverage layers in the
+    background. The results are only written to the coverage layers by the module, after the task completed."""
+
+    def __init__(
+        self,
+        line_layer_id: str,
+        line_features: List[Tuple[int, QgsGeometry]],
+        line_crs: QgsCoordinateReferenceSystem,
+        coverage_jobs: List[Tuple[str, float]],
+        coverage_crs: QgsCoordinateReferenceSystem,
+        coverage_mode: int,
+        transform_context: QgsCoordinateTransformContext,
+    ):
+        super().__init__("Update sensor coverage", QgsTask.CanCancel)
+        self.line_layer_id = line_layer_id
+        self.line_features = line_features
+        self.line_crs = line_crs
+        self.coverage_jobs = coverage_jobs
+        self.coverage_crs = coverage_crs
+        self.coverage_mode = coverage_mode
+        self.transform_context = transform_context
+        # coverage layer id -> list of (path feature id, coverage polygon)
+        self.results: Dict[str, List[Tuple[int, QgsGeometry]]] = {}
+        # set once a newer copy of the path features is computed, the results are then dropped
+        self.superseded = False
+
+    def run(self) -> bool:
+        number_of_polygons = max(len(self.coverage_jobs) * len(self.line_features), 1)
+        computed = 0
+        for coverage_layer_id, sensor_coverage in self.coverage_jobs:
+            polygons = []
+            for feature_id, line_geometry in self.line_features:
+                if self.isCanceled():
+                    return False
+                polygons.append((feature_id, coverage_polygon(
+                    line_geometry,
+                    sensor_coverage,
+                    self.line_crs,
+                    self.coverage_crs,
+                    self.coverage_mode,
+                    self.transform_context,
+                )))
+                computed += 1
+                self.setProgress(100 * computed / number_of_polygons)
+            self.results[coverage_layer_id] = polygons
+        return True
+
+
+def is_task_pending(task: QgsTask) -> bool:
+    """Returns whether the task is neither completed nor terminated yet"""
+    try:
+        return task.status() not in (QgsTask.Complete, QgsTask.Terminated)
+    except RuntimeError:
+        # the task manager already deleted the finished task
+        return False
+
+
+class TaskBatch:
+    """Tasks started together, whose progress is summarized in the message bar. Every task handles one item."""
+
+    def __init__(self, iface: QgisInterface, title: str, tasks: List[QgsTask], item_name: str):
+        self.iface = iface
+        self.title = title
+        self.tasks = tasks
+        self.item_name = item_name
+        self.finished = 0
+        self.failed = 0
+
+        self.message = self.iface.messageBar().createMessage(self.title, self.progress_text())
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximum(len(tasks))
+        self.message.layout().addWidget(self.progress_bar)
+        self.iface.messageBar().pushWidget(self.message, Qgis.MessageLevel.Info)
+
+    def progress_text(self) -> str:
+        return f"{self.finished} of {len(self.tasks)} {self.item_name}"
+
+    def task_finished(self, successful: bool) -> bool:
+        """Counts a finished task and returns whether all tasks of the batch are finished"""
+        self.finished += 1
+        if not successful:
+            self.failed += 1
+        try:
+            self.message.setText(self.progress_text())
+            self.progress_bar.setValue(self.finished)
+        except RuntimeError:
+            # the message was closed by the user
+            pass
+        if self.finished < len(self.tasks):
+            return False
+
+        self.remove_message()
+        if self.failed:
+            self.iface.messageBar().pushMessage(
+                f"{self.title}: {self.failed} of {len(self.tasks)} {self.item_name} failed",
+                level=Qgis.MessageLevel.Warning,
+                duration=DEFAULT_PUSH_MESSAGE_DURATION,
+            )
+        else:
+            self.iface.messageBar().pushMessage(
+                f"{self.title}: {len(self.tasks)} {self.item_name} finished",
+                level=Qgis.MessageLevel.Info,
+                duration=DEFAULT_PUSH_MESSAGE_DURATION,
+            )
+        return True
+
+    def cancel(self):
+        for task in self.tasks:
+            try:
+                task.cancel()
+            except RuntimeError:
+                # the task manager already deleted the finished task
+                pass
+        self.remove_message()
+
+    def remove_message(self):
+        try:
+            self.iface.messageBar().popWidget(self.message)
+        except RuntimeError:
+            pass
+
+
 class CoverageModule:
     iface: QgisInterface
     layer_utils: LayerUtils
@@ -59,6 +466,16 @@ class CoverageModule:
     SPINBOX_LABEL: str = "Flight altitude (AGL) in m:"
     DEFAULT_FLIGHT_ALTITUDE: int = 2000
     FLIGHT_ALTITUDE_MAXIMUM: int = 9999
+    # altitude changes within this delay are coalesced into one background update of the coverage layers
+    COVERAGE_UPDATE_DELAY_MS: int = 400
+
+    COVERAGE_MODE_BUFFER: int = COVERAGE_MODE_BUFFER
+    COVERAGE_MODE_SEGMENT_UNION: int = COVERAGE_MODE_SEGMENT_UNION
+    COVERAGE_MODES = ["single pass buffer", "segment union (reference)"]
+    LINE_ORIENTATION_BOUNDING_BOX: int = LINE_ORIENTATION_BOUNDING_BOX
+    LINE_ORIENTATION_ROTATED: int = LINE_ORIENTATION_ROTATED
+    LINE_ORIENTATION_MIN_FLIGHT_TIME: int = LINE_ORIENTATION_MIN_FLIGHT_TIME
+    LINE_ORIENTATIONS = ["optimal", "90° rotated", "minimum flight time"]
 
     def __init__(self, iface: QgisInterface):
         self.iface = iface
@@ -68,6 +485,16 @@ class CoverageModule:
         self.flight_altitude_widget = QWidget()
         self.flight_altitude_spinbox = QSpinBox()
         self.sensor_combobox = QComboBox(self.iface.mainWindow())
+        # path layers whose edits update their coverage layers feature by feature
+        self.tracked_line_layers = {}
+        self.coverage_update_timer = QTimer()
+        self.coverage_update_timer.setSingleShot(True)
+        self.coverage_update_timer.setInterval(self.COVERAGE_UPDATE_DELAY_MS)
+        self.coverage_update_task = None
+        self.coverage_update_batch = None
+        self.coverage_lines_batch = None
+        # path layers and their coverage layers per sensor, stored in the project
+        self.coverage_registry = CoverageLayerRegistry()
 
     def init_gui(self, toolbar: QToolBar):
         self.flight_altitude_spinbox.setMaximum(self.FLIGHT_ALTITUDE_MAXIMUM)
@@ -77,6 +504,9 @@ class CoverageModule:
             self.flight_altitude_value_changed
         )
         self.flight_altitude_spinbox.valueChanged.connect(
+            self.coverage_update_timer.start
+        )
+        self.coverage_update_timer.timeout.connect(
             self.sensor_coverage_flight_altitude_changed
         )
         self.iface.layerTreeView().currentLayerChanged.connect(
@@ -97,13 +527,31 @@ class CoverageModule:
         self.set_sensor_combobox_entries()
         toolbar.addWidget(self.sensor_combobox)
 
+        QgsProject.instance().readProject.connect(self.load_coverage_registry)
+        QgsProject.instance().cleared.connect(self.coverage_registry.clear)
+        QgsProject.instance().layersWillBeRemoved.connect(self.coverage_layers_removed)
+        self.load_coverage_registry()
+
     def close(self):
         self.flight_altitude_spinbox.valueChanged.disconnect(
             self.flight_altitude_value_changed
         )
         self.flight_altitude_spinbox.valueChanged.disconnect(
+            self.coverage_update_timer.start
+        )
+        self.coverage_update_timer.timeout.disconnect(
             self.sensor_coverage_flight_altitude_changed
         )
+        self.coverage_update_timer.stop()
+        if self.coverage_update_task is not None:
+            self.coverage_update_task.cancel()
+            self.coverage_update_task = None
+        if self.coverage_update_batch is not None:
+            self.coverage_update_batch.cancel()
+            self.coverage_update_batch = None
+        if self.coverage_lines_batch is not None:
+            self.coverage_lines_batch.cancel()
+            self.coverage_lines_batch = None
         self.iface.layerTreeView().currentLayerChanged.disconnect(
             self.flight_altitude_layer_changed
         )
@@ -113,6 +561,50 @@ class CoverageModule:
         self.iface.layerTreeView().currentLayerChanged.disconnect(
             self.sensor_coverage_layer_changed
         )
+        QgsProject.instance().readProject.disconnect(self.load_coverage_registry)
+        QgsProject.instance().cleared.disconnect(self.coverage_registry.clear)
+        QgsProject.instance().layersWillBeRemoved.disconnect(self.coverage_layers_removed)
+        for layer_id in list(self.tracked_line_layers):
+            self.untrack_line_layer(layer_id)
+
+    def load_coverage_registry(self, *args):
+        """Reads the coverage layers of the path layers from the project. Projects which still store them as layer
+        variables are migrated."""
+        registry_json, stored = QgsProject.instance().readEntry(PLUGIN_NAME, "sensor_coverage_layers", "")
+        if stored:
+            self.coverage_registry.load_json(registry_json)
+            return
+
+        self.coverage_registry.clear()
+        for layer in QgsProject.instance().mapLayers().values():
+            context = QgsExpressionContext()
+            context.appendScopes(QgsExpressionContextUtils.globalProjectLayerScopes(layer))
+            coverage_layers = QgsExpression("@sfp_sensor_coverage_layers").evaluate(context)
+            try:
+                coverage_layers = ast.literal_eval(coverage_layers)
+            except (ValueError, SyntaxError):
+                continue
+            if not isinstance(coverage_layers, dict):
+                continue
+            for sensor, coverage_layer_id in coverage_layers.items():
+                self.coverage_registry.register(layer.id(), sensor, coverage_layer_id)
+        if self.coverage_registry.path_layer_ids():
+            self.save_coverage_registry()
+
+    def save_coverage_registry(self):
+        QgsProject.instance().writeEntry(PLUGIN_NAME, "sensor_coverage_layers", self.coverage_registry.to_json())
+
+    def coverage_layers_removed(self, layer_ids: List[str]):
+        """Removes the entries of removed path and coverage layers from the registry"""
+        if self.coverage_registry.remove_layers(layer_ids):
+            self.save_coverage_registry()
+
+    def get_path_layer(self, coverage_layer: QgsMapLayer) -> Union[QgsMapLayer, None]:
+        """Returns the path layer of a coverage layer or None if the layer isn't a coverage layer"""
+        path_layer_id = self.coverage_registry.get_path_layer(coverage_layer.id())
+        if path_layer_id is None:
+            return None
+        return QgsProject.instance().mapLayer(path_layer_id)
 
     def flight_altitude_value_changed(self):
         """Saves the current flight altitude selected in the toolbar as layer variable"""
@@ -127,15 +619,8 @@ class CoverageModule:
             return
 
         if selected_layer.geometryType() == QgsWkbTypes.GeometryType.PolygonGeometry:
-            context = QgsExpressionContext()
-            context.appendScopes(
-                QgsExpressionContextUtils.globalProjectLayerScopes(selected_layer)
-            )
-            path_layer_id = QgsExpression("@sfp_sensor_coverage_path").evaluate(context)
-
-            try:
-                selected_layer = QgsProject.instance().mapLayers()[path_layer_id]
-            except:
+            selected_layer = self.get_path_layer(selected_layer)
+            if selected_layer is None:
                 return
 
         QgsExpressionContextUtils.setLayerVariable(
@@ -155,15 +640,8 @@ class CoverageModule:
             return
 
         if layer.geometryType() == QgsWkbTypes.GeometryType.PolygonGeometry:
-            context = QgsExpressionContext()
-            context.appendScopes(
-                QgsExpressionContextUtils.globalProjectLayerScopes(layer)
-            )
-            path_layer_id = QgsExpression("@sfp_sensor_coverage_path").evaluate(context)
-
-            try:
-                layer = QgsProject.instance().mapLayers()[path_layer_id]
-            except:
+            layer = self.get_path_layer(layer)
+            if layer is None:
                 return
 
         context = QgsExpressionContext()
@@ -244,7 +722,8 @@ class CoverageModule:
             self.sensor_combobox.setEnabled(True)
 
     def sensor_coverage_flight_altitude_changed(self):
-        """Updates all sensor coverage layers of the currently selected layer"""
+        """Updates all sensor coverage layers of the currently selected layer in the background, called once the
+        flight altitude stopped changing"""
         selected_layer = self.layer_utils.get_valid_selected_layer(
             [
                 QgsWkbTypes.GeometryType.LineGeometry,
@@ -257,37 +736,154 @@ class CoverageModule:
             return
 
         if selected_layer.geometryType() == QgsWkbTypes.GeometryType.PolygonGeometry:
-            context = QgsExpressionContext()
-            context.appendScopes(
-                QgsExpressionContextUtils.globalProjectLayerScopes(selected_layer)
-            )
-            path_layer_id = QgsExpression("@sfp_sensor_coverage_path").evaluate(context)
-
-            try:
-                selected_layer = QgsProject.instance().mapLayers()[path_layer_id]
-            except:
+            selected_layer = self.get_path_layer(selected_layer)
+            if selected_layer is None:
                 return
 
-        coverage_layers_dictionary = self.get_coverage_layers_dict(selected_layer)
-        try:
-            for sensor in coverage_layers_dictionary:
-                self.update_sensor_coverage(selected_layer, sensor)
-        except:
+        self.start_coverage_update_task(selected_layer)
+
+    def start_coverage_update_task(self, line_layer: QgsVectorLayer):
+        """Cancels a running coverage update and recomputes all coverage layers of the path layer in a task"""
+        if self.coverage_update_task is not None:
+            self.coverage_update_task.cancel()
+            self.coverage_update_task = None
+        self.supersede_coverage_updates(line_layer.id())
+
+        task = self.create_coverage_update_task(line_layer, self.get_coverage_layers_dict(line_layer))
+        if task is None:
             return
+        task.taskCompleted.connect(partial(self.coverage_update_completed, task))
+        # the reference to the task is kept, otherwise it is garbage collected before it runs
+        self.coverage_update_task = task
+        QgsApplication.taskManager().addTask(task)
 
-    def sensor_coverage_sensor_settings_changed(self):
-        """Updates all sensor coverage layers"""
-        layers = QgsProject.instance().mapLayers().values()
+    def create_coverage_update_task(
+        self,
+        line_layer: QgsVectorLayer,
+        sensors: Iterable[str],
+        line_features: Union[List[Tuple[int, QgsGeometry]], None] = None,
+    ) -> Union[CoverageUpdateTask, None]:
+        """Returns a task recomputing the coverage layers of the given sensors of the path layer for the flight
+        altitude stored at the path layer, or None if there is nothing to compute"""
+        coverage_layers_dictionary = self.get_coverage_layers_dict(line_layer)
+        coverage_crs = None
+        coverage_jobs = []
+        for sensor in sensors:
+            coverage_layer_id = coverage_layers_dictionary.get(sensor)
+            if coverage_layer_id is None or QgsProject.instance().mapLayer(coverage_layer_id) is None:
+                continue
+            coverage_parameters = self.get_layer_sensor_coverage(line_layer, sensor)
+            if coverage_parameters is None:
+                continue
+            sensor_coverage, coverage_crs = coverage_parameters
+            coverage_jobs.append((coverage_layer_id, sensor_coverage))
+        if not coverage_jobs:
+            return None
+
+        if line_features is None:
+            line_features = self.get_line_features(line_layer)
+        return CoverageUpdateTask(
+            line_layer.id(),
+            line_features,
+            line_layer.crs(),
+            coverage_jobs,
+            coverage_crs,
+            int(self.settings.value(PLUGIN_COVERAGE_MODE_SETTINGS_PATH, self.COVERAGE_MODE_BUFFER)),
+            QgsProject.instance().transformContext(),
+        )
 
-        for layer in layers:
-            coverage_layers_dictionary = self.get_coverage_layers_dict(layer)
-            if not coverage_layers_dictionary:
+    def get_line_features(self, line_layer: QgsVectorLayer) -> List[Tuple[int, QgsGeometry]]:
+        """Returns the ids and copies of the geometries of all path features, to be handed to a task"""
+        return [
+            (feature.id(), QgsGeometry(feature.geometry()))
+            for feature in line_layer.getFeatures(QgsFeatureRequest().setNoAttributes())
+        ]
+
+    def coverage_update_completed(self, task: CoverageUpdateTask):
+        """Writes the polygons of the latest coverage update to the coverage layers, results of stale tasks are
+        dropped"""
+        if task is not self.coverage_update_task:
+            return
+        self.coverage_update_task = None
+        self.write_coverage_update_results(task)
+
+    def supersede_coverage_updates(self, layer_id: str):
+        """Cancels the pending coverage update of the path layer and drops the results of its pending tasks in the
+        batch, as a newer copy of its features is computed"""
+        if self.coverage_update_task is not None and self.coverage_update_task.line_layer_id == layer_id:
+            self.coverage_update_task.cancel()
+            self.coverage_update_task = None
+        if self.coverage_update_batch is not None:
+            for task in self.coverage_update_batch.tasks:
+                if task.line_layer_id == layer_id:
+                    task.superseded = True
+
+    def restart_pending_coverage_updates(self, layer_id: str):
+        """Restarts the pending coverage updates of a changed path layer, otherwise they would overwrite its coverage
+        with their outdated copy of the features"""
+        pending_tasks = []
+        if self.coverage_update_task is not None:
+            pending_tasks.append(self.coverage_update_task)
+        if self.coverage_update_batch is not None:
+            pending_tasks.extend(self.coverage_update_batch.tasks)
+        if not any(
+            task.line_layer_id == layer_id and not task.superseded and is_task_pending(task) for task in pending_tasks
+        ):
+            return
+        line_layer, _ = self.tracked_line_layers.get(layer_id, (None, None))
+        if line_layer is not None:
+            self.start_coverage_update_task(line_layer)
+
+    def write_coverage_update_results(self, task: CoverageUpdateTask):
+        for coverage_layer_id, polygons in task.results.items():
+            coverage_layer = QgsProject.instance().mapLayer(coverage_layer_id)
+            if coverage_layer is None:
                 continue
-            try:
-                for sensor in coverage_layers_dictionary:
-                    self.update_sensor_coverage(layer, sensor)
-            except:
+            self.remove_all_features(coverage_layer)
+            self.write_coverage_features(coverage_layer, polygons)
+
+    def sensor_coverage_sensor_settings_changed(self):
+        """Recomputes all registered sensor coverage layers in parallel, one task per path layer and sensor. The
+        polygons are computed on worker threads, only writing them to the layers happens on the main thread."""
+        if self.coverage_update_batch is not None:
+            self.coverage_update_batch.cancel()
+            self.coverage_update_batch = None
+        # the batch recomputes every coverage layer from a newer copy of the path features
+        if self.coverage_update_task is not None:
+            self.coverage_update_task.cancel()
+            self.coverage_update_task = None
+
+        tasks = []
+        for path_layer_id in self.coverage_registry.path_layer_ids():
+            layer = QgsProject.instance().mapLayer(path_layer_id)
+            if layer is None:
                 continue
+            # the snapshot of the path features is shared by the tasks of all sensors
+            line_features = self.get_line_features(layer)
+            for sensor in self.coverage_registry.get_coverage_layers(path_layer_id):
+                task = self.create_coverage_update_task(layer, [sensor], line_features)
+                if task is not None:
+                    tasks.append(task)
+        if not tasks:
+            return
+
+        batch = TaskBatch(self.iface, "Sensor coverage update", tasks, "coverage layers")
+        self.coverage_update_batch = batch
+        for task in tasks:
+            task.taskCompleted.connect(partial(self.batch_coverage_update_finished, batch, task, True))
+            task.taskTerminated.connect(partial(self.batch_coverage_update_finished, batch, task, False))
+            QgsApplication.taskManager().addTask(task)
+
+    def batch_coverage_update_finished(
+        self, batch: TaskBatch, task: CoverageUpdateTask, successful: bool
+    ):
+        """Writes the polygons of a finished task of the current batch and updates the progress summary"""
+        if batch is not self.coverage_update_batch:
+            return
+        if successful and not task.superseded:
+            self.write_coverage_update_results(task)
+        if batch.task_finished(successful):
+            self.coverage_update_batch = None
 
     def update_sensor_coverage(
         self, selected_layer: QgsMapLayer, sensor: Union[str, None] = None
@@ -334,13 +930,12 @@ class CoverageModule:
         )
         sensor_coverage = sensor_coverage_in_meters * unit_factor
 
-        coverage_layers_dictionary = self.get_coverage_layers_dict(selected_layer)
-        try:
-            coverage_layer = QgsProject.instance().mapLayers()[
-                coverage_layers_dictionary[current_sensor]
-            ]
+        coverage_layer = QgsProject.instance().mapLayer(
+            self.coverage_registry.get_coverage_layers(selected_layer.id()).get(current_sensor, "")
+        )
+        if coverage_layer is not None:
             self.remove_all_features(coverage_layer)
-        except:
+        else:
             # Return if the coverage layer was deleted when updating it
             if sensor:
                 return
@@ -355,23 +950,156 @@ class CoverageModule:
                 self.sensor_combobox.setCurrentText(SENSOR_COMBOBOX_DEFAULT_VALUE)
                 return
 
-            QgsExpressionContextUtils.setLayerVariable(
-                coverage_layer,
-                "sfp_sensor_coverage_path",
-                selected_layer.id(),
-            )
+            self.coverage_registry.register(selected_layer.id(), current_sensor, coverage_layer.id())
+            self.save_coverage_registry()
 
-        coverage_layers_dictionary[current_sensor] = coverage_layer.id()
         self.add_coverage_features(
             coverage_layer,
             selected_layer,
             sensor_coverage,
             coverage_crs,
         )
-        QgsExpressionContextUtils.setLayerVariable(
-            selected_layer,
-            "sfp_sensor_coverage_layers",
-            f"{coverage_layers_dictionary}",
+        self.track_line_layer(selected_layer)
+
+    def track_line_layer(self, line_layer: QgsVectorLayer):
+        """Subscribes to the edits of a path layer, so only the coverage polygons of changed features are updated"""
+        if line_layer.id() in self.tracked_line_layers:
+            return
+        feature_slot = partial(self.line_feature_changed, line_layer.id())
+        commit_slot = partial(self.sync_line_layer_coverage, line_layer.id())
+        rollback_slot = partial(self.rebuild_line_layer_coverage, line_layer.id())
+        delete_slot = partial(self.untrack_line_layer, line_layer.id())
+        connections = [
+            (line_layer.geometryChanged, feature_slot),
+            (line_layer.featureAdded, feature_slot),
+            (line_layer.featureDeleted, feature_slot),
+            (line_layer.afterCommitChanges, commit_slot),
+            (line_layer.afterRollBack, rollback_slot),
+            (line_layer.willBeDeleted, delete_slot),
+        ]
+        for signal, slot in connections:
+            signal.connect(slot)
+        self.tracked_line_layers[line_layer.id()] = (line_layer, connections)
+
+    def untrack_line_layer(self, layer_id: str):
+        line_layer, connections = self.tracked_line_layers.pop(layer_id, (None, []))
+        for signal, slot in connections:
+            try:
+                signal.disconnect(slot)
+            except (TypeError, RuntimeError):
+                pass
+
+    def get_tracked_coverage_layers(self, layer_id: str) -> Iterable[Tuple[QgsVectorLayer, QgsVectorLayer, str]]:
+        """Yields the tracked path layer together with each of its coverage layers and the corresponding sensor"""
+        line_layer, _ = self.tracked_line_layers.get(layer_id, (None, None))
+        if line_layer is None:
+            return
+        for sensor, coverage_layer_id in self.get_coverage_layers_dict(line_layer).items():
+            coverage_layer = QgsProject.instance().mapLayer(coverage_layer_id)
+            if coverage_layer is not None:
+                yield line_layer, coverage_layer, sensor
+
+    def line_feature_changed(self, layer_id: str, feature_id: int, *args):
+        """Replaces the coverage polygons of a changed, added or deleted path feature"""
+        for line_layer, coverage_layer, sensor in self.get_tracked_coverage_layers(layer_id):
+            coverage_parameters = self.get_layer_sensor_coverage(line_layer, sensor)
+            if coverage_parameters is None:
+                continue
+            self.replace_coverage_features(coverage_layer, line_layer, [feature_id], *coverage_parameters)
+        self.restart_pending_coverage_updates(layer_id)
+
+    def sync_line_layer_coverage(self, layer_id: str):
+        """Updates the coverage polygons of path features whose ids changed when the edits were committed"""
+        for line_layer, coverage_layer, sensor in self.get_tracked_coverage_layers(layer_id):
+            coverage_parameters = self.get_layer_sensor_coverage(line_layer, sensor)
+            if coverage_parameters is None:
+                continue
+            source_index = coverage_layer.fields().indexFromName(QGIS_FIELD_NAME_SOURCE_FID)
+            if source_index == -1:
+                continue
+            line_feature_ids = set(line_layer.allFeatureIds())
+            covered_feature_ids = {
+                feature[source_index] for feature in coverage_layer.getFeatures(
+                    QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry).setSubsetOfAttributes([source_index])
+                )
+            }
+            outdated_feature_ids = line_feature_ids.symmetric_difference(covered_feature_ids)
+            if outdated_feature_ids:
+                self.replace_coverage_features(
+                    coverage_layer, line_layer, outdated_feature_ids, *coverage_parameters
+                )
+        self.restart_pending_coverage_updates(layer_id)
+
+    def rebuild_line_layer_coverage(self, layer_id: str):
+        """Recomputes all coverage polygons of a path layer, e.g. after its edits were rolled back"""
+        for line_layer, coverage_layer, sensor in self.get_tracked_coverage_layers(layer_id):
+            coverage_parameters = self.get_layer_sensor_coverage(line_layer, sensor)
+            if coverage_parameters is None:
+                continue
+            self.remove_all_features(coverage_layer)
+            self.add_coverage_features(coverage_layer, line_layer, *coverage_parameters)
+        self.restart_pending_coverage_updates(layer_id)
+
+    def get_layer_sensor_coverage(
+        self, line_layer: QgsVectorLayer, sensor: str
+    ) -> Union[Tuple[float, QgsCoordinateReferenceSystem], None]:
+        """Returns the sensor coverage in units of the coverage crs for the flight altitude stored at the path layer
+        together with the coverage crs, or None if it can't be computed. No messages are shown."""
+        coverage_crs = QgsCoordinateReferenceSystem(
+            QgsProject.instance().readEntry(PLUGIN_NAME, "coverage_crs", None)[0]
+        )
+        if not coverage_crs.isValid():
+            return None
+        try:
+            sensor_opening_angle = float(self.settings.value(PLUGIN_SENSOR_SETTINGS_PATH, {})[sensor])
+        except:
+            return None
+
+        context = QgsExpressionContext()
+        context.appendScopes(QgsExpressionContextUtils.globalProjectLayerScopes(line_layer))
+        try:
+            flight_altitude = int(QgsExpression("@sfp_flight_altitude").evaluate(context))
+        except (TypeError, ValueError):
+            flight_altitude = self.DEFAULT_FLIGHT_ALTITUDE
+
+        if sensor_opening_angle < 0 or sensor_opening_angle >= 180:
+            return None
+        sensor_coverage_in_meters = self.compute_sensor_coverage_in_meters(sensor_opening_angle, flight_altitude)
+        unit_factor = QgsUnitTypes.fromUnitToUnitFactor(
+            QgsUnitTypes.DistanceUnit.DistanceMeters,
+            coverage_crs.mapUnits(),
+        )
+        return sensor_coverage_in_meters * unit_factor, coverage_crs
+
+    def replace_coverage_features(
+        self,
+        coverage_layer: QgsVectorLayer,
+        line_layer: QgsVectorLayer,
+        feature_ids: Iterable[int],
+        sensor_coverage: float,
+        coverage_crs: QgsCoordinateReferenceSystem,
+    ):
+        """Replaces the coverage polygons of the given path features. Deleted features only lose their polygons."""
+        source_index = coverage_layer.fields().indexFromName(QGIS_FIELD_NAME_SOURCE_FID)
+        if source_index == -1:
+            # coverage layers created before the source feature was stored are rebuilt completely
+            self.remove_all_features(coverage_layer)
+            self.add_coverage_features(coverage_layer, line_layer, sensor_coverage, coverage_crs)
+            return
+
+        feature_ids = list(feature_ids)
+        outdated_request = QgsFeatureRequest().setFilterExpression(
+            f'"{QGIS_FIELD_NAME_SOURCE_FID}" IN ({", ".join(str(feature_id) for feature_id in feature_ids)})'
+        ).setFlags(QgsFeatureRequest.NoGeometry).setNoAttributes()
+        coverage_layer.dataProvider().deleteFeatures(
+            [feature.id() for feature in coverage_layer.getFeatures(outdated_request)]
+        )
+        self.add_coverage_features(
+            coverage_layer,
+            line_layer,
+            sensor_coverage,
+            coverage_crs,
+            QgsFeatureRequest().setFilterFids(feature_ids),
         )
 
     def compute_sensor_coverage_in_meters(
@@ -388,16 +1116,26 @@ class CoverageModule:
             return -1
         return math.tan(math.radians(sensor_opening_angle) / 2) * flight_altitude
 
-    def get_coverage_layers_dict(self, layer: QgsMapLayer) -> Dict[str, str]:
-        """Returns the dictionary that contains the sensors and corresponding coverage layers for a given layer"""
-        context = QgsExpressionContext()
-        context.appendScopes(QgsExpressionContextUtils.globalProjectLayerScopes(layer))
-        coverage_layers = QgsExpression("@sfp_sensor_coverage_layers").evaluate(context)
-
+    def get_sensor_coverage_in_meters(self, sensor: str) -> Union[float, None]:
+        """Returns the sensor coverage (distance from flight path in one direction) in meters for the given sensor at
+        the flight altitude selected in the toolbar or None if the sensor options can't be read"""
         try:
-            return eval(coverage_layers)
+            sensor_opening_angle = float(
+                self.settings.value(PLUGIN_SENSOR_SETTINGS_PATH, {})[sensor]
+            )
         except:
-            return {}
+            return None
+
+        sensor_coverage_in_meters = self.compute_sensor_coverage_in_meters(
+            sensor_opening_angle, self.flight_altitude_spinbox.value()
+        )
+        if sensor_coverage_in_meters < 0:
+            return None
+        return sensor_coverage_in_meters
+
+    def get_coverage_layers_dict(self, layer: QgsMapLayer) -> Dict[str, str]:
+        """Returns the dictionary that contains the sensors and corresponding coverage layers for a given layer"""
+        return self.coverage_registry.get_coverage_layers(layer.id())
 
     def generate_coverage_shp_file(
         self,
@@ -407,11 +1145,15 @@ class CoverageModule:
     ) -> Union[QgsVectorLayer, None]:
         """Generates an SHP-File for the sensor coverage"""
         path_suffix = f"_coverage_{sensor_name}.shp"
+        fields = QgsFields()
+        fields.append(QgsField(QGIS_FIELD_NAME_ID, QVariant.Int))
+        fields.append(QgsField(QGIS_FIELD_NAME_SOURCE_FID, QVariant.LongLong))
         writer_layer_tuple = self.generate_shp_file(
             current_layer_path,
             path_suffix,
             QgsWkbTypes.Polygon,
-            crs
+            crs,
+            fields
         )
         if writer_layer_tuple is None:
             return
@@ -443,19 +1185,32 @@ class CoverageModule:
         line_layer: QgsMapLayer,
         sensor_coverage: float,
         coverage_crs: QgsCoordinateReferenceSystem,
+        request: Union[QgsFeatureRequest, None] = None,
     ):
         """Adds the features to the coverage layer"""
-        coverage_features = []
-        for index, line_feature in enumerate(line_layer.getFeatures()):
-            coverage_feature = QgsFeature(index)
-            coverage_feature.setGeometry(
+        polygons = [
+            (
+                line_feature.id(),
                 self.compute_coverage_polygon(
                     line_feature.geometry(),
                     sensor_coverage,
                     line_layer.crs(),
                     coverage_crs,
-                )
+                ),
             )
+            for line_feature in line_layer.getFeatures(request or QgsFeatureRequest())
+        ]
+        self.write_coverage_features(coverage_layer, polygons)
+
+    def write_coverage_features(self, coverage_layer: QgsMapLayer, polygons: List[Tuple[int, QgsGeometry]]):
+        """Adds one feature per coverage polygon to the coverage layer, storing the id of its path feature"""
+        source_index = coverage_layer.fields().indexFromName(QGIS_FIELD_NAME_SOURCE_FID)
+        coverage_features = []
+        for index, (line_feature_id, polygon) in enumerate(polygons):
+            coverage_feature = QgsFeature(coverage_layer.fields(), index)
+            if source_index != -1:
+                coverage_feature.setAttribute(source_index, line_feature_id)
+            coverage_feature.setGeometry(polygon)
             coverage_features.append(coverage_feature)
 
         coverage_layer.dataProvider().addFeatures(coverage_features)
@@ -469,102 +1224,20 @@ class CoverageModule:
         coverage_crs: QgsCoordinateReferenceSystem,
     ) -> QgsGeometry:
         """Computes the coverage polygon for a given line"""
-        if QgsWkbTypes.isSingleType(line_geometry.wkbType()):
-            points_on_line = line_geometry.asPolyline()
-        else:
-            points_on_line = []
-            for part in line_geometry.asMultiPolyline():
-                points_on_line.extend(part)
-
-        # Convert points to CRS selected for coverage computation
-        transform_to_coverage_crs = QgsCoordinateTransform(
-            line_crs, coverage_crs, QgsProject.instance()
+        coverage_mode = int(
+            self.settings.value(PLUGIN_COVERAGE_MODE_SETTINGS_PATH, self.COVERAGE_MODE_BUFFER)
         )
-        transform_from_coverage_crs = QgsCoordinateTransform(
-            coverage_crs, line_crs, QgsProject.instance()
-        )
-
-        for index in range(len(points_on_line)):
-            points_on_line[index] = transform_to_coverage_crs.transform(
-                points_on_line[index]
-            )
-
-        geometries = []
-
-        for index in range(len(points_on_line) - 1):
-            from_point = points_on_line[index]
-            to_point = points_on_line[index + 1]
-            vector = QgsVector(
-                to_point.x() - from_point.x(), to_point.y() - from_point.y()
-            )
+        return coverage_polygon(line_geometry, sensor_coverage, line_crs, coverage_crs, coverage_mode)
 
-            coverage_points_for_line_segment = []
-
-            clockwise_vector = self.perpendicular_clockwise(vector, sensor_coverage)
-            coverage_points_for_line_segment.append(
-                QgsPointXY(
-                    from_point.x() + clockwise_vector.x(),
-                    from_point.y() + clockwise_vector.y(),
-                )
-            )
-            coverage_points_for_line_segment.append(
-                QgsPointXY(
-                    to_point.x() + clockwise_vector.x(),
-                    to_point.y() + clockwise_vector.y(),
-                )
-            )
-
-            counter_clockwise_vector = self.perpendicular_counter_clockwise(
-                vector, sensor_coverage
-            )
-            coverage_points_for_line_segment.append(
-                QgsPointXY(
-                    to_point.x() + counter_clockwise_vector.x(),
-                    to_point.y() + counter_clockwise_vector.y(),
-                )
-            )
-            coverage_points_for_line_segment.append(
-                QgsPointXY(
-                    from_point.x() + counter_clockwise_vector.x(),
-                    from_point.y() + counter_clockwise_vector.y(),
-                )
-            )
-
-            geometries.append(
-                QgsGeometry.fromPolygonXY([coverage_points_for_line_segment])
-            )
-
-        unified_geometry = QgsGeometry.unaryUnion(geometries)
-        unified_geometry.transform(transform_from_coverage_crs)
-
-        return unified_geometry
-
-    def perpendicular_clockwise(
-        self, vector: QgsVector, sensor_coverage: float
-    ) -> QgsVector:
-        """Computes a vector perpendicular to the given vector (rotated clockwise) with the length of sensor_coverage"""
-        if vector.x() == 0 and vector.y() == 0:
-            normalized_perpendicular = QgsVector(0, 0)
-        else:
-            normalized_perpendicular = QgsVector(vector.y(), -vector.x()).normalized()
-        return QgsVector(
-            sensor_coverage * normalized_perpendicular.x(),
-            sensor_coverage * normalized_perpendicular.y(),
-        )
-
-    def perpendicular_counter_clockwise(
-        self, vector: QgsVector, sensor_coverage: float
-    ) -> QgsVector:
-        """Computes a vector perpendicular to the given vector (rotated counter-clockwise) with the length of
-        sensor_coverage"""
-        if vector.x() == 0 and vector.y() == 0:
-            normalized_perpendicular = QgsVector(0, 0)
-        else:
-            normalized_perpendicular = QgsVector(-vector.y(), vector.x()).normalized()
-        return QgsVector(
-            sensor_coverage * normalized_perpendicular.x(),
-            sensor_coverage * normalized_perpendicular.y(),
-        )
+    def compute_segment_union_coverage_polygon(
+        self,
+        line_geometry: QgsGeometry,
+        sensor_coverage: float,
+        line_crs: QgsCoordinateReferenceSystem,
+        coverage_crs: QgsCoordinateReferenceSystem,
+    ) -> QgsGeometry:
+        """Computes the coverage polygon for a given line as union of the rectangles covered along every segment"""
+        return segment_union_coverage_polygon(line_geometry, sensor_coverage, line_crs, coverage_crs)
 
     def generate_shp_file(
             self,
@@ -572,6 +1245,7 @@ class CoverageModule:
             path_suffix: str,
             geometry_type: QgsWkbTypes,
             crs: QgsCoordinateReferenceSystem,
+            fields: Union[QgsFields, None] = None,
     ):
         dialog_title = "Save Waypoint Layer As"
         # select file path of shp-file
@@ -580,8 +1254,9 @@ class CoverageModule:
         if not file_path:
             return
 
-        fields = QgsFields()
-        fields.append(QgsField(QGIS_FIELD_NAME_ID, QVariant.Int))
+        if fields is None:
+            fields = QgsFields()
+            fields.append(QgsField(QGIS_FIELD_NAME_ID, QVariant.Int))
 
         # create the File Writer
         writer = self.layer_utils.create_vector_file_write(
@@ -606,11 +1281,15 @@ class CoverageModule:
     ) -> Union[QgsVectorLayer, None]:
         """Generates an SHP-File for the sensor coverage lines"""
         path_suffix = f"_{sensor_name}_{flight_altitude}m_{overlap}overlap_coverage_lines.shp"
+        fields = QgsFields()
+        fields.append(QgsField(QGIS_FIELD_NAME_ID, QVariant.Int))
+        fields.append(QgsField(QGIS_FIELD_NAME_SOURCE_FID, QVariant.LongLong))
         writer_layer_tuple = self.generate_shp_file(
             current_layer_path,
             path_suffix,
             QgsWkbTypes.LineString,
-            crs
+            crs,
+            fields
         )
         if writer_layer_tuple is None:
             return
@@ -621,15 +1300,24 @@ class CoverageModule:
         return layer
 
     def compute_optimal_coverage_lines(self):
-        # load layer, feature, sensor, flight altitude and crs
+        """Computes the coverage lines of the selected polygons, or of all polygons if none is selected, in parallel
+        tasks and writes them to one line layer, referencing the polygon of every line"""
+        # load layer, features, sensor, flight altitude and crs
         layer = self.layer_utils.get_valid_selected_layer(
             [QgsWkbTypes.GeometryType.PolygonGeometry]
         )
         if layer is None:
             return
 
-        feature = self.layer_utils.get_selected_feature_from_layer(layer)
-        if feature is None:
+        features = [
+            feature for feature in (layer.selectedFeatures() or layer.getFeatures()) if feature.hasGeometry()
+        ]
+        if not features:
+            self.iface.messageBar().pushMessage(
+                "There are no features in the currently selected layer",
+                level=Qgis.Info,
+                duration=DEFAULT_PUSH_MESSAGE_DURATION,
+            )
             return
 
         sensor = self.sensor_combobox.currentText()
@@ -660,21 +1348,10 @@ class CoverageModule:
         coverage_crs = self.get_valid_coverage_crs()
         if coverage_crs is None:
             return
-        transform_to_coverage_crs = QgsCoordinateTransform(
-            crs, coverage_crs, QgsProject.instance()
-        )
-        transform_from_coverage_crs = QgsCoordinateTransform(
-            coverage_crs, crs, QgsProject.instance()
-        )
         flight_altitude = self.flight_altitude_spinbox.value()
         coverage_range = self.compute_sensor_coverage_in_meters(
             sensor_opening_angle, flight_altitude
         )
-        if coverage_range <= 0:
-            return
-        coverage_range = self.compute_sensor_coverage_in_meters(
-            sensor_opening_angle, flight_altitude
-        )
         if coverage_range <= 0:
             return
 
@@ -688,71 +1365,81 @@ class CoverageModule:
         overlap = float(
             self.settings.value(PLUGIN_OVERLAP_SETTINGS_PATH, default_overlap)
         )
-        overlap_factor = 1 - overlap
-        # create bounding box and extract its corners
-        geometry = QgsGeometry(feature.geometry())
-        geometry.transform(transform_to_coverage_crs)
-        bounding_box = geometry.orientedMinimumBoundingBox()[0].asPolygon()
-        bottom_right = bounding_box[0][0]
-        top_right = bounding_box[0][1]
-        top_left = bounding_box[0][2]
-        bottom_left = bounding_box[0][3]
-
-        # compute vector along which the flight lines are placed
-        vertical_vec = QgsVector(
-            bottom_left.x() - top_left.x(), bottom_left.y() - top_left.y()
-        )
-        horizontal_vec = QgsVector(
-            bottom_left.x() - bottom_right.x(), bottom_left.y() - bottom_right.y()
-        )
-        draw_horizontal_lines = horizontal_vec.length() > vertical_vec.length()
-        if int(self.settings.value(PLUGIN_OVERLAP_ROTATION_SETTINGS_PATH, 0)):
-            draw_horizontal_lines = not draw_horizontal_lines
-        if draw_horizontal_lines:
-            vec = vertical_vec
-            vec_normalized = vec.normalized()
-            point_start = top_left
-            point_end = top_right
-        else:
-            vec = horizontal_vec
-            vec_normalized = vec.normalized() * -1
-            point_start = top_left
-            point_end = bottom_left
+        line_orientation = int(
+            self.settings.value(PLUGIN_OVERLAP_ROTATION_SETTINGS_PATH, self.LINE_ORIENTATION_BOUNDING_BOX)
+        )
+        margin = float(self.settings.value(PLUGIN_LINE_MARGIN_SETTINGS_PATH, 0)) * unit_factor
+        decompose = self.settings.value(PLUGIN_CELL_DECOMPOSITION_SETTINGS_PATH, False, type=bool)
 
         # generate lines and write to .shp file
         line_layer = self.generate_lines_shp_file(
             layer.dataProvider().dataSourceUri(),
             flight_altitude,
             overlap,
-            layer.crs(),
+            crs,
             sensor,
         )
         if line_layer is None:
             return
-        i = 1
-        while True:
-            distance = 2 * coverage_range * overlap_factor * i - coverage_range
-            if distance > vec.length() + coverage_range:
-                break
 
-            line_end = transform_from_coverage_crs.transform(
-                QgsPointXY(
-                    point_end.x() + vec_normalized.x() * distance,
-                    point_end.y() + vec_normalized.y() * distance,
-                )
+        if self.coverage_lines_batch is not None:
+            self.coverage_lines_batch.cancel()
+        transform_context = QgsProject.instance().transformContext()
+        tasks = [
+            CoverageLinesTask(
+                feature.id(),
+                QgsGeometry(feature.geometry()),
+                crs,
+                coverage_crs,
+                coverage_range,
+                overlap,
+                line_orientation,
+                transform_context,
+                margin,
+                decompose,
             )
-
-            line_start = transform_from_coverage_crs.transform(
-                QgsPointXY(
-                    point_start.x() + vec_normalized.x() * distance,
-                    point_start.y() + vec_normalized.y() * distance,
-                )
+            for feature in features
+        ]
+        batch = TaskBatch(self.iface, "Coverage lines", tasks, "polygons")
+        self.coverage_lines_batch = batch
+        # lines of every polygon by feature id, written to the layer at once when all tasks are finished
+        lines = {}
+        for task in tasks:
+            task.taskCompleted.connect(
+                partial(self.coverage_lines_finished, batch, task, True, lines, line_layer, flight_altitude)
             )
-            line = QgsGeometry.fromPolyline([QgsPoint(line_start), QgsPoint(line_end)])
-            f = QgsFeature(i)
-            f.setGeometry(line)
-            line_layer.dataProvider().addFeature(f)
-            i += 1
+            task.taskTerminated.connect(
+                partial(self.coverage_lines_finished, batch, task, False, lines, line_layer, flight_altitude)
+            )
+            QgsApplication.taskManager().addTask(task)
+
+    def coverage_lines_finished(
+        self,
+        batch: TaskBatch,
+        task: CoverageLinesTask,
+        successful: bool,
+        lines: Dict[int, List[QgsGeometry]],
+        line_layer: QgsVectorLayer,
+        flight_altitude: int,
+    ):
+        """Collects the lines of a finished polygon and writes the lines of all polygons in one bulk operation once
+        the last task of the batch is finished"""
+        if batch is not self.coverage_lines_batch:
+            return
+        if successful:
+            lines[task.feature_id] = task.lines
+        if not batch.task_finished(successful):
+            return
+        self.coverage_lines_batch = None
+
+        features = []
+        for batch_task in batch.tasks:
+            for line in lines.get(batch_task.feature_id, []):
+                feature = QgsFeature(line_layer.fields())
+                feature.setGeometry(line)
+                feature.setAttributes([len(features) + 1, batch_task.feature_id])
+                features.append(feature)
+        line_layer.dataProvider().addFeatures(features)
         line_layer.reload()
         QgsExpressionContextUtils.setLayerVariable(
             line_layer,
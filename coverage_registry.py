@@ -0,0 +1,86 @@
+import json
+from typing import Dict, Iterable, List, Tuple, Union
+
+
+class CoverageLayerRegistry:
+    """Maps path layers to their sensor coverage layers and back. Both directions are indexed, so looking up the
+    coverage layers of a path layer or the path layer of a coverage layer doesn't touch the project. The registry is
+    stored in the project as JSON."""
+
+    def __init__(self) -> None:
+        # path layer id -> sensor -> coverage layer id
+        self.coverage_layers: Dict[str, Dict[str, str]] = {}
+        # coverage layer id -> (path layer id, sensor)
+        self.path_layers: Dict[str, Tuple[str, str]] = {}
+
+    def register(self, path_layer_id: str, sensor: str, coverage_layer_id: str) -> None:
+        """Registers the coverage layer of a sensor for a path layer, replacing an earlier coverage layer"""
+        previous_coverage_layer_id = self.coverage_layers.get(path_layer_id, {}).get(sensor)
+        if previous_coverage_layer_id is not None:
+            self.path_layers.pop(previous_coverage_layer_id, None)
+        if coverage_layer_id in self.path_layers:
+            self.unregister_coverage_layer(coverage_layer_id)
+
+        self.coverage_layers.setdefault(path_layer_id, {})[sensor] = coverage_layer_id
+        self.path_layers[coverage_layer_id] = (path_layer_id, sensor)
+
+    def unregister_coverage_layer(self, coverage_layer_id: str) -> None:
+        path_layer_id, sensor = self.path_layers.pop(coverage_layer_id, (None, None))
+        if path_layer_id is None:
+            return
+        sensors = self.coverage_layers[path_layer_id]
+        del sensors[sensor]
+        if not sensors:
+            del self.coverage_layers[path_layer_id]
+
+    def unregister_path_layer(self, path_layer_id: str) -> None:
+        for coverage_layer_id in self.coverage_layers.pop(path_layer_id, {}).values():
+            self.path_layers.pop(coverage_layer_id, None)
+
+    def remove_layers(self, layer_ids: Iterable[str]) -> bool:
+        """Removes all entries of the given layers, whether path or coverage layers. Returns whether the registry
+        changed."""
+        changed = False
+        for layer_id in layer_ids:
+            if layer_id in self.coverage_layers:
+                self.unregister_path_layer(layer_id)
+                changed = True
+            if layer_id in self.path_layers:
+                self.unregister_coverage_layer(layer_id)
+                changed = True
+        return changed
+
+    def get_coverage_layers(self, path_layer_id: str) -> Dict[str, str]:
+        """Returns a copy of the sensors and corresponding coverage layer ids of a path layer"""
+        return dict(self.coverage_layers.get(path_layer_id, {}))
+
+    def get_path_layer(self, coverage_layer_id: str) -> Union[str, None]:
+        """Returns the id of the path layer of a coverage layer or None if it isn't a registered coverage layer"""
+        path_layer_id, _ = self.path_layers.get(coverage_layer_id, (None, None))
+        return path_layer_id
+
+    def path_layer_ids(self) -> List[str]:
+        return list(self.coverage_layers)
+
+    def clear(self) -> None:
+        self.coverage_layers.clear()
+        self.path_layers.clear()
+
+    def to_json(self) -> str:
+        return json.dumps(self.coverage_layers, sort_keys=True)
+
+    def load_json(self, text: str) -> None:
+        """Replaces the entries by those of a registry stored with to_json, invalid entries are skipped"""
+        self.clear()
+        try:
+            coverage_layers = json.loads(text) if text else {}
+        except ValueError:
+            return
+        if not isinstance(coverage_layers, dict):
+            return
+        for path_layer_id, sensors in coverage_layers.items():
+            if not isinstance(sensors, dict):
+                continue
+            for sensor, coverage_layer_id in sensors.items():
+                if isinstance(coverage_layer_id, str):
+                    self.register(path_layer_id, sensor, coverage_layer_id)
@@ -4,15 +4,13 @@ import tempfile
 from qgis.PyQt.QtCore import QVariant
 from qgis.core import (
     QgsCoordinateReferenceSystem,
-    QgsCoordinateTransform,
-    QgsProject,
     QgsWkbTypes
 )
 from qgis.gui import QgisInterface
 
 from .libs.garmin_fpl import wpt_to_gfp_20230704, DEC2DMM_20230704
 from .constants import QGIS_FIELD_NAME_TAG, QGIS_FIELD_NAME_ID, DEFAULT_TAG
-from .utils import LayerUtils
+from .utils import LayerUtils, transform_coordinates
 
 
 TEMP_FILE_SUFFIX = "wp_DDM.wpt"
@@ -37,20 +35,21 @@ def pad_with_zeros(number, expected_decimal_places):
 
 
 def shapefile_to_wpt(selected_layer, file_path):
-    source_crs = selected_layer.crs()
-    destination_crs = QgsCoordinateReferenceSystem("EPSG:4326")
-    crs_translator = QgsCoordinateTransform(
-        source_crs, destination_crs, QgsProject.instance()
+    features = list(selected_layer.getFeatures())
+    points = [f.geometry().asPoint() for f in features]
+    longitudes, latitudes = transform_coordinates(
+        [point.x() for point in points],
+        [point.y() for point in points],
+        selected_layer.crs(),
+        QgsCoordinateReferenceSystem("EPSG:4326"),
     )
 
     with open(file_path, "w") as file:
-        for f in selected_layer.getFeatures():
+        for f, longitude, latitude in zip(features, longitudes.tolist(), latitudes.tolist()):
             id = "{:02d}".format(f.attribute(QGIS_FIELD_NAME_ID))
             comment = f.attribute(QGIS_FIELD_NAME_TAG)
-            point = f.geometry().asPoint()
-            transformed_point = crs_translator.transform(point)
-            latitude = round(transformed_point.y(), 9)
-            longitude = round(transformed_point.x(), 8)
+            latitude = round(latitude, 9)
+            longitude = round(longitude, 8)
             latitude_padded = pad_with_zeros(latitude, 9)
             longitude_padded = pad_with_zeros(longitude, 8)
 
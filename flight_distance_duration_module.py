@@ -2,9 +2,7 @@ from typing import List, Union
 
 from qgis.core import (
     Qgis,
-    QgsExpression,
-    QgsExpressionContext,
-    QgsExpressionContextUtils,
+    QgsCoordinateReferenceSystem,
     QgsProject,
     QgsSettings,
     QgsUnitTypes,
@@ -19,7 +17,8 @@ from .constants import (
     PLUGIN_NAME,
     DEFAULT_PUSH_MESSAGE_DURATION
 )
-from .utils import LayerUtils
+from . import geodesic
+from .utils import LayerUtils, transform_coordinates
 
 
 class FlightDistanceDurationModule:
@@ -88,22 +87,27 @@ class FlightDistanceDurationModule:
             )
             return 0
 
-        # Needs to be done because QGIS does not consider the distance unit setting
-        # when evaluating the "$length" expression in a language except english
-        project_distance_unit = QgsProject.instance().distanceUnits()
-        QgsProject.instance().setDistanceUnits(QgsUnitTypes.DistanceUnit.DistanceMeters)
-        context = QgsExpressionContext()
-        context.appendScopes(QgsExpressionContextUtils.globalProjectLayerScopes(layer))
-        context.setFeature(feature)
+        wgs84 = QgsCoordinateReferenceSystem("EPSG:4326")
+        geometry = feature.geometry()
+        if QgsWkbTypes.isSingleType(geometry.wkbType()):
+            parts = [geometry.asPolyline()]
+        else:
+            parts = geometry.asMultiPolyline()
+
+        length = 0
+        for part in parts:
+            if len(part) < 2:
+                continue
+            lons, lats = transform_coordinates(
+                [point.x() for point in part], [point.y() for point in part], layer.crs(), wgs84
+            )
+            length += geodesic.legs(lons, lats).cumulative[-1]
 
         unit_factor = QgsUnitTypes.fromUnitToUnitFactor(
             QgsUnitTypes.DistanceUnit.DistanceMeters,
             QgsUnitTypes.DistanceUnit.DistanceKilometers,
         )
-
-        length = QgsExpression("$length").evaluate(context) * unit_factor
-        QgsProject.instance().setDistanceUnits(project_distance_unit)
-        return length
+        return length * unit_factor
 
     def compute_flight_duration(
         self, layer: QgsVectorLayer, feature_id: int, flight_speed: float
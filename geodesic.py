@@ -0,0 +1,210 @@
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+# WGS84 ellipsoid
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+
+MAX_ITERATIONS = 200
+CONVERGENCE_TOLERANCE = 1e-12
+
+
+class GeodesicLegs(NamedTuple):
+    lengths: np.ndarray  # length of every leg in m
+    cumulative: np.ndarray  # distance of every vertex from the first vertex in m
+    azimuths: np.ndarray  # initial azimuth of every leg in degrees clockwise from north
+
+
+class DensifiedLine(NamedTuple):
+    lons: np.ndarray
+    lats: np.ndarray
+    distances: np.ndarray  # distance of every point from the first vertex in m
+    leg_indices: np.ndarray  # index of the leg every point belongs to
+    azimuths: np.ndarray  # azimuth of the line at every point in degrees clockwise from north
+
+
+def _reduced_latitude(lat: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns sine and cosine of the reduced latitude for latitudes in radians"""
+    u = np.arctan((1 - WGS84_F) * np.tan(lat))
+    return np.sin(u), np.cos(u)
+
+
+def _vincenty_coefficients(cos2_alpha: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the series coefficients A and B of Vincenty's formulae"""
+    u2 = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+    a = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    b = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    return a, b
+
+
+def _delta_sigma(b, sin_sigma, cos_sigma, cos_2sigma_m):
+    return b * sin_sigma * (
+        cos_2sigma_m + b / 4 * (
+            cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+            - b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sigma_m ** 2)
+        )
+    )
+
+
+def inverse(
+        lat1: np.ndarray,
+        lon1: np.ndarray,
+        lat2: np.ndarray,
+        lon2: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Solves the inverse geodesic problem on the WGS84 ellipsoid with Vincenty's formulae for arrays of point pairs
+    (in degrees). Returns the distances in m and the azimuths at both points in degrees clockwise from north.
+    Nearly antipodal points, for which the iteration does not converge, get the result of the last iteration."""
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in (lat1, lon1, lat2, lon2))
+    )
+    sin_u1, cos_u1 = _reduced_latitude(np.radians(lat1))
+    sin_u2, cos_u2 = _reduced_latitude(np.radians(lat2))
+    longitude_difference = np.radians((lon2 - lon1 + 180) % 360 - 180)
+
+    lam = longitude_difference
+    for _ in range(MAX_ITERATIONS):
+        sin_lam = np.sin(lam)
+        cos_lam = np.cos(lam)
+        sin_sigma = np.hypot(cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam)
+        cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+        sigma = np.arctan2(sin_sigma, cos_sigma)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sin_alpha = np.where(sin_sigma == 0, 0.0, cos_u1 * cos_u2 * sin_lam / sin_sigma)
+            cos2_alpha = 1 - sin_alpha ** 2
+            # equatorial lines have cos2_alpha = 0
+            cos_2sigma_m = np.where(cos2_alpha == 0, 0.0, cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha)
+        c = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+        previous_lam = lam
+        lam = longitude_difference + (1 - c) * WGS84_F * sin_alpha * (
+            sigma + c * sin_sigma * (cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2))
+        )
+        if np.all(np.abs(lam - previous_lam) < CONVERGENCE_TOLERANCE):
+            break
+
+    a, b = _vincenty_coefficients(cos2_alpha)
+    distance = WGS84_B * a * (sigma - _delta_sigma(b, sin_sigma, cos_sigma, cos_2sigma_m))
+
+    sin_lam = np.sin(lam)
+    cos_lam = np.cos(lam)
+    azimuth1 = np.degrees(np.arctan2(cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam)) % 360
+    azimuth2 = np.degrees(np.arctan2(cos_u1 * sin_lam, -sin_u1 * cos_u2 + cos_u1 * sin_u2 * cos_lam)) % 360
+    return distance, azimuth1, azimuth2
+
+
+def direct(
+        lat1: np.ndarray,
+        lon1: np.ndarray,
+        azimuth1: np.ndarray,
+        distance: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Solves the direct geodesic problem on the WGS84 ellipsoid with Vincenty's formulae for arrays of start points
+    (in degrees), azimuths (in degrees clockwise from north) and distances (in m). Returns the latitudes and
+    longitudes of the end points and the azimuths at the end points."""
+    lat1, lon1, azimuth1, distance = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in (lat1, lon1, azimuth1, distance))
+    )
+    alpha1 = np.radians(azimuth1)
+    sin_alpha1 = np.sin(alpha1)
+    cos_alpha1 = np.cos(alpha1)
+    sin_u1, cos_u1 = _reduced_latitude(np.radians(lat1))
+
+    sigma1 = np.arctan2(sin_u1 / cos_u1, cos_alpha1)
+    sin_alpha = cos_u1 * sin_alpha1
+    cos2_alpha = 1 - sin_alpha ** 2
+    a, b = _vincenty_coefficients(cos2_alpha)
+
+    sigma = distance / (WGS84_B * a)
+    for _ in range(MAX_ITERATIONS):
+        cos_2sigma_m = np.cos(2 * sigma1 + sigma)
+        previous_sigma = sigma
+        sigma = distance / (WGS84_B * a) + _delta_sigma(b, np.sin(sigma), np.cos(sigma), cos_2sigma_m)
+        if np.all(np.abs(sigma - previous_sigma) < CONVERGENCE_TOLERANCE):
+            break
+
+    sin_sigma = np.sin(sigma)
+    cos_sigma = np.cos(sigma)
+    cos_2sigma_m = np.cos(2 * sigma1 + sigma)
+    tmp = sin_u1 * sin_sigma - cos_u1 * cos_sigma * cos_alpha1
+    lat2 = np.arctan2(
+        sin_u1 * cos_sigma + cos_u1 * sin_sigma * cos_alpha1,
+        (1 - WGS84_F) * np.hypot(sin_alpha, tmp)
+    )
+    lam = np.arctan2(sin_sigma * sin_alpha1, cos_u1 * cos_sigma - sin_u1 * sin_sigma * cos_alpha1)
+    c = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+    longitude_difference = lam - (1 - c) * WGS84_F * sin_alpha * (
+        sigma + c * sin_sigma * (cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2))
+    )
+    lon2 = (lon1 + np.degrees(longitude_difference) + 180) % 360 - 180
+    azimuth2 = np.degrees(np.arctan2(sin_alpha, -tmp)) % 360
+    return np.degrees(lat2), lon2, azimuth2
+
+
+def legs(lons: np.ndarray, lats: np.ndarray) -> GeodesicLegs:
+    """Returns the lengths, cumulative distances and initial azimuths of the legs of a line given by its vertices"""
+    lons = np.asarray(lons, dtype=np.float64)
+    lats = np.asarray(lats, dtype=np.float64)
+    lengths, azimuths, _ = inverse(lats[:-1], lons[:-1], lats[1:], lons[1:])
+    cumulative = np.concatenate(([0.0], np.cumsum(lengths)))
+    return GeodesicLegs(lengths, cumulative, azimuths)
+
+
+def densify(lons: np.ndarray, lats: np.ndarray, interval: float) -> DensifiedLine:
+    """Returns points every interval meters along the geodesic legs of a line, starting at every vertex. The end of
+    a leg is only contained as start of the next leg, the last vertex of the line is always included."""
+    lons = np.asarray(lons, dtype=np.float64)
+    lats = np.asarray(lats, dtype=np.float64)
+    geodesic_legs = legs(lons, lats)
+
+    points_per_leg = np.maximum(np.ceil(geodesic_legs.lengths / interval).astype(np.int64), 1)
+    leg_indices = np.repeat(np.arange(len(points_per_leg)), points_per_leg)
+    steps = np.arange(len(leg_indices)) - np.repeat(np.cumsum(points_per_leg) - points_per_leg, points_per_leg)
+    offsets = steps * interval
+
+    point_lats, point_lons, point_azimuths = direct(
+        lats[leg_indices], lons[leg_indices], geodesic_legs.azimuths[leg_indices], offsets
+    )
+
+    return DensifiedLine(
+        np.append(point_lons, lons[-1]),
+        np.append(point_lats, lats[-1]),
+        np.append(geodesic_legs.cumulative[leg_indices] + offsets, geodesic_legs.cumulative[-1]),
+        np.append(leg_indices, len(points_per_leg) - 1),
+        # the azimuth at the last vertex is approximated by the one of the previous point
+        np.append(point_azimuths, point_azimuths[-1]),
+    )
+
+
+def _walk(lats, lons, azimuths, distances):
+    """Moves from the given points along the given azimuths by signed distances (negative distances walk backwards)
+    and returns the end points with the azimuth in the original walking direction"""
+    backwards = distances < 0
+    end_lats, end_lons, end_azimuths = direct(
+        lats, lons, np.where(backwards, azimuths + 180, azimuths) % 360, np.abs(distances)
+    )
+    return end_lats, end_lons, np.where(backwards, end_azimuths + 180, end_azimuths) % 360
+
+
+def offset_grid(
+        lons: np.ndarray,
+        lats: np.ndarray,
+        azimuths: np.ndarray,
+        along_offsets: np.ndarray,
+        cross_offsets: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns a grid of points around every point of a line. Every grid point is reached by walking along_offset
+    meters along the line and then cross_offset meters perpendicular to it (positive to the right). The result
+    arrays have one row per line point and len(along_offsets) * len(cross_offsets) columns."""
+    lons = np.asarray(lons, dtype=np.float64)[:, None, None]
+    lats = np.asarray(lats, dtype=np.float64)[:, None, None]
+    azimuths = np.asarray(azimuths, dtype=np.float64)[:, None, None]
+    along_offsets = np.asarray(along_offsets, dtype=np.float64)[None, :, None]
+    cross_offsets = np.asarray(cross_offsets, dtype=np.float64)[None, None, :]
+
+    along_lats, along_lons, along_azimuths = _walk(lats, lons, azimuths, along_offsets)
+    grid_lats, grid_lons, _ = _walk(along_lats, along_lons, along_azimuths + 90, cross_offsets)
+
+    shape = (lons.shape[0], along_offsets.shape[1] * cross_offsets.shape[2])
+    return grid_lons.reshape(shape), grid_lats.reshape(shape)
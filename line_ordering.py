@@ -0,0 +1,306 @@
+import time
+from dataclasses import dataclass
+from typing import Tuple, Union
+
+import numpy as np
+
+from qgis.core import QgsFeedback
+
+
+@dataclass
+class LineGrid:
+    """Parallel flight lines given by the start and end point of every line as (n, 2) arrays, ordered along the
+    vector the lines are offset by"""
+    starts: np.ndarray
+    ends: np.ndarray
+
+    @classmethod
+    def from_sweep(
+            cls,
+            point_start: np.ndarray,
+            point_end: np.ndarray,
+            vec_normalized: np.ndarray,
+            line_spacing: float,
+            coverage_range: float,
+            number_of_lines: int,
+    ) -> "LineGrid":
+        """Returns the lines from point_start to point_end offset along vec_normalized, the first line lies half a
+        swath inside of the box"""
+        distances = line_spacing * np.arange(1, number_of_lines + 1) - coverage_range
+        offsets = np.outer(distances, np.asarray(vec_normalized, dtype=np.float64))
+        return cls(
+            np.asarray(point_start, dtype=np.float64) + offsets,
+            np.asarray(point_end, dtype=np.float64) + offsets,
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def waypoints(self, order: np.ndarray, backward: Union[np.ndarray, None] = None) -> np.ndarray:
+        """Returns the start and end point of every line in the visiting order as (2n, 2) array. The lines flagged
+        as backward are flown from their end to their start, by default the direction alternates and the first
+        line is flown from its start to its end."""
+        order = np.asarray(order, dtype=int)
+        if backward is None:
+            forward = (np.arange(len(order)) % 2 == 0)[:, None]
+        else:
+            forward = ~np.asarray(backward, dtype=bool)[:, None]
+        starts = self.starts[order]
+        ends = self.ends[order]
+        return np.stack((np.where(forward, starts, ends), np.where(forward, ends, starts)), axis=1).reshape(-1, 2)
+
+
+def max_flyover(max_turn_distance: float, line_spacing: float) -> int:
+    """Returns the number of lines skipped at most by a turn, a turn always reaches at least the adjacent line"""
+    return max(1, int(np.floor(max_turn_distance / line_spacing)))
+
+
+def racetrack_order(number_of_lines: int, flyover: int) -> np.ndarray:
+    """Returns the visiting order of the lines as permutation of their indices for racetracks. Blocks of
+    2 * flyover - 1 lines are flown by alternately jumping flyover lines forward and flyover - 1 lines back, the
+    remaining lines at the end are flown from the outside in."""
+    order = []
+    forward = True
+    j = 1
+    inner_iteration = 0
+
+    while len(order) < number_of_lines:
+        order.append(j)
+        if forward:
+            if j + flyover > number_of_lines:
+                break
+            j += flyover
+            inner_iteration += 1
+            if ((j - 1) / (2.0 * flyover - 1.0)) % 1.0 != 0.0:
+                forward = False
+            else:
+                inner_iteration = 0
+        else:
+            j = j - flyover + 1
+            inner_iteration += 1
+            forward = True
+
+    if len(order) < number_of_lines:
+        if inner_iteration == 0:
+            remaining_tracks = number_of_lines - j
+        else:
+            remaining_tracks = int((2 * flyover - inner_iteration - 2) / 2)
+        for _ in range(remaining_tracks):
+            j = j + remaining_tracks if forward else j - remaining_tracks
+            order.append(j)
+            remaining_tracks -= 1
+            forward = not forward
+
+    return np.array(order, dtype=int) - 1
+
+
+def meander_order(number_of_lines: int, flyover: int) -> np.ndarray:
+    """Returns the visiting order of the lines as permutation of their indices for meanders. The lines are flown by
+    jumping flyover lines forward up to the end of the grid and coming back in between, starting from the lines
+    closest to the first one."""
+    order = []
+    forward = True
+    j = 1
+    line_from_bottom = 2
+
+    for _ in range(number_of_lines):
+        order.append(j)
+        if forward:
+            if j + flyover <= number_of_lines:
+                j += flyover
+            elif j + 1 <= number_of_lines:
+                j += 1
+                forward = False
+            else:
+                j = j + 1 - flyover
+                forward = False
+        elif j == line_from_bottom:
+            forward = True
+            j += 1
+            line_from_bottom += 2
+        elif j - flyover < line_from_bottom:
+            j = line_from_bottom
+            line_from_bottom += 1
+            forward = True
+        else:
+            j -= flyover
+
+    return np.array(order, dtype=int) - 1
+
+
+def transit_lengths(waypoints: np.ndarray) -> np.ndarray:
+    """Returns the straight distance of every transit between two lines of waypoints as returned by
+    LineGrid.waypoints"""
+    waypoints = np.asarray(waypoints, dtype=np.float64).reshape(-1, 2)
+    return np.hypot(*(waypoints[2::2] - waypoints[1:-1:2]).T)
+
+
+def transit_cost_matrix(grid: LineGrid, min_turn_distance: float) -> np.ndarray:
+    """Returns the costs of flying from one line to another as (2n, 2n) matrix. Node 2 * i stands for flying line i
+    from its start to its end, node 2 * i + 1 for the opposite direction. A transit between lines flown in opposite
+    directions is a turn, which is only possible if the lines are at least min_turn_distance apart, otherwise its
+    cost is infinite. A transit between lines flown in the same direction needs a full loop of that width."""
+    entries = np.empty((2 * len(grid), 2))
+    entries[0::2] = grid.starts
+    entries[1::2] = grid.ends
+    exits = np.empty_like(entries)
+    exits[0::2] = grid.ends
+    exits[1::2] = grid.starts
+    headings = exits - entries
+    lengths = np.hypot(headings[:, 0], headings[:, 1])
+    headings = np.divide(headings, lengths[:, None], out=np.zeros_like(headings), where=lengths[:, None] > 0)
+
+    transits = entries[None, :, :] - exits[:, None, :]
+    costs = np.hypot(transits[:, :, 0], transits[:, :, 1])
+    # distance across the heading of the line the transit starts from
+    lateral = np.abs(headings[:, None, 0] * transits[:, :, 1] - headings[:, None, 1] * transits[:, :, 0])
+    turn = (headings @ headings.T) < 0
+    costs[turn & (lateral < min_turn_distance)] = np.inf
+    costs[~turn] += np.pi * min_turn_distance
+    # a line can't follow itself
+    line_of_node = np.arange(2 * len(grid)) // 2
+    costs[line_of_node[:, None] == line_of_node[None, :]] = np.inf
+    return costs
+
+
+def _stopped(deadline: float, feedback: Union[QgsFeedback, None]) -> bool:
+    """Returns whether the time budget is used up or the ordering was canceled"""
+    return time.monotonic() > deadline or (feedback is not None and feedback.isCanceled())
+
+
+def tour_cost(costs: np.ndarray, tour: np.ndarray) -> float:
+    """Returns the total transit cost of the tour given as sequence of nodes"""
+    return float(costs[tour[:-1], tour[1:]].sum())
+
+
+def _nearest_neighbour_tour(costs: np.ndarray, start: int) -> np.ndarray:
+    """Builds a tour by always flying to the cheapest line not visited yet"""
+    number_of_lines = len(costs) // 2
+    visited = np.zeros(number_of_lines, dtype=bool)
+    tour = np.empty(number_of_lines, dtype=int)
+    node = start
+    for i in range(number_of_lines):
+        tour[i] = node
+        visited[node // 2] = True
+        if i == number_of_lines - 1:
+            break
+        row = np.where(np.repeat(visited, 2), np.inf, costs[node])
+        node = int(np.argmin(row))
+    return tour
+
+
+def _two_opt(
+        costs: np.ndarray, tour: np.ndarray, deadline: float, feedback: Union[QgsFeedback, None] = None
+) -> bool:
+    """Applies the best improving reversal of a part of the tour for every start position. Reversing a part flips
+    the direction of its lines, which keeps the costs within the part. Returns whether the tour was improved."""
+    improved = False
+    n = len(tour)
+    for i in range(n):
+        if _stopped(deadline, feedback):
+            break
+        # a part of a single line just flips its direction
+        k = np.arange(i, n)
+        # removed and added transits at both ends of the reversed part tour[i:k + 1]
+        delta = np.zeros(len(k))
+        if i > 0:
+            delta += costs[tour[i - 1], tour[k] ^ 1] - costs[tour[i - 1], tour[i]]
+        inner = k < n - 1
+        following = tour[k[inner] + 1]
+        delta[inner] += costs[tour[i] ^ 1, following] - costs[tour[k[inner]], following]
+        best = int(np.argmin(delta))
+        if delta[best] < -1e-9:
+            tour[i:k[best] + 1] = tour[i:k[best] + 1][::-1] ^ 1
+            improved = True
+    return improved
+
+
+def _or_opt(
+        costs: np.ndarray,
+        tour: np.ndarray,
+        deadline: float,
+        feedback: Union[QgsFeedback, None] = None,
+        max_segment_length: int = 3,
+) -> Tuple[np.ndarray, bool]:
+    """Moves parts of up to max_segment_length lines to the best other position of the tour, reversed if cheaper.
+    Returns the tour and whether it was improved."""
+    improved = False
+    i = 0
+    while i < len(tour):
+        if _stopped(deadline, feedback):
+            break
+        moved = False
+        for length in range(1, max_segment_length + 1):
+            if i + length > len(tour) or length == len(tour):
+                break
+            segment = tour[i:i + length]
+            rest = np.concatenate((tour[:i], tour[i + length:]))
+            first, last = segment[0], segment[-1]
+            flipped_first, flipped_last = last ^ 1, first ^ 1
+
+            # saving of taking the segment out
+            removal = 0.0
+            if i > 0:
+                removal += costs[tour[i - 1], first]
+            if i + length < len(tour):
+                removal += costs[last, tour[i + length]]
+            if 0 < i < len(rest):
+                removal -= costs[tour[i - 1], tour[i + length]]
+
+            # cost of inserting the segment in front of rest[j], j == len(rest) appends it
+            insertion = np.zeros(len(rest) + 1)
+            insertion_flipped = np.zeros(len(rest) + 1)
+            insertion[:-1] += costs[last, rest]
+            insertion_flipped[:-1] += costs[flipped_last, rest]
+            insertion[1:] += costs[rest, first]
+            insertion_flipped[1:] += costs[rest, flipped_first]
+            with np.errstate(invalid="ignore"):
+                insertion[1:-1] -= costs[rest[:-1], rest[1:]]
+                insertion_flipped[1:-1] -= costs[rest[:-1], rest[1:]]
+                delta = insertion - removal
+                delta_flipped = insertion_flipped - removal
+            # moves resolving an infeasible transit by another one are undefined, inserting the segment at its old
+            # position unflipped is no move
+            delta[np.isnan(delta)] = np.inf
+            delta_flipped[np.isnan(delta_flipped)] = np.inf
+            delta[i] = np.inf
+
+            j, flip = int(np.argmin(delta)), False
+            if delta_flipped.min() < delta[j]:
+                j, flip = int(np.argmin(delta_flipped)), True
+            if (delta_flipped[j] if flip else delta[j]) < -1e-9:
+                segment = segment[::-1] ^ 1 if flip else segment
+                tour = np.concatenate((rest[:j], segment, rest[j:]))
+                improved = moved = True
+                break
+        if not moved:
+            i += 1
+    return tour, improved
+
+
+def shortest_transit_order(
+        grid: LineGrid,
+        min_turn_distance: float,
+        time_budget: float = 5.0,
+        feedback: Union[QgsFeedback, None] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the visiting order of the lines and a flag per visited line whether it is flown backward, such that the
+    total transit is as short as possible without turns narrower than min_turn_distance. The order is treated as an
+    asymmetric travelling salesman path: nearest neighbour tours from the corner lines are improved by 2-opt and
+    Or-opt moves until no move improves it, the time budget in seconds is used up or the feedback is canceled.
+
+    The cost matrix takes memory quadratic in the number of lines, about 160 MB for 1000 lines."""
+    number_of_lines = len(grid)
+    if number_of_lines == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=bool)
+    deadline = time.monotonic() + time_budget
+    costs = transit_cost_matrix(grid, min_turn_distance)
+
+    starts = {0, 1, 2 * number_of_lines - 2, 2 * number_of_lines - 1}
+    tour = min((_nearest_neighbour_tour(costs, start) for start in starts), key=lambda t: tour_cost(costs, t))
+    improved = True
+    while improved and not _stopped(deadline, feedback):
+        improved = _two_opt(costs, tour, deadline, feedback)
+        tour, or_opt_improved = _or_opt(costs, tour, deadline, feedback)
+        improved = improved or or_opt_improved
+    return tour // 2, tour % 2 == 1
@@ -10,12 +10,17 @@ from .constants import (
     PLUGIN_SENSOR_SETTINGS_PATH,
     PLUGIN_OVERLAP_SETTINGS_PATH,
     PLUGIN_OVERLAP_ROTATION_SETTINGS_PATH,
+    PLUGIN_DEM_CACHE_SIZE_SETTINGS_PATH,
+    PLUGIN_COVERAGE_MODE_SETTINGS_PATH,
+    PLUGIN_LINE_MARGIN_SETTINGS_PATH,
+    PLUGIN_CELL_DECOMPOSITION_SETTINGS_PATH,
     PLUGIN_NAME,
     PLUGIN_ICON_PATH,
     DEFAULT_PUSH_MESSAGE_DURATION,
     PLUGIN_DIRECTORY_PATH
 )
 from .coverage_module import CoverageModule
+from .raster_sampling import BLOCK_CACHE, DEFAULT_BLOCK_CACHE_SIZE_MB
 from .flight_distance_duration_module import FlightDistanceDurationModule
 from .utils import show_checkable_info_message_box
 
@@ -104,10 +109,9 @@ class OptionsDialog(BASE, WIDGET):
                 self.settings.value(PLUGIN_OVERLAP_SETTINGS_PATH, default_overlap)
             )
         )
-        self.overlapComboBox.addItem("optimal")
-        self.overlapComboBox.addItem("90° rotated")
+        self.overlapComboBox.addItems(CoverageModule.LINE_ORIENTATIONS)
         self.overlapComboBox.setCurrentIndex(
-            int(self.settings.value(PLUGIN_OVERLAP_ROTATION_SETTINGS_PATH, 0))
+            int(self.settings.value(PLUGIN_OVERLAP_ROTATION_SETTINGS_PATH, CoverageModule.LINE_ORIENTATION_BOUNDING_BOX))
         )
         # self.overlapComboBox.currentText()
         self.sensors = self.settings.value(PLUGIN_SENSOR_SETTINGS_PATH, {})
@@ -123,6 +127,21 @@ class OptionsDialog(BASE, WIDGET):
         self.maxTurnDistanceSpinBox.setMaximum(100000)
         self.maxTurnDistanceSpinBox.setMinimum(0)
 
+        self.demCacheSizeSpinBox.setValue(
+            int(self.settings.value(PLUGIN_DEM_CACHE_SIZE_SETTINGS_PATH, DEFAULT_BLOCK_CACHE_SIZE_MB))
+        )
+
+        self.coverageModeComboBox.addItems(CoverageModule.COVERAGE_MODES)
+        self.coverageModeComboBox.setCurrentIndex(
+            int(self.settings.value(PLUGIN_COVERAGE_MODE_SETTINGS_PATH, CoverageModule.COVERAGE_MODE_BUFFER))
+        )
+        self.lineMarginSpinBox.setValue(
+            int(self.settings.value(PLUGIN_LINE_MARGIN_SETTINGS_PATH, 0))
+        )
+        self.cellDecompositionCheckBox.setChecked(
+            self.settings.value(PLUGIN_CELL_DECOMPOSITION_SETTINGS_PATH, False, type=bool)
+        )
+
     def load_sensor_table(self):
         """Creates the table on the settings page which allows to manage (add, delete, edit) sensors"""
         self.clear_sensor_table()
@@ -226,6 +245,19 @@ class OptionsDialog(BASE, WIDGET):
             "max_turn_distance",
             self.maxTurnDistanceSpinBox.value()
         )
+        self.settings.setValue(
+            PLUGIN_DEM_CACHE_SIZE_SETTINGS_PATH, self.demCacheSizeSpinBox.value()
+        )
+        BLOCK_CACHE.set_max_bytes(self.demCacheSizeSpinBox.value() * 1024 * 1024)
+        self.settings.setValue(
+            PLUGIN_COVERAGE_MODE_SETTINGS_PATH, self.coverageModeComboBox.currentIndex()
+        )
+        self.settings.setValue(
+            PLUGIN_LINE_MARGIN_SETTINGS_PATH, self.lineMarginSpinBox.value()
+        )
+        self.settings.setValue(
+            PLUGIN_CELL_DECOMPOSITION_SETTINGS_PATH, self.cellDecompositionCheckBox.isChecked()
+        )
         self.settings.setValue(PLUGIN_SENSOR_SETTINGS_PATH, self.sensors)
         self.coverage_module.set_sensor_combobox_entries()
         self.coverage_module.sensor_coverage_sensor_settings_changed()
\ No newline at end of file
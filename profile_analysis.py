@@ -0,0 +1,255 @@
+import hashlib
+import warnings
+from collections import OrderedDict
+from typing import List, NamedTuple, Tuple, Union
+
+import numpy as np
+
+DEFAULT_PROFILE_CACHE_SIZE = 16
+MAX_CORRIDOR_GRID_SIZE = 32  # maximum number of samples per axis of a corridor window
+
+
+def compute_danger_segments(
+        data_x: np.ndarray,
+        data_y: np.ndarray,
+        max_climbing_rate_meters: float,
+        flight_speed_kmh: float,
+) -> np.ndarray:
+    """Returns the parts of the profile in which the terrain rises faster than the aircraft can climb as array of
+    (first sample index, last sample index) rows. Adjacent dangerous sample pairs are merged into one segment."""
+    data_x = np.asarray(data_x, dtype=np.float64)
+    data_y = np.asarray(data_y, dtype=np.float64)
+    if len(data_x) < 2:
+        return np.empty((0, 2), dtype=np.int64)
+
+    flight_speed_meters_per_minute = flight_speed_kmh * 1000 / 60
+    max_height_gain = max_climbing_rate_meters * np.diff(data_x) / flight_speed_meters_per_minute
+    with np.errstate(invalid="ignore"):
+        is_dangerous = max_height_gain <= np.diff(data_y)
+
+    # rising/falling edges of the boolean mask mark the first and one past the last dangerous pair of each run
+    edges = np.diff(np.concatenate(([0], is_dangerous.astype(np.int8), [0])))
+    first_pairs = np.flatnonzero(edges == 1)
+    end_pairs = np.flatnonzero(edges == -1)
+    return np.column_stack((first_pairs, end_pairs)).astype(np.int64)
+
+
+def minimum_altitude_profile(
+        data_x: np.ndarray,
+        terrain_y: np.ndarray,
+        clearance_meters: float,
+        max_climbing_rate_meters: float,
+        max_descent_rate_meters: float,
+        flight_speed_kmh: float,
+) -> np.ndarray:
+    """Returns the lowest altitude profile that keeps the clearance above the terrain at every sample and never
+    climbs or descends faster than the given rates (in m/min) at the flight speed. A backward pass raises the profile
+    ahead of rising terrain, a forward pass keeps it from descending too fast behind peaks. Both passes are running
+    maxima, so the solver is linear in the number of samples. Samples without terrain are NaN."""
+    data_x = np.asarray(data_x, dtype=np.float64)
+    floor = np.asarray(terrain_y, dtype=np.float64) + clearance_meters
+    no_terrain = np.isnan(floor)
+    floor[no_terrain] = -np.inf
+    if len(data_x) == 0:
+        return floor
+
+    flight_speed_meters_per_minute = flight_speed_kmh * 1000 / 60
+    climb_gradient = max_climbing_rate_meters / flight_speed_meters_per_minute
+    descent_gradient = max_descent_rate_meters / flight_speed_meters_per_minute
+
+    # h[i] >= floor[j] - climb_gradient * (x[j] - x[i]) for all later samples j
+    climbing = np.maximum.accumulate((floor - climb_gradient * data_x)[::-1])[::-1] + climb_gradient * data_x
+    # h[i] >= h[j] - descent_gradient * (x[i] - x[j]) for all earlier samples j
+    altitudes = np.maximum.accumulate(climbing + descent_gradient * data_x) - descent_gradient * data_x
+
+    altitudes[no_terrain | np.isinf(altitudes)] = np.nan
+    return altitudes
+
+
+def segment_sample_indices(segments: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the sample indices of all segments concatenated together with the segment number of every index"""
+    lengths = segments[:, 1] - segments[:, 0] + 1
+    segment_numbers = np.repeat(np.arange(len(segments)), lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return segments[segment_numbers, 0] + offsets, segment_numbers
+
+
+def nan_separated_segments(
+        data_x: np.ndarray,
+        data_y: np.ndarray,
+        segments: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns x and y arrays of all segments separated by NaN, so they can be drawn by a single plot item"""
+    data_x = np.asarray(data_x, dtype=np.float64)
+    data_y = np.asarray(data_y, dtype=np.float64)
+    if len(segments) == 0:
+        return np.empty(0), np.empty(0)
+
+    sample_indices, segment_numbers = segment_sample_indices(segments)
+    # every segment is followed by one NaN entry
+    output_indices = np.arange(len(sample_indices)) + segment_numbers
+    size = len(sample_indices) + len(segments)
+    line_x = np.full(size, np.nan)
+    line_y = np.full(size, np.nan)
+    line_x[output_indices] = data_x[sample_indices]
+    line_y[output_indices] = data_y[sample_indices]
+    return line_x, line_y
+
+
+class DecimationPyramid:
+    """Min/max decimation pyramid of a profile. Level k summarizes bins of 2**k samples by the lowest and the highest
+    sample of each bin, so peaks and valleys survive any zoom level. The pyramid is built once in linear time."""
+
+    def __init__(self, data_x: np.ndarray, data_y: np.ndarray):
+        self.data_x = np.asarray(data_x, dtype=np.float64)
+        self.data_y = np.asarray(data_y, dtype=np.float64)
+
+        # every level stores (x of minimum, minimum, x of maximum, maximum) per bin
+        self.levels = [(self.data_x, self.data_y, self.data_x, self.data_y)]
+        while len(self.levels[-1][0]) > 1:
+            self.levels.append(self._reduce(*self.levels[-1]))
+
+    @staticmethod
+    def _reduce(min_x, min_y, max_x, max_y):
+        """Combines pairs of neighbouring bins of a level into the bins of the next level"""
+        if len(min_x) % 2:
+            min_x, min_y, max_x, max_y = (
+                np.append(min_x, np.nan), np.append(min_y, np.nan), np.append(max_x, np.nan), np.append(max_y, np.nan)
+            )
+        left_min_y, right_min_y = min_y[0::2], min_y[1::2]
+        left_max_y, right_max_y = max_y[0::2], max_y[1::2]
+        with np.errstate(invalid="ignore"):
+            take_left_min = np.isnan(right_min_y) | (left_min_y <= right_min_y)
+            take_left_max = np.isnan(right_max_y) | (left_max_y >= right_max_y)
+        return (
+            np.where(take_left_min, min_x[0::2], min_x[1::2]),
+            np.fmin(left_min_y, right_min_y),
+            np.where(take_left_max, max_x[0::2], max_x[1::2]),
+            np.fmax(left_max_y, right_max_y),
+        )
+
+    def level_for(self, number_of_samples: int, max_points: int) -> int:
+        """Returns the finest level that draws at most about max_points points for the given number of samples"""
+        if max_points <= 0 or number_of_samples <= max_points:
+            return 0
+        # two points are drawn per bin
+        level = int(np.ceil(np.log2(2 * number_of_samples / max_points)))
+        return min(level, len(self.levels) - 1)
+
+    def view(self, x_min: float, x_max: float, max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the points to draw for the visible x range, one point more is included on both sides so the line
+        reaches the border of the view"""
+        first = max(int(np.searchsorted(self.data_x, x_min, side="left")) - 1, 0)
+        last = min(int(np.searchsorted(self.data_x, x_max, side="right")) + 1, len(self.data_x))
+        level = self.level_for(last - first, max_points)
+        if level == 0:
+            return self.data_x[first:last], self.data_y[first:last]
+
+        min_x, min_y, max_x, max_y = self.levels[level]
+        first_bin = first >> level
+        last_bin = min(((last - 1) >> level) + 1, len(min_x))
+        min_x, min_y = min_x[first_bin:last_bin], min_y[first_bin:last_bin]
+        max_x, max_y = max_x[first_bin:last_bin], max_y[first_bin:last_bin]
+
+        # draw the extreme values of every bin in the order in which they appear along the profile
+        min_first = ~(max_x < min_x)
+        view_x = np.empty(2 * len(min_x))
+        view_y = np.empty(2 * len(min_x))
+        view_x[0::2] = np.where(min_first, min_x, max_x)
+        view_y[0::2] = np.where(min_first, min_y, max_y)
+        view_x[1::2] = np.where(min_first, max_x, min_x)
+        view_y[1::2] = np.where(min_first, max_y, min_y)
+        return view_x, view_y
+
+
+def waypoint_marker_lines(wp_data_x: np.ndarray, height: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns x and y arrays of vertical lines at all waypoints separated by NaN, so they can be drawn by a single
+    plot item"""
+    wp_data_x = np.asarray(wp_data_x, dtype=np.float64)
+    line_x = np.repeat(wp_data_x, 3)
+    line_x[2::3] = np.nan
+    line_y = np.tile([0, height, np.nan], len(wp_data_x))
+    return line_x, line_y
+
+
+def corridor_offsets(
+        half_width: float,
+        sample_interval: float,
+        resolution: float,
+        max_grid_size: int = MAX_CORRIDOR_GRID_SIZE,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the along track and cross track offsets in m of the sample grid of a corridor window. A window covers
+    the swath across the track and half the sample interval before and after a profile sample, it is sampled about
+    once per DEM pixel but with at most max_grid_size samples per axis."""
+    resolution = max(resolution, 1e-6)
+    along_size = int(np.clip(np.ceil(sample_interval / resolution) + 1, 1, max_grid_size))
+    cross_size = int(np.clip(np.ceil(2 * half_width / resolution) + 1, 3, max_grid_size))
+    along_offsets = np.linspace(-sample_interval / 2, sample_interval / 2, along_size) if along_size > 1 \
+        else np.zeros(1)
+    return along_offsets, np.linspace(-half_width, half_width, cross_size)
+
+
+def corridor_statistics(window_values: np.ndarray, percentile: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the maximum and the given percentile of the elevations of every corridor window (one row per window).
+    Windows without any valid elevation are NaN."""
+    window_values = np.asarray(window_values, dtype=np.float64)
+    if window_values.size == 0:
+        return np.empty(len(window_values)), np.empty(len(window_values))
+    with warnings.catch_warnings():
+        # all-NaN windows outside the DEM are expected
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        return np.nanmax(window_values, axis=1), np.nanpercentile(window_values, percentile, axis=1)
+
+
+class ProfileResult(NamedTuple):
+    data_x: np.ndarray
+    data_y: np.ndarray
+    wp_data_x: List[float]
+    points: list
+    corridor_max: Union[np.ndarray, None] = None
+    corridor_percentile: Union[np.ndarray, None] = None
+
+
+class ProfileCache:
+    """Bounded in-memory cache of computed topography profiles. The key contains a hash of the waypoint geometries,
+    the raster and the sampling parameters; the least recently used profile is dropped when the cache is full."""
+
+    def __init__(self, max_entries: int = DEFAULT_PROFILE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._profiles = OrderedDict()
+
+    @staticmethod
+    def make_key(
+            layer_id: str,
+            layer_crs: str,
+            waypoint_coordinates: np.ndarray,
+            raster_id: str,
+            sample_interval: float,
+            interpolation: str,
+            corridor_half_width: float = 0.0,
+    ) -> Tuple:
+        """Returns the cache key of a profile, the layer id is always the first element"""
+        geometry_hash = hashlib.sha1(
+            np.ascontiguousarray(waypoint_coordinates, dtype=np.float64).tobytes()
+        ).hexdigest()
+        return layer_id, layer_crs, geometry_hash, raster_id, sample_interval, interpolation, corridor_half_width
+
+    def get(self, key: Tuple) -> Union[ProfileResult, None]:
+        profile = self._profiles.get(key)
+        if profile is not None:
+            self._profiles.move_to_end(key)
+        return profile
+
+    def put(self, key: Tuple, profile: ProfileResult):
+        self._profiles[key] = profile
+        self._profiles.move_to_end(key)
+        while len(self._profiles) > self.max_entries:
+            self._profiles.popitem(last=False)
+
+    def invalidate_layer(self, layer_id: str):
+        """Removes all profiles of the given waypoint layer"""
+        for key in [key for key in self._profiles if key[0] == layer_id]:
+            del self._profiles[key]
+
+    def clear(self):
+        self._profiles.clear()
@@ -1,10 +1,13 @@
-import math
 import os
-from typing import Union, Tuple, List, Dict
+from functools import partial
+from typing import Union, Tuple, Dict, List
 from dataclasses import dataclass
 
+import numpy as np
+
 from qgis.PyQt.QtWidgets import (
     QSpinBox,
+    QDoubleSpinBox,
     QComboBox,
     QFileDialog,
     QDialog,
@@ -16,18 +19,22 @@ from qgis.PyQt.QtWidgets import (
 from qgis.PyQt.QtCore import QVariant
 from qgis.core import (
     QgsWkbTypes, Qgis,
-    QgsGeometry, QgsVector, QgsPointXY,
+    QgsGeometry, QgsPointXY,
     QgsFeature, QgsExpressionContextUtils,
     QgsVectorLayer,
     QgsFields,
     QgsField,
     QgsCoordinateReferenceSystem,
-    QgsCoordinateTransform,
     QgsProject,
     QgsUnitTypes,
-    QgsVectorFileWriter
+    QgsVectorFileWriter,
+    QgsApplication,
+    QgsFeedback,
+    LayerFilters,
+    QgsTask,
+    QgsVector
 )
-from qgis.gui import QgisInterface
+from qgis.gui import QgisInterface, QgsMapLayerComboBox
 
 from .constants import (
     QGIS_FIELD_NAME_ID,
@@ -38,15 +45,33 @@ from .constants import (
     PLUGIN_OVERLAP_SETTINGS_PATH,
     PLUGIN_OVERLAP_ROTATION_SETTINGS_PATH,
     PLUGIN_MAX_TURN_DISTANCE_SETTINGS_PATH,
+    PLUGIN_LINE_MARGIN_SETTINGS_PATH,
+    PLUGIN_CELL_DECOMPOSITION_SETTINGS_PATH,
     DEFAULT_PUSH_MESSAGE_DURATION,
     DEFAULT_TAG,
     SECOND_ALGO_NAME,
-    FIRST_ALGO_NAME
+    FIRST_ALGO_NAME,
+    THIRD_ALGO_NAME
+)
+from .cell_decomposition import cell_grids, chain_paths, merge_grids
+from .coverage_geometry import line_offsets
+from .coverage_module import (
+    LINE_ORIENTATION_BOUNDING_BOX,
+    CoverageModule,
+    clip_lines_to_polygon,
+    polygon_rings,
+    sweep_parameters,
 )
-from .coverage_module import CoverageModule
-from .utils import LayerUtils
+from .line_ordering import LineGrid, max_flyover, meander_order, racetrack_order, shortest_transit_order
+from .sortie_splitting import split_sorties
+from .utils import LayerUtils, get_transform, transform_coordinates
 
 DEFAULT_MAX_TURN_DISTANCE = 1000
+DEFAULT_FLIGHT_SPEED = 200
+# seconds the shortest transit ordering may improve the order of the legs
+SHORTEST_TRANSIT_TIME_BUDGET = 5.0
+# the cost matrix of the shortest transit ordering grows quadratically with the legs, about 160 MB for 1000 legs
+SHORTEST_TRANSIT_MAX_LEGS = 1000
 
 
 @dataclass
@@ -57,6 +82,50 @@ class FlightParameters:
     sensor_name: str
     max_turn_distance: float
     algorithm: str
+    # the legs are split into sorties from and back to the base if a maximum flight duration (in h) is given
+    max_flight_duration: float = 0.0
+    base_layer: Union[QgsVectorLayer, None] = None
+
+
+@dataclass
+class ComputationParameters:
+    layer: QgsVectorLayer
+    crs: QgsCoordinateReferenceSystem
+    coverage_crs: QgsCoordinateReferenceSystem
+    flight_params: FlightParameters
+    # legs in the coverage crs
+    grid: LineGrid
+    # in meters
+    line_spacing: float
+    # map units of the coverage crs per meter
+    unit_factor: float = 1.0
+    # in the coverage crs, None if the legs are flown in a single flight
+    base: Union[np.ndarray, None] = None
+    # indices of the legs of every cell into the grid, None if the polygon is not decomposed into cells
+    cells: Union[List[np.ndarray], None] = None
+
+
+class ShortestTransitTask(QgsTask):
+    """Orders the legs for the shortest transit in the background"""
+
+    def __init__(self, grid: LineGrid, min_turn_distance: float, time_budget: float):
+        super().__init__("Order racetrack legs", QgsTask.CanCancel)
+        self.grid = grid
+        self.min_turn_distance = min_turn_distance
+        self.time_budget = time_budget
+        self.order: Union[np.ndarray, None] = None
+        self.backward: Union[np.ndarray, None] = None
+        self.feedback = QgsFeedback()
+
+    def cancel(self):
+        self.feedback.cancel()
+        super().cancel()
+
+    def run(self) -> bool:
+        self.order, self.backward = shortest_transit_order(
+            self.grid, self.min_turn_distance, self.time_budget, self.feedback
+        )
+        return not self.isCanceled()
 
 
 class RacetrackDialog(QDialog):
@@ -66,6 +135,9 @@ class RacetrackDialog(QDialog):
         self.max_turn_distance, _ = QgsProject.instance().readDoubleEntry(
             PLUGIN_NAME, "max_turn_distance", DEFAULT_MAX_TURN_DISTANCE
         )
+        self.max_flight_duration, _ = QgsProject.instance().readDoubleEntry(
+            PLUGIN_NAME, "max_flight_duration", 0
+        )
         self._init_ui()
 
     def _add_turning_distance_input(self):
@@ -89,14 +161,37 @@ class RacetrackDialog(QDialog):
 
         self._add_turning_distance_input()
         self._add_algorithm_selector()
+        self._add_sortie_inputs()
         self._add_button_controls()
 
+    def _add_sortie_inputs(self):
+        """Add the maximum flight duration and base inputs for splitting the legs into sorties"""
+        duration_layout = QHBoxLayout()
+        duration_label = QLabel("Maximum Flight Duration (h, 0 = single flight): ")
+        self.duration_spinbox = QDoubleSpinBox()
+        self.duration_spinbox.setRange(0, 48)
+        self.duration_spinbox.setSingleStep(0.5)
+        self.duration_spinbox.setValue(self.max_flight_duration)
+        duration_layout.addWidget(duration_label)
+        duration_layout.addWidget(self.duration_spinbox)
+        self.layout.addLayout(duration_layout)
+
+        base_layout = QHBoxLayout()
+        base_label = QLabel("Base:")
+        self.base_combo = QgsMapLayerComboBox()
+        self.base_combo.setFilters(LayerFilters.LayerFilter.PointLayer)
+        self.base_combo.setAllowEmptyLayer(True)
+        self.base_combo.setLayer(None)
+        base_layout.addWidget(base_label)
+        base_layout.addWidget(self.base_combo)
+        self.layout.addLayout(base_layout)
+
     def _add_algorithm_selector(self):
         """Add the algorithm selection dropdown"""
         algo_layout = QHBoxLayout()
         algo_label = QLabel("Algorithm:")
         self.algo_combo = QComboBox()
-        self.algo_combo.addItems([FIRST_ALGO_NAME, SECOND_ALGO_NAME])
+        self.algo_combo.addItems([FIRST_ALGO_NAME, SECOND_ALGO_NAME, THIRD_ALGO_NAME])
         algo_layout.addWidget(algo_label)
         algo_layout.addWidget(self.algo_combo)
         self.layout.addLayout(algo_layout)
@@ -115,12 +210,16 @@ class RacetrackDialog(QDialog):
     def get_values(self):
         return self.dist_spinbox.value(), self.algo_combo.currentText()
 
+    def get_sortie_values(self):
+        return self.duration_spinbox.value(), self.base_combo.currentLayer()
+
 
 class RacetrackModule:
     def __init__(self, iface: QgisInterface, coverage_module: CoverageModule) -> None:
         self.iface = iface
         self.layer_utils = LayerUtils(iface)
         self.coverage_module = coverage_module
+        self.shortest_transit_task = None
         self._init_from_coverage_module()
 
     def _init_from_coverage_module(self):
@@ -132,6 +231,9 @@ class RacetrackModule:
 
     def close(self):
         """Disconnect all signal handlers"""
+        if self.shortest_transit_task is not None:
+            self.shortest_transit_task.cancel()
+            self.shortest_transit_task = None
         self.coverage_module.close()
 
     def _get_layer_parameters(self) -> Union[Dict, None]:
@@ -202,6 +304,7 @@ class RacetrackModule:
         dialog = RacetrackDialog(parent=self.iface.mainWindow())
         if dialog.exec_() == dialog.Accepted:
             max_turn_distance, algorithm = dialog.get_values()
+            max_flight_duration, base_layer = dialog.get_sortie_values()
         else:
             return None
 
@@ -216,53 +319,22 @@ class RacetrackModule:
             coverage_range=coverage_range,
             sensor_name=sensor,
             max_turn_distance=max_turn_distance,
-            algorithm=algorithm
+            algorithm=algorithm,
+            max_flight_duration=max_flight_duration,
+            base_layer=base_layer
         )
 
     def _prepare_geometry_parameters(self, feature: QgsFeature,
                                      crs: QgsCoordinateReferenceSystem,
-                                     coverage_crs: QgsCoordinateReferenceSystem) -> Dict:
-        """Prepare geometry-related parameters for computation"""
-        transform_to_coverage_crs = QgsCoordinateTransform(
-            crs, coverage_crs, QgsProject.instance()
-        )
+                                     coverage_crs: QgsCoordinateReferenceSystem
+                                     ) -> Tuple[LineGrid, float, float, Union[List[np.ndarray], None]]:
+        """Prepare the legs in the coverage CRS, the spacing between them in meters, the factor from meters to
+        the map units of the coverage CRS and the legs of every cell if the polygon is decomposed"""
+        transform_to_coverage_crs = get_transform(crs, coverage_crs)
 
-        # Transform geometry and get bounding box
+        # Transform geometry
         geometry = QgsGeometry(feature.geometry())
         geometry.transform(transform_to_coverage_crs)
-        bounding_box = geometry.orientedMinimumBoundingBox()[0].asPolygon()
-
-        # Extract corners
-        bottom_right = bounding_box[0][0]
-        top_right = bounding_box[0][1]
-        top_left = bounding_box[0][2]
-        bottom_left = bounding_box[0][3]
-
-        # Compute vectors
-        vertical_vec = QgsVector(
-            bottom_left.x() - top_left.x(),
-            bottom_left.y() - top_left.y()
-        )
-        horizontal_vec = QgsVector(
-            bottom_left.x() - bottom_right.x(),
-            bottom_left.y() - bottom_right.y()
-        )
-
-        # Determine flight direction
-        draw_horizontal_lines = horizontal_vec.length() > vertical_vec.length()
-        if int(self.settings.value(PLUGIN_OVERLAP_ROTATION_SETTINGS_PATH, 0)):
-            draw_horizontal_lines = not draw_horizontal_lines
-
-        if draw_horizontal_lines:
-            vec = vertical_vec
-            vec_normalized = vec.normalized()
-            point_start = top_left
-            point_end = top_right
-        else:
-            vec = horizontal_vec
-            vec_normalized = vec.normalized() * -1
-            point_start = top_left
-            point_end = bottom_left
 
         unit_factor = QgsUnitTypes.fromUnitToUnitFactor(
             QgsUnitTypes.DistanceUnit.DistanceMeters,
@@ -275,19 +347,44 @@ class RacetrackModule:
         ) * unit_factor
 
         overlap_factor = 1 - float(self.settings.value(PLUGIN_OVERLAP_SETTINGS_PATH, 0))
+        line_spacing = coverage_range * 2 * overlap_factor
+        margin = float(self.settings.value(PLUGIN_LINE_MARGIN_SETTINGS_PATH, 0)) * unit_factor
 
-        # Read max_turn_distance from settings
-        max_turn_distance = float(self.settings.value(PLUGIN_MAX_TURN_DISTANCE_SETTINGS_PATH, 1000))
+        # Determine flight direction and the box the legs are placed in
+        line_orientation = int(
+            self.settings.value(PLUGIN_OVERLAP_ROTATION_SETTINGS_PATH, LINE_ORIENTATION_BOUNDING_BOX)
+        )
+        point_start, point_end, vec, vec_normalized = sweep_parameters(
+            geometry, line_orientation, coverage_range, line_spacing, margin
+        )
+        # the same lines the minimum flight time heading is optimised for, as for the coverage lines
+        distances = line_offsets(vec.length(), coverage_range, line_spacing)
+
+        if self.settings.value(PLUGIN_CELL_DECOMPOSITION_SETTINGS_PATH, False, type=bool):
+            # one leg per part of the polygon crossed, grouped into cells which every line crosses at most once
+            direction = QgsVector(point_end.x() - point_start.x(), point_end.y() - point_start.y()).normalized()
+            grid, cells = merge_grids(cell_grids(
+                polygon_rings(geometry),
+                (point_start.x(), point_start.y()),
+                (direction.x(), direction.y()),
+                (vec_normalized.x(), vec_normalized.y()),
+                distances,
+                coverage_range,
+                margin,
+            ))
+            return grid, line_spacing / unit_factor, unit_factor, cells
+
+        # Clip the legs to the part of the polygon covered by their swath plus the lead-in and run-out margin,
+        # legs whose swath misses the polygon are dropped
+        start_x, start_y, end_x, end_y, touched = clip_lines_to_polygon(
+            geometry, point_start, point_end, vec_normalized, distances, coverage_range, margin
+        )
+        grid = LineGrid(
+            np.column_stack((start_x, start_y))[touched],
+            np.column_stack((end_x, end_y))[touched],
+        )
 
-        return {
-            'vec': vec,
-            'vec_normalized': vec_normalized,
-            'point_start': point_start,
-            'point_end': point_end,
-            'coverage_range': coverage_range,
-            'overlap_factor': overlap_factor,
-            'max_turn_distance': max_turn_distance
-        }
+        return grid, line_spacing / unit_factor, unit_factor, None
 
     @staticmethod
     def _get_save_file_path(base_path: str,
@@ -381,180 +478,51 @@ class RacetrackModule:
 
         return layer
 
-    @staticmethod
-    def _compute_racetrack_algo_points(params: dict) -> List[QgsPointXY]:
-        """Compute waypoints for racetrack algorithm"""
-        points = []
-        forward = True
-        number_of_lines = math.ceil(params['vec'].length() / (params['coverage_range'] * 2 * params['overlap_factor']))
-        line_spacing = params['coverage_range'] * 2 * params['overlap_factor']
-        max_flyover = math.floor(params['max_turn_distance'] / line_spacing)
-
-        j = 1
-        left_point = True
-        reached_end = False
-        inner_iteration = 0
-
-        for k in range(number_of_lines):
-            if not reached_end:
-                dist = 2 * params['coverage_range'] * params['overlap_factor'] * j - params['coverage_range']
-                start = QgsPointXY(
-                    params['point_start'].x() + params['vec_normalized'].x() * dist,
-                    params['point_start'].y() + params['vec_normalized'].y() * dist,
-                )
-                end = QgsPointXY(
-                    params['point_end'].x() + params['vec_normalized'].x() * dist,
-                    params['point_end'].y() + params['vec_normalized'].y() * dist
-                )
-
-                if left_point:
-                    points.append(start)
-                    points.append(end)
-                else:
-                    points.append(end)
-                    points.append(start)
-
-                left_point = not left_point
-
-                if forward:
-                    if j + max_flyover <= number_of_lines:
-                        j = j + max_flyover
-                        inner_iteration = inner_iteration + 1
-                        if ((j - 1) / ((2.0 * max_flyover) - 1.0)) % 1.0 != 0.0:
-                            forward = not forward
-                        else:
-                            inner_iteration = 0
-                    else:
-                        reached_end = True
-                else:
-                    j = (j - max_flyover) + 1
-                    inner_iteration = inner_iteration + 1
-                    forward = not forward
-            else:
-                if inner_iteration == 0:
-                    remaining_tracks = number_of_lines - j
-                else:
-                    remaining_tracks = int((((2 * max_flyover) - inner_iteration) - 2) / 2)
-
-                for i in range(remaining_tracks):
-                    if forward:
-                        j = j + remaining_tracks
-                    else:
-                        j = j - remaining_tracks
-
-                    dist = 2 * params['coverage_range'] * params['overlap_factor'] * j - params['coverage_range']
-                    start = QgsPointXY(
-                        params['point_start'].x() + params['vec_normalized'].x() * dist,
-                        params['point_start'].y() + params['vec_normalized'].y() * dist,
-                    )
-                    end = QgsPointXY(
-                        params['point_end'].x() + params['vec_normalized'].x() * dist,
-                        params['point_end'].y() + params['vec_normalized'].y() * dist
-                    )
-
-                    if left_point:
-                        points.append(start)
-                        points.append(end)
-                    else:
-                        points.append(end)
-                        points.append(start)
-
-                    left_point = not left_point
-                    remaining_tracks = remaining_tracks - 1
-                    forward = not forward
-                    left_point = not left_point
-                break
-
-        return points
-
-    @staticmethod
-    def _compute_meander_algo_points(params: dict) -> List[QgsPointXY]:
-        """Compute waypoints for meander algorithm"""
-        points = []
-        left_point = True
-        forward = True
-        number_of_lines = math.ceil(params['vec'].length() / (params['coverage_range'] * 2 * params['overlap_factor']))
-        j = 1
-        max_flyover = math.floor(
-            params['max_turn_distance'] / (params['coverage_range'] * 2 * params['overlap_factor']))
-        line_from_bottom = 2
-
-        for k in range(number_of_lines):
-            # Using the same point calculation approach as the racetrack algorithm
-            point_line = RacetrackModule._compute_line_points(
-                j,
-                left_point,
-                params['point_start'],
-                params['point_end'],
-                params['vec_normalized'],
-                params['coverage_range'],
-                params['overlap_factor']
-            )
-
-            points.extend(point_line)
-            left_point = not left_point
-
-            if forward:
-                if j + max_flyover <= number_of_lines:  # Changed to match racetrack condition (<=)
-                    j = j + max_flyover
-                else:
-                    if j + 1 <= number_of_lines:
-                        j = j + 1
-                        forward = not forward
-                    else:
-                        j = j + 1 - max_flyover
-                        forward = not forward
-            else:
-                if j == line_from_bottom:
-                    forward = not forward
-                    j = j + 1
-                    line_from_bottom += 2
-                elif j - max_flyover < line_from_bottom:
-                    j = line_from_bottom
-                    line_from_bottom += 1
-                    forward = not forward
-                else:
-                    j -= max_flyover
-
-        return points
-
-    @staticmethod
-    def _compute_line_points(j: int, left_point: bool, point_start: QgsPointXY,
-                             point_end: QgsPointXY, vec_normalized: QgsVector,
-                             coverage_range: float, overlap_factor: float) -> List[QgsPointXY]:
-        """Compute start and end points for a single line"""
-        dist = 2 * coverage_range * overlap_factor * j - coverage_range
-        start = QgsPointXY(
-            point_start.x() + vec_normalized.x() * dist,
-            point_start.y() + vec_normalized.y() * dist,
-        )
-        end = QgsPointXY(
-            point_end.x() + vec_normalized.x() * dist,
-            point_end.y() + vec_normalized.y() * dist
-        )
-        return [start, end] if left_point else [end, start]
-
     def compute_way_points(self):
         """Main method to compute waypoints based on selected algorithm"""
         params = self._prepare_computation_parameters()
         if not params:
             return
 
+        if params.flight_params.algorithm == THIRD_ALGO_NAME and len(params.grid) > SHORTEST_TRANSIT_MAX_LEGS:
+            self.iface.messageBar().pushMessage(
+                f"{THIRD_ALGO_NAME} supports at most {SHORTEST_TRANSIT_MAX_LEGS} legs, but the polygon needs "
+                f"{len(params.grid)}. Please use {SECOND_ALGO_NAME} or {FIRST_ALGO_NAME} instead",
+                level=Qgis.MessageLevel.Warning,
+                duration=DEFAULT_PUSH_MESSAGE_DURATION,
+            )
+            return
+
         point_layer = self.generate_points_shp_file(
-            params['layer'].dataProvider().dataSourceUri(),
-            params['flight_params'],
-            params['layer'].crs()  # Pass the CRS from the input layer
+            params.layer.dataProvider().dataSourceUri(),
+            params.flight_params,
+            params.crs  # Pass the CRS from the input layer
         )
         if not point_layer:
             return
 
-        points = self._compute_points_for_algorithm(params)
-        if not points:
+        if params.flight_params.algorithm == THIRD_ALGO_NAME:
+            self._start_shortest_transit_task(params, point_layer)
             return
 
-        self._save_points_to_layer(points, point_layer, params['flight_params'].flight_altitude)
-
-    def _prepare_computation_parameters(self) -> Union[dict, None]:
+        if params.cells is None:
+            order = self._compute_order_for_algorithm(params, len(params.grid))
+            if order is None:
+                return
+            waypoints = params.grid.waypoints(order)
+        else:
+            # every cell is flown with the selected pattern, the cells are chained with short connections
+            paths = []
+            for cell in params.cells:
+                order = self._compute_order_for_algorithm(params, len(cell))
+                if order is None:
+                    return
+                paths.append(params.grid.waypoints(cell[order]))
+            waypoints = chain_paths(paths)
+
+        self._write_waypoints(waypoints, params, point_layer)
+
+    def _prepare_computation_parameters(self) -> Union[ComputationParameters, None]:
         """Prepare all necessary parameters for waypoint computation"""
         layer_params = self._get_layer_parameters()
         if not layer_params:
@@ -564,7 +532,7 @@ class RacetrackModule:
         if not flight_params:
             return None
 
-        # Store max_turn_distance from dialog for use in algorithm
+        # Store max_turn_distance from dialog for the next computation
         QgsProject.instance().writeEntryDouble(
             PLUGIN_NAME,
             "max_turn_distance",
@@ -574,45 +542,195 @@ class RacetrackModule:
             PLUGIN_MAX_TURN_DISTANCE_SETTINGS_PATH,
             flight_params.max_turn_distance
         )
+        QgsProject.instance().writeEntryDouble(
+            PLUGIN_NAME,
+            "max_flight_duration",
+            flight_params.max_flight_duration
+        )
 
-        geometry_params = self._prepare_geometry_parameters(
+        base = None
+        if flight_params.max_flight_duration > 0:
+            base = self._get_base_point(flight_params.base_layer, layer_params['coverage_crs'])
+            if base is None:
+                return None
+
+        grid, line_spacing, unit_factor, cells = self._prepare_geometry_parameters(
             layer_params['feature'], layer_params['crs'],
             layer_params['coverage_crs']
         )
 
-        # Ensure max_turn_distance is set from flight_params
-        geometry_params['max_turn_distance'] = flight_params.max_turn_distance
+        return ComputationParameters(
+            layer=layer_params['layer'],
+            crs=layer_params['crs'],
+            coverage_crs=layer_params['coverage_crs'],
+            flight_params=flight_params,
+            grid=grid,
+            line_spacing=line_spacing,
+            unit_factor=unit_factor,
+            base=base,
+            cells=cells
+        )
+
+    def _get_base_point(self, base_layer: Union[QgsVectorLayer, None],
+                        coverage_crs: QgsCoordinateReferenceSystem) -> Union[np.ndarray, None]:
+        """Get the selected, or else the first, point of the base layer in the coverage CRS"""
+        base_features = []
+        if base_layer is not None:
+            base_features = [
+                feature for feature in (base_layer.selectedFeatures() or base_layer.getFeatures())
+                if feature.hasGeometry()
+            ]
+        if not base_features:
+            self.iface.messageBar().pushMessage(
+                "Splitting into sorties requires a base layer containing a point",
+                level=Qgis.MessageLevel.Warning,
+                duration=DEFAULT_PUSH_MESSAGE_DURATION,
+            )
+            return None
 
-        return {**layer_params, **geometry_params, 'flight_params': flight_params}
+        point = base_features[0].geometry().centroid().asPoint()
+        x, y = transform_coordinates(
+            [point.x()], [point.y()], base_layer.crs(), coverage_crs, QgsProject.instance().transformContext()
+        )
+        return np.array([x[0], y[0]])
+
+    def _start_shortest_transit_task(self, params: ComputationParameters, point_layer: QgsVectorLayer):
+        """Orders the legs as asymmetric travelling salesman path in a task, the maximum turning distance of the
+        dialog is the minimum distance between two legs connected by a turn"""
+        if self.shortest_transit_task is not None:
+            self.shortest_transit_task.cancel()
+        task = ShortestTransitTask(
+            params.grid,
+            params.flight_params.max_turn_distance * params.unit_factor,
+            SHORTEST_TRANSIT_TIME_BUDGET
+        )
+        task.taskCompleted.connect(partial(self._shortest_transit_completed, task, params, point_layer))
+        task.taskTerminated.connect(partial(self._shortest_transit_terminated, task, point_layer))
+        # the reference to the task is kept, otherwise it is garbage collected before it runs
+        self.shortest_transit_task = task
+        QgsApplication.taskManager().addTask(task)
+
+    def _shortest_transit_completed(self, task: ShortestTransitTask, params: ComputationParameters,
+                                    point_layer: QgsVectorLayer):
+        """Writes the waypoints of the ordered legs once the task is finished"""
+        if task is not self.shortest_transit_task:
+            return
+        self.shortest_transit_task = None
+        self._write_waypoints(params.grid.waypoints(task.order, task.backward), params, point_layer)
+
+    def _shortest_transit_terminated(self, task: ShortestTransitTask, point_layer: QgsVectorLayer):
+        """Removes the empty waypoint layer of a canceled or failed ordering from the project and from disk"""
+        if task is self.shortest_transit_task:
+            self.shortest_transit_task = None
+        try:
+            file_path = point_layer.dataProvider().dataSourceUri().split("|")[0]
+            QgsProject.instance().removeMapLayer(point_layer.id())
+            QgsVectorFileWriter.deleteShapeFile(file_path)
+        except RuntimeError:
+            # the layer was already removed by the user
+            pass
+        self.iface.messageBar().pushMessage(
+            f"{THIRD_ALGO_NAME}: ordering the legs was canceled or failed, no waypoints were written",
+            level=Qgis.MessageLevel.Warning,
+            duration=DEFAULT_PUSH_MESSAGE_DURATION,
+        )
 
-    def _compute_points_for_algorithm(self, params: dict) -> List[QgsPointXY]:
-        """Compute waypoints based on selected algorithm"""
-        # Force update max_turn_distance to ensure it's using the correct value
-        params['max_turn_distance'] = params['flight_params'].max_turn_distance
+    def _compute_order_for_algorithm(self, params: ComputationParameters,
+                                     number_of_lines: int) -> Union[np.ndarray, None]:
+        """Compute the visiting order of the legs based on selected algorithm"""
+        flyover = max_flyover(params.flight_params.max_turn_distance, params.line_spacing)
 
-        if params['flight_params'].algorithm == SECOND_ALGO_NAME:
-            return self._compute_racetrack_algo_points(params)
-        elif params['flight_params'].algorithm == FIRST_ALGO_NAME:
-            return self._compute_meander_algo_points(params)
+        if params.flight_params.algorithm == SECOND_ALGO_NAME:
+            return racetrack_order(number_of_lines, flyover)
+        elif params.flight_params.algorithm == FIRST_ALGO_NAME:
+            return meander_order(number_of_lines, flyover)
         else:
             self.iface.messageBar().pushMessage(
                 "This algorithm is not implemented",
                 level=Qgis.MessageLevel.Warning,
                 duration=DEFAULT_PUSH_MESSAGE_DURATION,
             )
-            return []
+            return None
 
-    def _save_points_to_layer(self, points: List[QgsPointXY],
+    def _write_waypoints(self, waypoints: np.ndarray, params: ComputationParameters, point_layer: QgsVectorLayer):
+        """Write the waypoints of the legs to the layer, or split them into sorties from and back to the base if a
+        maximum flight duration is set. The first sortie is written to the layer, every further one to a new layer
+        next to it."""
+        if params.base is None:
+            self._save_points_to_layer(
+                waypoints, params.coverage_crs, point_layer, params.flight_params.flight_altitude
+            )
+            return
+
+        flight_speed = QgsProject.instance().readDoubleEntry(PLUGIN_NAME, "flight_speed", DEFAULT_FLIGHT_SPEED)[0]
+        if flight_speed <= 0:
+            self.iface.messageBar().pushMessage(
+                "Couldn't split into sorties",
+                "Flight speed must be greater than zero.",
+                level=Qgis.MessageLevel.Warning,
+                duration=DEFAULT_PUSH_MESSAGE_DURATION,
+            )
+            return
+
+        # distances in meters, the flight speed is given in km/h
+        sorties = split_sorties(
+            waypoints / params.unit_factor,
+            params.base / params.unit_factor,
+            flight_speed * 1000,
+            params.flight_params.max_flight_duration
+        )
+        if sorties is None:
+            self.iface.messageBar().pushMessage(
+                "Couldn't split into sorties",
+                "A single leg including the flights from and to the base exceeds the maximum flight duration.",
+                level=Qgis.MessageLevel.Warning,
+                duration=DEFAULT_PUSH_MESSAGE_DURATION,
+            )
+            return
+
+        file_path, _ = os.path.splitext(point_layer.dataProvider().dataSourceUri().split("|")[0])
+        for number, sortie in enumerate(sorties, start=1):
+            if number == 1:
+                sortie_layer = point_layer
+            else:
+                sortie_file_path = f"{file_path}_sortie{number}.shp"
+                if os.path.exists(sortie_file_path):
+                    self.iface.messageBar().pushMessage(
+                        f"{sortie_file_path} already exists, the remaining sorties are not written",
+                        level=Qgis.MessageLevel.Warning,
+                        duration=DEFAULT_PUSH_MESSAGE_DURATION
+                    )
+                    return
+                sortie_layer = self._create_point_layer(sortie_file_path, params.crs)
+                if sortie_layer is None:
+                    return
+            points = np.vstack((
+                params.base, waypoints[2 * sortie.first_line:2 * sortie.last_line], params.base
+            ))
+            self._save_points_to_layer(points, params.coverage_crs, sortie_layer, params.flight_params.flight_altitude)
+
+        self.iface.messageBar().pushMessage(
+            f"Split into {len(sorties)} sorties, the longest takes {max(sortie.duration for sortie in sorties):.2f}h",
+            level=Qgis.Info,
+            duration=DEFAULT_PUSH_MESSAGE_DURATION,
+        )
+
+    def _save_points_to_layer(self, points: np.ndarray,
+                              points_crs: QgsCoordinateReferenceSystem,
                               point_layer: QgsVectorLayer,
                               flight_altitude: float):
-        """Save computed points to the vector layer"""
+        """Save computed points, given as (n, 2) array, to the vector layer"""
         provider = point_layer.dataProvider()
 
+        # the points are only turned into geometries here, after transforming all of them at once
+        x, y = transform_coordinates(
+            points[:, 0], points[:, 1], points_crs, point_layer.crs(), QgsProject.instance().transformContext()
+        )
         features = []
-        for i, point in enumerate(points, start=1):
+        for i in range(len(points)):
             f = QgsFeature()
-            f.setGeometry(QgsGeometry.fromPointXY(point))
-            f.setAttributes([int(i), DEFAULT_TAG])
+            f.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(x[i], y[i])))
+            f.setAttributes([i + 1, DEFAULT_TAG])
             features.append(f)
 
         provider.addFeatures(features)
@@ -0,0 +1,346 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Tuple, Union
+
+import numpy as np
+
+from osgeo import gdal, osr
+
+from .spatial_index import ExtentIndex
+
+NEAREST_INTERPOLATION = "Nearest"
+BILINEAR_INTERPOLATION = "Bilinear"
+INTERPOLATION_METHODS = [NEAREST_INTERPOLATION, BILINEAR_INTERPOLATION]
+
+# Blocks smaller than this in one dimension (e.g. strip organized GeoTIFFs) are replaced by square tiles of
+# DEFAULT_TILE_SIZE pixels, so a cached block never spans a whole raster row of a large mosaic.
+MIN_BLOCK_SIZE = 64
+DEFAULT_TILE_SIZE = 256
+
+DEFAULT_BLOCK_CACHE_SIZE_MB = 512
+
+RASTER_FILE_EXTENSIONS = (".tif", ".tiff", ".vrt", ".img", ".asc", ".hgt", ".dem", ".nc")
+METERS_PER_DEGREE = 111320.0  # at the equator, only used to estimate the resolution of geographic rasters
+
+CoordinateTransform = Callable[[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]
+
+
+class BlockCache:
+    """Process-wide LRU cache for raster blocks keyed by raster source and block index. The cache is bounded by the
+    number of bytes of the cached arrays and may be shared between threads."""
+
+    def __init__(self, max_bytes: int = DEFAULT_BLOCK_CACHE_SIZE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, loader: Callable[[], np.ndarray]) -> np.ndarray:
+        """Returns the cached block for the given key, the block is loaded with loader if it is not cached yet"""
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is not None:
+                self._blocks.move_to_end(key)
+                self.hits += 1
+                return block
+            self.misses += 1
+
+        block = loader()
+
+        with self._lock:
+            if key not in self._blocks:
+                self._blocks[key] = block
+                self.size_bytes += block.nbytes
+                self._evict()
+        return block
+
+    def set_max_bytes(self, max_bytes: int):
+        """Sets the memory cap of the cache and evicts blocks if necessary"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def invalidate(self, source: Hashable):
+        """Removes all blocks of the given raster source"""
+        with self._lock:
+            for key in [key for key in self._blocks if key[0] == source]:
+                self.size_bytes -= self._blocks.pop(key).nbytes
+
+    def clear(self):
+        with self._lock:
+            self._blocks.clear()
+            self.size_bytes = 0
+
+    def _evict(self):
+        """Evicts least recently used blocks until the cache is within its memory cap"""
+        while self._blocks and self.size_bytes > self.max_bytes:
+            _, block = self._blocks.popitem(last=False)
+            self.size_bytes -= block.nbytes
+
+
+BLOCK_CACHE = BlockCache()
+
+
+def invert_geo_transform(gt: Tuple[float, ...]) -> Tuple[float, ...]:
+    """Returns the inverse of a GDAL geotransform (including rotation/shear terms)"""
+    determinant = gt[1] * gt[5] - gt[2] * gt[4]
+    if determinant == 0:
+        raise ValueError("Geotransform of raster is not invertible")
+
+    inv_1 = gt[5] / determinant
+    inv_2 = -gt[2] / determinant
+    inv_4 = -gt[4] / determinant
+    inv_5 = gt[1] / determinant
+    inv_0 = -(inv_1 * gt[0] + inv_2 * gt[3])
+    inv_3 = -(inv_4 * gt[0] + inv_5 * gt[3])
+    return inv_0, inv_1, inv_2, inv_3, inv_4, inv_5
+
+
+def world_to_pixel(
+        x: Union[float, np.ndarray],
+        y: Union[float, np.ndarray],
+        gt: Tuple[float, ...]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Converts world coordinates to continuous pixel coordinates (column, row) for the given geotransform. Rotated
+    geotransforms are supported. The upper left corner of the raster is (0, 0), the center of the first pixel is
+    (0.5, 0.5)."""
+    inv_gt = invert_geo_transform(gt)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    col = inv_gt[0] + inv_gt[1] * x + inv_gt[2] * y
+    row = inv_gt[3] + inv_gt[4] * x + inv_gt[5] * y
+    return col, row
+
+
+class RasterSampler:
+    """Samples a raster band at many points at once. The needed raster blocks are determined for all samples, every
+    block is read once (or taken from the block cache) and the samples are gathered with NumPy fancy indexing."""
+
+    def __init__(self, raster_path: str, band_number: int = 1, block_cache: Union[BlockCache, None] = None):
+        self.raster_path = raster_path
+        self.dataset = gdal.Open(raster_path)
+        if self.dataset is None:
+            raise IOError(f"Could not open raster {raster_path}")
+        self.band = self.dataset.GetRasterBand(band_number)
+        self.geo_transform = self.dataset.GetGeoTransform()
+        self.width = self.dataset.RasterXSize
+        self.height = self.dataset.RasterYSize
+        self.nodata = self.band.GetNoDataValue()
+        self.crs = self.dataset.GetProjection()
+        self.block_cache = block_cache if block_cache is not None else BLOCK_CACHE
+
+        block_width, block_height = self.band.GetBlockSize()
+        if block_width < MIN_BLOCK_SIZE or block_height < MIN_BLOCK_SIZE:
+            block_width = block_height = DEFAULT_TILE_SIZE
+        self.block_width = block_width
+        self.block_height = block_height
+
+        # the modification time is part of the source key, so blocks of a rewritten file are never reused
+        try:
+            modification_time = os.path.getmtime(raster_path)
+        except OSError:
+            modification_time = 0
+        self.source_key = (raster_path, band_number, modification_time)
+
+    @property
+    def extent(self) -> Tuple[float, float, float, float]:
+        """Returns the bounding box (min x, min y, max x, max y) of the raster in raster CRS"""
+        gt = self.geo_transform
+        corner_x = [gt[0] + gt[1] * col + gt[2] * row for col, row in
+                    ((0, 0), (self.width, 0), (0, self.height), (self.width, self.height))]
+        corner_y = [gt[3] + gt[4] * col + gt[5] * row for col, row in
+                    ((0, 0), (self.width, 0), (0, self.height), (self.width, self.height))]
+        return min(corner_x), min(corner_y), max(corner_x), max(corner_y)
+
+    def resolution_in_meters(self) -> float:
+        """Returns the approximate pixel size of the raster in meters"""
+        pixel_size = min(abs(self.geo_transform[1]), abs(self.geo_transform[5]))
+        spatial_reference = osr.SpatialReference()
+        if not self.crs or spatial_reference.ImportFromWkt(self.crs) != 0:
+            return pixel_size
+        if spatial_reference.IsGeographic():
+            return pixel_size * METERS_PER_DEGREE
+        return pixel_size * spatial_reference.GetLinearUnits()
+
+    def sample(
+            self,
+            x: np.ndarray,
+            y: np.ndarray,
+            interpolation: str = NEAREST_INTERPOLATION,
+    ) -> np.ndarray:
+        """Returns the raster values at the given world coordinates (in raster CRS). Samples outside the raster or
+        on nodata pixels are NaN."""
+        if interpolation not in INTERPOLATION_METHODS:
+            raise ValueError(f"Unknown interpolation method {interpolation}")
+
+        col, row = world_to_pixel(x, y, self.geo_transform)
+        values = np.full(col.shape, np.nan, dtype=np.float64)
+        inside = (col >= 0) & (col < self.width) & (row >= 0) & (row < self.height)
+        if not inside.any():
+            return values
+
+        if interpolation == NEAREST_INTERPOLATION:
+            values[inside] = self.read_pixels(
+                np.floor(row[inside]).astype(np.int64),
+                np.floor(col[inside]).astype(np.int64)
+            )
+            return values
+
+        # bilinear interpolation between the four surrounding pixel centers
+        col_center = col[inside] - 0.5
+        row_center = row[inside] - 0.5
+        cols = np.floor(col_center).astype(np.int64)
+        rows = np.floor(row_center).astype(np.int64)
+        col_weight = col_center - cols
+        row_weight = row_center - rows
+
+        weighted_sum = np.zeros(cols.shape, dtype=np.float64)
+        weight_total = np.zeros(cols.shape, dtype=np.float64)
+        for d_row, d_col, weight in (
+                (0, 0, (1 - row_weight) * (1 - col_weight)),
+                (0, 1, (1 - row_weight) * col_weight),
+                (1, 0, row_weight * (1 - col_weight)),
+                (1, 1, row_weight * col_weight),
+        ):
+            # clamp to the raster edge, so samples in the outer half pixel use the edge value
+            neighbour_values = self.read_pixels(
+                np.clip(rows + d_row, 0, self.height - 1),
+                np.clip(cols + d_col, 0, self.width - 1)
+            )
+            valid = ~np.isnan(neighbour_values)
+            weighted_sum[valid] += weight[valid] * neighbour_values[valid]
+            weight_total[valid] += weight[valid]
+
+        # renormalize over the valid neighbours, so nodata pixels don't pull the value towards zero
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values[inside] = np.where(weight_total > 0, weighted_sum / weight_total, np.nan)
+        return values
+
+    def read_pixels(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Returns the values of the given (valid) pixel indices with NaN for nodata. Every block that contains at
+        least one of the pixels is read once."""
+        values = np.empty(rows.shape, dtype=np.float64)
+        if rows.size == 0:
+            return values
+
+        block_rows = rows // self.block_height
+        block_cols = cols // self.block_width
+        blocks_per_row = (self.width + self.block_width - 1) // self.block_width
+        block_ids = block_rows * blocks_per_row + block_cols
+
+        # group the samples by block, so each block is visited exactly once
+        order = np.argsort(block_ids, kind="stable")
+        sorted_ids = block_ids[order]
+        boundaries = np.flatnonzero(np.diff(sorted_ids)) + 1
+        for group in np.split(order, boundaries):
+            block_row = int(block_rows[group[0]])
+            block_col = int(block_cols[group[0]])
+            block = self.read_block(block_row, block_col)
+            values[group] = block[
+                rows[group] - block_row * self.block_height,
+                cols[group] - block_col * self.block_width
+            ]
+        return values
+
+    def read_block(self, block_row: int, block_col: int) -> np.ndarray:
+        """Returns the block with the given index as float array with NaN for nodata"""
+        return self.block_cache.get(
+            (self.source_key, block_row, block_col),
+            lambda: self._load_block(block_row, block_col)
+        )
+
+    def _load_block(self, block_row: int, block_col: int) -> np.ndarray:
+        """Reads a block from the raster, blocks at the right and bottom edge are clipped to the raster"""
+        x_offset = block_col * self.block_width
+        y_offset = block_row * self.block_height
+        block = self.band.ReadAsArray(
+            x_offset,
+            y_offset,
+            min(self.block_width, self.width - x_offset),
+            min(self.block_height, self.height - y_offset),
+        ).astype(np.float64)
+        if self.nodata is not None:
+            block[block == self.nodata] = np.nan
+        return block
+
+
+def raster_paths_in_directory(directory: str) -> List[str]:
+    """Returns the paths of all raster files in the directory"""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(RASTER_FILE_EXTENSIONS)
+    )
+
+
+class MosaicSampler:
+    """Samples a set of rasters (e.g. DEM tiles of mixed resolution and CRS) as one mosaic. The extents of the
+    rasters are indexed by an R-tree per raster CRS. Every sample is taken from the highest resolution raster that
+    covers it and has data there, lower resolution rasters serve as fallback. The samples are read in one batch per
+    raster."""
+
+    def __init__(
+            self,
+            raster_paths: List[str],
+            transform_factory: Callable[[str], CoordinateTransform],
+            band_number: int = 1,
+            block_cache: Union[BlockCache, None] = None,
+    ):
+        """transform_factory returns the transformation from WGS84 lon/lat to the CRS given as WKT"""
+        if not raster_paths:
+            raise ValueError("No raster selected")
+        samplers = [RasterSampler(path, band_number, block_cache) for path in raster_paths]
+        # the finest raster comes first, so it is read first
+        self.samplers = sorted(samplers, key=lambda sampler: sampler.resolution_in_meters())
+
+        self._groups = []
+        indices_by_crs: Dict[str, List[int]] = {}
+        for i, sampler in enumerate(self.samplers):
+            indices_by_crs.setdefault(sampler.crs, []).append(i)
+        for crs, indices in indices_by_crs.items():
+            extents = np.array([self.samplers[i].extent for i in indices])
+            self._groups.append((transform_factory(crs), ExtentIndex(extents), np.array(indices)))
+
+    def resolution_in_meters(self) -> float:
+        return self.samplers[0].resolution_in_meters()
+
+    def sample(self, lons: np.ndarray, lats: np.ndarray, interpolation: str = NEAREST_INTERPOLATION) -> np.ndarray:
+        """Returns the mosaic values at the given WGS84 coordinates with NaN where no raster has data"""
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+        values = np.full(lons.shape, np.nan)
+        if lons.size == 0:
+            return values
+
+        # the candidate samples of every raster in raster CRS
+        candidates = [[] for _ in self.samplers]
+        for transform, extent_index, sampler_indices in self._groups:
+            x, y = transform(lons.ravel(), lats.ravel())
+            point_indices, extent_indices = extent_index.query_points(x, y)
+            owners = sampler_indices[extent_indices]
+            order = np.argsort(owners, kind="stable")
+            owners = owners[order]
+            point_indices = point_indices[order]
+            boundaries = np.flatnonzero(np.diff(owners)) + 1
+            for group in np.split(np.arange(len(owners)), boundaries):
+                if len(group):
+                    indices = point_indices[group]
+                    candidates[owners[group[0]]] = (indices, x[indices], y[indices])
+
+        flat_values = values.ravel()
+        missing = np.ones(flat_values.shape, dtype=bool)
+        for sampler, candidate in zip(self.samplers, candidates):
+            if not len(candidate):
+                continue
+            indices, x, y = candidate
+            still_missing = missing[indices]
+            if not still_missing.any():
+                continue
+            indices = indices[still_missing]
+            sampled = sampler.sample(x[still_missing], y[still_missing], interpolation)
+            valid = ~np.isnan(sampled)
+            flat_values[indices[valid]] = sampled[valid]
+            missing[indices[valid]] = False
+        return flat_values.reshape(lons.shape)
@@ -43,6 +43,7 @@ from .constants import (
     REDUCED_WAYPOINT_GENERATION_ACTION_NAME,
     REVERSAL_ACTION_NAME,
     COVERAGE_LINES_ACTION_NAME,
+    COVERAGE_ANALYSIS_ACTION_NAME,
     CUT_FLOWLINE_ACTION_NAME,
     RACETRACK_ACTION_NAME,
     TOPOGRAPHY_ACTION_NAME,
@@ -56,6 +57,7 @@ from .cut_flowline_module import CutFlowlineModule
 from .racetrack_module import RacetrackModule
 from .action_module import ActionModule
 from .coverage_module import CoverageModule
+from .coverage_analysis_module import CoverageAnalysisModule
 from .flight_distance_duration_module import FlightDistanceDurationModule
 
 # Not an Unused import statement!!!
@@ -96,6 +98,7 @@ class ScienceFlightPlanner:
     waypoint_reduction_module: WaypointReductionModule
     waypoint_reversal_module: WaypointReversalModule
     coverage_module: CoverageModule
+    coverage_analysis_module: CoverageAnalysisModule
     cut_flowline_module: CutFlowlineModule
     racetrack_module: RacetrackModule
     topography_module: TopographyModule
@@ -133,8 +136,9 @@ class ScienceFlightPlanner:
         self.waypoint_reduction_module = WaypointReductionModule(iface)
         self.waypoint_reversal_module = WaypointReversalModule(iface)
         self.coverage_module = CoverageModule(iface)
+        self.coverage_analysis_module = CoverageAnalysisModule(iface, self.coverage_module)
         self.racetrack_module = RacetrackModule(iface, self.coverage_module)
-        self.topography_module = TopographyModule(iface)
+        self.topography_module = TopographyModule(iface, self.coverage_module)
         self.cut_flowline_module = CutFlowlineModule(iface)
         self.action_module = ActionModule(iface)
         self.help_module = HelpManualModule(
@@ -297,6 +301,12 @@ class ScienceFlightPlanner:
             callback=self.coverage_module.compute_optimal_coverage_lines,
             parent=self.toolbar,
         )
+        self.add_action(
+            icon="icon_coverage_lines.png",
+            text=COVERAGE_ANALYSIS_ACTION_NAME,
+            callback=self.coverage_analysis_module.analyze_coverage_action,
+            parent=self.toolbar,
+        )
         self.add_action(
             icon="icon_cut_flowline.png",
             text=CUT_FLOWLINE_ACTION_NAME,
@@ -357,6 +367,7 @@ class ScienceFlightPlanner:
         """Removes the plugin menu item and icon from QGIS GUI."""
         self.help_module.close()
         self.coverage_module.close()
+        self.coverage_analysis_module.close()
         self.flight_distance_duration_module.close()
         self.waypoint_reduction_module.close()
         self.topography_module.close()
@@ -0,0 +1,69 @@
+from typing import List, NamedTuple, Union
+
+import numpy as np
+
+
+class Sortie(NamedTuple):
+    # lines first_line to last_line - 1 of the flight order
+    first_line: int
+    last_line: int
+    # including the ferry legs from and to the base
+    duration: float
+
+
+def split_sorties(
+        waypoints: np.ndarray, base: np.ndarray, speed: float, max_duration: float
+) -> Union[List[Sortie], None]:
+    """Splits the lines given by their start and end waypoints in flight order as (2n, 2) array into the fewest
+    sorties from and back to the base within the maximum duration. Among those splits the longest sortie is as short as
+    possible. Distances, speed and duration must use consistent units. Returns None if a single line can't be flown
+    within the maximum duration.
+
+    The split is a dynamic program over the lines: the duration of a sortie follows from the cumulative distance
+    along the flight order and its two ferry legs, so all sorties ending at a line are evaluated at once."""
+    waypoints = np.asarray(waypoints, dtype=np.float64).reshape(-1, 2)
+    base = np.asarray(base, dtype=np.float64)
+    starts = waypoints[0::2]
+    ends = waypoints[1::2]
+    number_of_lines = len(starts)
+    if number_of_lines == 0:
+        return []
+
+    line_lengths = np.hypot(*(ends - starts).T)
+    transit_lengths = np.hypot(*(starts[1:] - ends[:-1]).T)
+    # distance along the flight order to the end and the start of every line
+    end_positions = np.cumsum(line_lengths) + np.concatenate(([0.0], np.cumsum(transit_lengths)))
+    start_positions = end_positions - line_lengths
+    ferry_out = np.hypot(*(starts - base).T)
+    ferry_back = np.hypot(*(ends - base).T)
+
+    # fewest sorties and their longest duration for the first j lines, and where the last of them starts
+    sortie_count = np.full(number_of_lines + 1, np.inf)
+    longest_duration = np.full(number_of_lines + 1, np.inf)
+    sortie_start = np.zeros(number_of_lines + 1, dtype=int)
+    sortie_count[0] = 0
+    longest_duration[0] = 0
+    for j in range(1, number_of_lines + 1):
+        durations = (
+            ferry_out[:j] + end_positions[j - 1] - start_positions[:j] + ferry_back[j - 1]
+        ) / speed
+        counts = np.where(durations <= max_duration, sortie_count[:j] + 1, np.inf)
+        fewest = counts.min()
+        if not np.isfinite(fewest):
+            continue
+        longest = np.where(counts == fewest, np.maximum(longest_duration[:j], durations), np.inf)
+        sortie_start[j] = int(np.argmin(longest))
+        sortie_count[j] = fewest
+        longest_duration[j] = longest[sortie_start[j]]
+
+    if not np.isfinite(sortie_count[number_of_lines]):
+        return None
+
+    sorties = []
+    j = number_of_lines
+    while j > 0:
+        i = sortie_start[j]
+        duration = (ferry_out[i] + end_positions[j - 1] - start_positions[i] + ferry_back[j - 1]) / speed
+        sorties.append(Sortie(int(i), int(j), float(duration)))
+        j = i
+    return sorties[::-1]
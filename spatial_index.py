@@ -0,0 +1,75 @@
+from typing import Tuple
+
+import numpy as np
+
+DEFAULT_NODE_CAPACITY = 16
+
+
+class ExtentIndex:
+    """Static R-tree over rectangular extents (min x, min y, max x, max y), bulk loaded with sort-tile-recursive
+    packing. Every node covers node_capacity consecutive entries of the level below, so the tree is stored as one
+    array of boxes per level and many points can be queried at once with NumPy."""
+
+    def __init__(self, extents: np.ndarray, node_capacity: int = DEFAULT_NODE_CAPACITY):
+        extents = np.asarray(extents, dtype=np.float64).reshape(-1, 4)
+        self.node_capacity = node_capacity
+        self.item_ids = self._packing_order(extents, node_capacity)
+
+        # level 0 holds the extents themselves, the last level holds at most node_capacity nodes
+        self.levels = [extents[self.item_ids]]
+        while len(self.levels[-1]) > node_capacity:
+            lower = self.levels[-1]
+            starts = np.arange(0, len(lower), node_capacity)
+            self.levels.append(np.column_stack((
+                np.minimum.reduceat(lower[:, 0], starts),
+                np.minimum.reduceat(lower[:, 1], starts),
+                np.maximum.reduceat(lower[:, 2], starts),
+                np.maximum.reduceat(lower[:, 3], starts),
+            )))
+
+    @staticmethod
+    def _packing_order(extents: np.ndarray, node_capacity: int) -> np.ndarray:
+        """Returns the order of the extents after sorting them into vertical slabs by x and within the slabs by y"""
+        number_of_extents = len(extents)
+        if number_of_extents == 0:
+            return np.empty(0, dtype=np.int64)
+        center_x = (extents[:, 0] + extents[:, 2]) / 2
+        center_y = (extents[:, 1] + extents[:, 3]) / 2
+
+        number_of_leaves = int(np.ceil(number_of_extents / node_capacity))
+        slab_size = int(np.ceil(np.sqrt(number_of_leaves))) * node_capacity
+        rank_x = np.empty(number_of_extents, dtype=np.int64)
+        rank_x[np.argsort(center_x, kind="stable")] = np.arange(number_of_extents)
+        return np.lexsort((center_y, rank_x // slab_size))
+
+    def query_points(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns all pairs of point index and extent index (in the order of the extents given to the constructor)
+        for which the point lies inside the extent. Points with NaN coordinates are never inside."""
+        x = np.asarray(x, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=np.float64).ravel()
+        top = len(self.levels) - 1
+        number_of_nodes = len(self.levels[top])
+        point_indices = np.repeat(np.arange(len(x)), number_of_nodes)
+        node_indices = np.tile(np.arange(number_of_nodes), len(x))
+
+        for level in range(top, -1, -1):
+            boxes = self.levels[level][node_indices]
+            point_x = x[point_indices]
+            point_y = y[point_indices]
+            inside = (
+                    (point_x >= boxes[:, 0]) & (point_x <= boxes[:, 2])
+                    & (point_y >= boxes[:, 1]) & (point_y <= boxes[:, 3])
+            )
+            point_indices = point_indices[inside]
+            node_indices = node_indices[inside]
+            if level == 0:
+                break
+
+            # replace every node by its children on the level below
+            child_starts = node_indices * self.node_capacity
+            child_counts = np.minimum(child_starts + self.node_capacity, len(self.levels[level - 1])) - child_starts
+            offsets = np.arange(child_counts.sum()) - np.repeat(np.cumsum(child_counts) - child_counts, child_counts)
+            point_indices = np.repeat(point_indices, child_counts)
+            node_indices = np.repeat(child_starts, child_counts) + offsets
+
+        return point_indices, self.item_ids[node_indices]
@@ -0,0 +1,62 @@
+import sys
+
+import numpy as np
+from qgis.testing import unittest
+
+# noinspection PyUnresolvedReferences
+from ScienceFlightPlanner.cell_decomposition import (
+    boustrophedon_cells,
+    boustrophedon_path,
+    cell_grids,
+    slice_intervals,
+)
+
+# 300 x 300 square with a 100 wide notch from the top down to y = 100
+U_SHAPE = np.array([[0, 0], [300, 0], [300, 300], [200, 300], [200, 100], [100, 100], [100, 300], [0, 300]])
+
+
+class TestCellDecomposition(unittest.TestCase):
+
+    def test_slice_intervals(self):
+        intervals = slice_intervals([U_SHAPE], (0, 0), (1, 0), (0, 1), [50, 150, 350])
+
+        np.testing.assert_allclose(intervals[0], [[0, 300]])
+        np.testing.assert_allclose(intervals[1], [[0, 100], [200, 300]])
+        self.assertEqual(len(intervals[2]), 0)
+
+    def test_split_starts_new_cells(self):
+        intervals = slice_intervals([U_SHAPE], (0, 0), (1, 0), (0, 1), np.arange(10, 300, 20))
+
+        cells = boustrophedon_cells(intervals)
+
+        # the base below the notch and both arms
+        self.assertEqual([len(cell) for cell in cells], [5, 10, 10])
+        np.testing.assert_allclose(cells[1][:, 1:], [[0, 100]] * 10)
+        np.testing.assert_allclose(cells[2][:, 1:], [[200, 300]] * 10)
+
+    def test_lines_avoid_hole(self):
+        square = np.array([[0, 0], [1000, 0], [1000, 1000], [0, 1000]])
+        hole = np.array([[400, 320], [400, 680], [600, 680], [600, 320]])
+
+        grids = cell_grids([square, hole], (0, 0), (1, 0), (0, 1), np.arange(50, 1000, 100), 50)
+
+        self.assertEqual([len(grid) for grid in grids], [4, 2, 2, 4])
+        # only the lines whose swath lies within the height of the hole end at its edges
+        np.testing.assert_allclose(grids[1].starts, [[0, 450], [0, 550]])
+        np.testing.assert_allclose(grids[1].ends, [[400, 450], [400, 550]])
+        np.testing.assert_allclose(grids[2].starts, [[600, 450], [600, 550]])
+
+        waypoints = boustrophedon_path(grids)
+        self.assertEqual(waypoints.shape, (24, 2))
+        # every cell is flown completely before the next one
+        for grid in grids:
+            rows = [np.flatnonzero(np.all(np.isclose(waypoints, start), axis=1))[0] for start in
+                    np.concatenate((grid.starts, grid.ends))]
+            self.assertEqual(max(rows) - min(rows), 2 * len(grid) - 1)
+
+
+def run_all():
+    """Default function that is called by the runner if nothing else is specified"""
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestCellDecomposition))
+    unittest.TextTestRunner(verbosity=3, stream=sys.stdout).run(suite)
@@ -0,0 +1,43 @@
+import sys
+
+from qgis.core import QgsGeometry
+from qgis.testing import unittest
+
+# noinspection PyUnresolvedReferences
+from ScienceFlightPlanner.coverage_analysis import SwathIndex, analyze_coverage
+
+
+class TestCoverageAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        # a 100 x 100 target covered by two 40 wide swaths overlapping by 10, leaving a 30 wide gap in the east
+        self.target = QgsGeometry.fromWkt("POLYGON((0 0, 100 0, 100 100, 0 100, 0 0))")
+        self.swaths = [
+            QgsGeometry.fromWkt("POLYGON((-10 -10, 40 -10, 40 110, -10 110, -10 -10))"),
+            QgsGeometry.fromWkt("POLYGON((30 -10, 70 -10, 70 110, 30 110, 30 -10))"),
+            QgsGeometry.fromWkt("POLYGON((500 500, 600 500, 600 600, 500 600, 500 500))"),
+        ]
+
+    def test_areas_and_gaps(self):
+        statistics = analyze_coverage(self.target, SwathIndex(self.swaths))
+
+        self.assertAlmostEqual(statistics.target_area, 10000)
+        self.assertAlmostEqual(statistics.covered_area, 7000)
+        self.assertAlmostEqual(statistics.covered_percentage, 70)
+        self.assertAlmostEqual(statistics.double_covered_area, 1000)
+        self.assertEqual(len(statistics.gaps), 1)
+        self.assertAlmostEqual(statistics.gap_area, 3000)
+
+    def test_uncovered_target(self):
+        statistics = analyze_coverage(self.target, SwathIndex(self.swaths[2:]))
+
+        self.assertEqual(statistics.covered_area, 0)
+        self.assertEqual(statistics.double_covered_area, 0)
+        self.assertAlmostEqual(statistics.gap_area, 10000)
+
+
+def run_all():
+    """Default function that is called by the runner if nothing else is specified"""
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestCoverageAnalysis))
+    unittest.TextTestRunner(verbosity=3, stream=sys.stdout).run(suite)
@@ -0,0 +1,59 @@
+import sys
+
+import numpy as np
+from qgis.testing import unittest
+
+# noinspection PyUnresolvedReferences
+from ScienceFlightPlanner.coverage_geometry import (
+    optimal_sweep_heading,
+    segment_rectangles,
+    swath_extents,
+    sweep_heading_costs,
+)
+
+
+class TestCoverageGeometry(unittest.TestCase):
+
+    def test_segment_rectangles(self):
+        points = np.array([[0, 0], [10, 0], [10, 0], [10, 5]])
+
+        rectangles = segment_rectangles(points, 2)
+
+        self.assertEqual(rectangles.shape, (3, 4, 2))
+        np.testing.assert_allclose(rectangles[0], [[0, -2], [10, -2], [10, 2], [0, 2]])
+        # zero length segments are degenerate
+        np.testing.assert_allclose(rectangles[1], [[10, 0]] * 4)
+        np.testing.assert_allclose(rectangles[2], [[12, 0], [12, 5], [8, 5], [8, 0]])
+
+    def test_swath_extents_of_concave_polygon(self):
+        # L shaped polygon, the upper half only reaches to x = 50
+        ring = np.array([[0, 0], [100, 0], [100, 50], [50, 50], [50, 100], [0, 100]])
+
+        first, last, touched = swath_extents([ring], (0, 0), (1, 0), (0, 1), np.array([10, 60, 95, 130]), 20)
+
+        np.testing.assert_array_equal(touched, [True, True, True, False])
+        np.testing.assert_allclose(first[:3], [0, 0, 0])
+        # the swath of the second line still reaches into the lower half
+        np.testing.assert_allclose(last[:3], [100, 100, 50])
+
+    def test_sweep_heading_of_rotated_strip(self):
+        # 1000 x 150 strip rotated by 30°, a single line along it covers it completely
+        angle = np.radians(30)
+        rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        ring = np.array([[0, 0], [1000, 0], [1000, 150], [0, 150]]) @ rotation.T + [500000, 5000000]
+
+        number_of_lines, line_length, transit_length = sweep_heading_costs(
+            [ring], np.radians([30, 120]), 100, 200
+        )
+
+        np.testing.assert_array_equal(number_of_lines, [1, 6])
+        np.testing.assert_allclose(line_length[0], 1000)
+        np.testing.assert_allclose(transit_length, [0, 1000])
+        self.assertAlmostEqual(optimal_sweep_heading([ring], 100, 200), angle)
+
+
+def run_all():
+    """Default function that is called by the runner if nothing else is specified"""
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestCoverageGeometry))
+    unittest.TextTestRunner(verbosity=3, stream=sys.stdout).run(suite)
@@ -0,0 +1,55 @@
+import sys
+
+from qgis.core import QgsCoordinateReferenceSystem, QgsGeometry
+from qgis.testing import unittest
+
+# noinspection PyUnresolvedReferences
+from ScienceFlightPlanner.coverage_module import LINE_ORIENTATION_ROTATED, coverage_lines
+
+UTM_CRS = QgsCoordinateReferenceSystem("EPSG:32632")
+
+
+class TestCoverageLines(unittest.TestCase):
+
+    def setUp(self):
+        self.polygon = QgsGeometry.fromWkt(
+            "POLYGON((500000 5000000, 501050 5000000, 501050 5000430, 500000 5000430, 500000 5000000))"
+        )
+
+    def test_lines_along_longer_side(self):
+        lines = coverage_lines(self.polygon, UTM_CRS, UTM_CRS, 100, 0)
+
+        self.assertEqual(len(lines), 3)
+        for line in lines:
+            self.assertAlmostEqual(line.length(), 1050, places=3)
+
+    def test_rotated_lines_with_overlap(self):
+        lines = coverage_lines(
+            self.polygon, UTM_CRS, UTM_CRS, 100, 0.5, line_orientation=LINE_ORIENTATION_ROTATED
+        )
+
+        # the lines are 100 apart, so 12 of them fit into the 1050 long side plus half a swath on both ends
+        self.assertEqual(len(lines), 12)
+        for line in lines:
+            self.assertAlmostEqual(line.length(), 430, places=3)
+
+    def test_lead_in_and_run_out(self):
+        lines = coverage_lines(self.polygon, UTM_CRS, UTM_CRS, 100, 0, margin=50)
+
+        self.assertEqual(len(lines), 3)
+        for line in lines:
+            self.assertAlmostEqual(line.length(), 1050 + 2 * 50, places=3)
+
+    def test_decomposed_convex_polygon_is_one_cell(self):
+        lines = coverage_lines(self.polygon, UTM_CRS, UTM_CRS, 100, 0, decompose=True)
+
+        self.assertEqual(len(lines), 3)
+        for line in lines:
+            self.assertAlmostEqual(line.length(), 1050, places=3)
+
+
+def run_all():
+    """Default function that is called by the runner if nothing else is specified"""
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestCoverageLines))
+    unittest.TextTestRunner(verbosity=3, stream=sys.stdout).run(suite)
@@ -0,0 +1,53 @@
+import sys
+
+from qgis.testing import unittest
+
+# noinspection PyUnresolvedReferences
+from ScienceFlightPlanner.coverage_registry import CoverageLayerRegistry
+
+
+class TestCoverageRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = CoverageLayerRegistry()
+        self.registry.register("path", "camera", "coverage_camera")
+        self.registry.register("path", "lidar", "coverage_lidar")
+        self.registry.register("other_path", "camera", "coverage_other")
+
+    def test_lookup_in_both_directions(self):
+        self.assertEqual(
+            self.registry.get_coverage_layers("path"), {"camera": "coverage_camera", "lidar": "coverage_lidar"}
+        )
+        self.assertEqual(self.registry.get_path_layer("coverage_lidar"), "path")
+        self.assertIsNone(self.registry.get_path_layer("path"))
+
+    def test_replaced_coverage_layer_is_unregistered(self):
+        self.registry.register("path", "camera", "new_coverage_camera")
+
+        self.assertIsNone(self.registry.get_path_layer("coverage_camera"))
+        self.assertEqual(self.registry.get_coverage_layers("path")["camera"], "new_coverage_camera")
+
+    def test_remove_layers(self):
+        self.assertTrue(self.registry.remove_layers(["coverage_camera", "other_path"]))
+
+        self.assertEqual(self.registry.get_coverage_layers("path"), {"lidar": "coverage_lidar"})
+        self.assertIsNone(self.registry.get_path_layer("coverage_other"))
+        self.assertEqual(self.registry.path_layer_ids(), ["path"])
+        self.assertFalse(self.registry.remove_layers(["unknown"]))
+
+    def test_json_round_trip(self):
+        loaded_registry = CoverageLayerRegistry()
+        loaded_registry.load_json(self.registry.to_json())
+
+        self.assertEqual(loaded_registry.coverage_layers, self.registry.coverage_layers)
+        self.assertEqual(loaded_registry.path_layers, self.registry.path_layers)
+
+        loaded_registry.load_json("not json")
+        self.assertEqual(loaded_registry.path_layer_ids(), [])
+
+
+def run_all():
+    """Default function that is called by the runner if nothing else is specified"""
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestCoverageRegistry))
+    unittest.TextTestRunner(verbosity=3, stream=sys.stdout).run(suite)
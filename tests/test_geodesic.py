@@ -0,0 +1,65 @@
+import sys
+
+import numpy as np
+from qgis.testing import unittest
+
+# noinspection PyUnresolvedReferences
+from ScienceFlightPlanner import geodesic
+
+# Flinders Peak and Buninyong, the reference example of Vincenty (1975)
+FLINDERS_PEAK = (-(37 + 57 / 60 + 3.72030 / 3600), 144 + 25 / 60 + 29.52440 / 3600)
+BUNINYONG = (-(37 + 39 / 60 + 10.15610 / 3600), 143 + 55 / 60 + 35.38390 / 3600)
+DISTANCE = 54972.271
+AZIMUTH = 306 + 52 / 60 + 5.37 / 3600
+
+
+class TestGeodesic(unittest.TestCase):
+
+    def test_inverse(self):
+        distance, azimuth, _ = geodesic.inverse(*FLINDERS_PEAK, *BUNINYONG)
+
+        self.assertAlmostEqual(float(distance), DISTANCE, places=3)
+        self.assertAlmostEqual(float(azimuth), AZIMUTH, places=5)
+
+    def test_direct(self):
+        lat, lon, _ = geodesic.direct(*FLINDERS_PEAK, AZIMUTH, DISTANCE)
+
+        self.assertAlmostEqual(float(lat), BUNINYONG[0], places=7)
+        self.assertAlmostEqual(float(lon), BUNINYONG[1], places=7)
+
+    def test_legs_of_coincident_points(self):
+        legs = geodesic.legs(np.array([10.0, 10.0, 11.0]), np.array([50.0, 50.0, 50.0]))
+
+        self.assertEqual(legs.lengths[0], 0)
+        np.testing.assert_allclose(legs.cumulative, np.concatenate(([0], np.cumsum(legs.lengths))))
+
+    def test_densify(self):
+        lons = np.array([0.0, 0.05, 0.05])
+        lats = np.array([0.0, 0.0, 0.02])
+
+        line = geodesic.densify(lons, lats, 1000)
+        legs = geodesic.legs(lons, lats)
+
+        np.testing.assert_array_equal(line.leg_indices, [0, 0, 0, 0, 0, 0, 1, 1, 1, 1])
+        np.testing.assert_allclose(line.distances[:6], np.arange(6) * 1000)
+        self.assertAlmostEqual(line.distances[-1], legs.cumulative[-1])
+        # all points lie on the geodesic, so the distances between them add up to the line length
+        spacing = geodesic.legs(line.lons, line.lats).lengths
+        np.testing.assert_allclose(spacing, np.diff(line.distances), atol=1e-6)
+
+    def test_offset_grid(self):
+        grid_lons, grid_lats = geodesic.offset_grid([10.0], [50.0], [0.0], [-500, 0, 500], [-1000, 0, 1000])
+        distances, azimuths, _ = geodesic.inverse(50.0, 10.0, grid_lats[0], grid_lons[0])
+
+        self.assertEqual(grid_lons.shape, (1, 9))
+        np.testing.assert_allclose(distances[[1, 3, 4, 5, 7]], [500, 1000, 0, 1000, 500], atol=1e-3)
+        # positive cross track offsets are right of the track
+        self.assertAlmostEqual(float(azimuths[5]), 90, places=3)
+        self.assertAlmostEqual(float(azimuths[7]), 0, places=6)
+
+
+def run_all():
+    """Default function that is called by the runner if nothing else is specified"""
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestGeodesic))
+    unittest.TextTestRunner(verbosity=3, stream=sys.stdout).run(suite)
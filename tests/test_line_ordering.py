@@ -0,0 +1,83 @@
+import sys
+import time
+
+import numpy as np
+from qgis.core import QgsFeedback
+from qgis.testing import unittest
+
+# noinspection PyUnresolvedReferences
+from ScienceFlightPlanner.line_ordering import (
+    LineGrid,
+    max_flyover,
+    meander_order,
+    racetrack_order,
+    shortest_transit_order,
+    transit_cost_matrix,
+    transit_lengths,
+)
+
+
+class TestLineOrdering(unittest.TestCase):
+
+    def test_racetrack_order(self):
+        np.testing.assert_array_equal(racetrack_order(12, 3), [0, 3, 1, 4, 2, 5, 8, 6, 9, 7, 10, 11])
+
+    def test_meander_order(self):
+        np.testing.assert_array_equal(meander_order(12, 3), [0, 3, 6, 9, 10, 7, 4, 1, 2, 5, 8, 11])
+
+    def test_orders_are_permutations(self):
+        for number_of_lines in range(1, 40):
+            for flyover in range(1, 8):
+                for order in (racetrack_order(number_of_lines, flyover), meander_order(number_of_lines, flyover)):
+                    np.testing.assert_array_equal(np.sort(order), np.arange(number_of_lines))
+
+    def test_max_flyover_reaches_adjacent_line(self):
+        self.assertEqual(max_flyover(1000, 300), 3)
+        self.assertEqual(max_flyover(100, 300), 1)
+
+    def test_waypoints_alternate_direction(self):
+        grid = LineGrid.from_sweep((0, 0), (100, 0), (0, 1), 20, 10, 4)
+
+        waypoints = grid.waypoints([0, 2, 1, 3])
+
+        np.testing.assert_allclose(
+            waypoints, [[0, 10], [100, 10], [100, 50], [0, 50], [0, 30], [100, 30], [100, 70], [0, 70]]
+        )
+        np.testing.assert_allclose(transit_lengths(waypoints), [40, 20, 40])
+
+    def test_shortest_transit_order(self):
+        # 60 lines 50 apart, clipped unevenly on both ends
+        rng = np.random.default_rng(0)
+        grid = LineGrid.from_sweep((0, 0), (3000, 0), (0, 1), 50, 25, 60)
+        grid.starts[:, 0] += rng.uniform(0, 1500, 60)
+        grid.ends[:, 0] -= rng.uniform(0, 1000, 60)
+
+        order, backward = shortest_transit_order(grid, 300, time_budget=10)
+
+        np.testing.assert_array_equal(np.sort(order), np.arange(60))
+        # no turn between lines closer than the minimum turn distance
+        tour = 2 * order + backward
+        costs = transit_cost_matrix(grid, 300)
+        self.assertTrue(np.all(np.isfinite(costs[tour[:-1], tour[1:]])))
+        self.assertLess(
+            transit_lengths(grid.waypoints(order, backward)).sum(),
+            transit_lengths(grid.waypoints(meander_order(60, max_flyover(300, 50)))).sum(),
+        )
+
+    def test_canceled_ordering_returns_early(self):
+        grid = LineGrid.from_sweep((0, 0), (3000, 0), (0, 1), 50, 25, 200)
+        feedback = QgsFeedback()
+        feedback.cancel()
+
+        started = time.monotonic()
+        order, backward = shortest_transit_order(grid, 300, time_budget=60, feedback=feedback)
+
+        self.assertLess(time.monotonic() - started, 10)
+        np.testing.assert_array_equal(np.sort(order), np.arange(200))
+
+
+def run_all():
+    """Default function that is called by the runner if nothing else is specified"""
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestLineOrdering))
+    unittest.TextTestRunner(verbosity=3, stream=sys.stdout).run(suite)
@@ -2,7 +2,7 @@ import sys
 import os
 
 from qgis.utils import iface
-from qgis.core import QgsVectorLayer, QgsProject, QgsFeature, QgsGeometry, QgsPointXY
+from qgis.core import QgsVectorLayer, QgsProject, QgsFeature, QgsGeometry
 from qgis.testing import unittest
 from parameterized import parameterized
 from unittest.mock import patch, MagicMock
@@ -25,7 +25,9 @@ from ScienceFlightPlanner.tests.utils import (
 # noinspection PyUnresolvedReferences
 from ScienceFlightPlanner.science_flight_planner import ScienceFlightPlanner
 # noinspection PyUnresolvedReferences
-from ScienceFlightPlanner.racetrack_module import RacetrackModule, FlightParameters
+from ScienceFlightPlanner.racetrack_module import RacetrackModule, FlightParameters, ComputationParameters
+# noinspection PyUnresolvedReferences
+from ScienceFlightPlanner.line_ordering import LineGrid
 
 
 class TestRacetracks(BaseTest):
@@ -62,6 +64,7 @@ class TestRacetracks(BaseTest):
         mock_dialog_instance = MagicMock()
         mock_dialog_instance.exec_.return_value = mock_dialog_instance.Accepted
         mock_dialog_instance.get_values.return_value = (1000, FIRST_ALGO_NAME)
+        mock_dialog_instance.get_sortie_values.return_value = (0.0, None)
         mock_dialog.return_value = mock_dialog_instance
         
         # Mock flight altitude spinbox
@@ -86,6 +89,7 @@ class TestRacetracks(BaseTest):
         self.assertEqual(result.coverage_range, 500)
         self.assertEqual(result.max_turn_distance, 1000)
         self.assertEqual(result.algorithm, FIRST_ALGO_NAME)
+        self.assertEqual(result.max_flight_duration, 0.0)
 
     @parameterized.expand([
         ["meander_algorithm", FIRST_ALGO_NAME],
@@ -106,24 +110,14 @@ class TestRacetracks(BaseTest):
         )
         
         # Mock input params
-        mock_params = {
-            'layer': MagicMock(),
-            'feature': MagicMock(),
-            'crs': MagicMock(),
-            'coverage_crs': MagicMock(),
-            'vec': MagicMock(),
-            'vec_normalized': MagicMock(),
-            'point_start': QgsPointXY(0, 0),
-            'point_end': QgsPointXY(1000, 0),
-            'coverage_range': 500.0,
-            'overlap_factor': 0.75,
-            'max_turn_distance': 1000.0,
-            'flight_params': flight_params
-        }
-        
-        mock_params['vec'].length.return_value = 5000.0
-        mock_params['vec_normalized'].x.return_value = 0.0
-        mock_params['vec_normalized'].y.return_value = 1.0
+        mock_params = ComputationParameters(
+            layer=MagicMock(),
+            crs=MagicMock(),
+            coverage_crs=MagicMock(),
+            flight_params=flight_params,
+            grid=LineGrid.from_sweep((0, 0), (1000, 0), (0, 1), 750.0, 500.0, 7),
+            line_spacing=750.0
+        )
         
         mock_prepare_params.return_value = mock_params
         
@@ -138,7 +132,7 @@ class TestRacetracks(BaseTest):
         mock_generate_shp.assert_called_once()
         mock_save_points.assert_called_once()
         points = mock_save_points.call_args[0][0]
-        self.assertTrue(len(points) > 0, "Should have generated waypoints")
+        self.assertEqual(points.shape, (14, 2), "Should have generated two waypoints per leg")
 
     @patch("ScienceFlightPlanner.racetrack_module.RacetrackModule._get_layer_parameters")
     def test_prepare_computation_parameters_no_layer(self, mock_get_layer):
@@ -0,0 +1,44 @@
+import sys
+
+import numpy as np
+from qgis.testing import unittest
+
+# noinspection PyUnresolvedReferences
+from ScienceFlightPlanner.sortie_splitting import split_sorties
+
+
+class TestSortieSplitting(unittest.TestCase):
+
+    def setUp(self):
+        # ten 10 km long lines 500 m apart flown back and forth, the base is 2 km south of the first line
+        self.waypoints = []
+        for i in range(10):
+            line = [[0, 500 * i], [10000, 500 * i]]
+            self.waypoints.extend(line if i % 2 == 0 else line[::-1])
+        self.waypoints = np.array(self.waypoints, dtype=float)
+        self.base = np.array([0, -2000])
+
+    def test_balanced_sorties(self):
+        sorties = split_sorties(self.waypoints, self.base, 100000, 0.5)
+
+        self.assertEqual([(sortie.first_line, sortie.last_line) for sortie in sorties], [(0, 4), (4, 7), (7, 10)])
+        for sortie in sorties:
+            self.assertLessEqual(sortie.duration, 0.5)
+        # the first sortie flies out 2 km, four lines with three transits and back from the end of the fourth line
+        self.assertAlmostEqual(sorties[0].duration, (2000 + 40000 + 1500 + np.hypot(0, 3500)) / 100000)
+
+    def test_single_flight(self):
+        sorties = split_sorties(self.waypoints, self.base, 100000, 10)
+
+        self.assertEqual(len(sorties), 1)
+        self.assertEqual((sorties[0].first_line, sorties[0].last_line), (0, 10))
+
+    def test_line_longer_than_endurance(self):
+        self.assertIsNone(split_sorties(self.waypoints, self.base, 100000, 0.1))
+
+
+def run_all():
+    """Default function that is called by the runner if nothing else is specified"""
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestSortieSplitting))
+    unittest.TextTestRunner(verbosity=3, stream=sys.stdout).run(suite)
@@ -0,0 +1,42 @@
+import sys
+
+import numpy as np
+from qgis.testing import unittest
+
+# noinspection PyUnresolvedReferences
+from ScienceFlightPlanner.spatial_index import ExtentIndex
+
+
+class TestSpatialIndex(unittest.TestCase):
+
+    def test_query_points_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        minimums = rng.uniform(0, 100, (500, 2))
+        extents = np.column_stack((minimums, minimums + rng.uniform(1, 10, (500, 2))))
+        x = rng.uniform(0, 110, 2000)
+        y = rng.uniform(0, 110, 2000)
+
+        point_indices, extent_indices = ExtentIndex(extents, node_capacity=8).query_points(x, y)
+
+        inside = (
+                (x[:, None] >= extents[:, 0]) & (x[:, None] <= extents[:, 2])
+                & (y[:, None] >= extents[:, 1]) & (y[:, None] <= extents[:, 3])
+        )
+        expected = set(zip(*(indices.tolist() for indices in np.nonzero(inside))))
+        self.assertEqual(set(zip(point_indices.tolist(), extent_indices.tolist())), expected)
+
+    def test_query_points_ignores_nan_and_empty_index(self):
+        index = ExtentIndex(np.array([[0, 0, 1, 1]]))
+        point_indices, _ = index.query_points(np.array([np.nan, 0.5]), np.array([0.5, 0.5]))
+        np.testing.assert_array_equal(point_indices, [1])
+
+        point_indices, extent_indices = ExtentIndex(np.empty((0, 4))).query_points([0.5], [0.5])
+        self.assertEqual(len(point_indices), 0)
+        self.assertEqual(len(extent_indices), 0)
+
+
+def run_all():
+    """Default function that is called by the runner if nothing else is specified"""
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestSpatialIndex))
+    unittest.TextTestRunner(verbosity=3, stream=sys.stdout).run(suite)
@@ -0,0 +1,134 @@
+import sys
+
+import numpy as np
+from qgis.testing import unittest
+
+# noinspection PyUnresolvedReferences
+from ScienceFlightPlanner.profile_analysis import (
+    DecimationPyramid,
+    ProfileCache,
+    ProfileResult,
+    compute_danger_segments,
+    corridor_offsets,
+    corridor_statistics,
+    minimum_altitude_profile,
+    nan_separated_segments
+)
+
+
+class TestTopography(unittest.TestCase):
+
+    def test_compute_danger_segments_merges_adjacent_violations(self):
+        data_x = np.arange(8) * 1000.0
+        data_y = np.array([0, 500, 1000, 900, 2000, 1900, 3000, 4000], dtype=float)
+
+        segments = compute_danger_segments(data_x, data_y, 800 / 3.28, 200)
+
+        np.testing.assert_array_equal(segments, [[0, 2], [3, 4], [5, 7]])
+
+    def test_compute_danger_segments_ignores_nodata(self):
+        data_x = np.arange(4) * 1000.0
+        data_y = np.array([0, np.nan, 5000, 5000])
+
+        segments = compute_danger_segments(data_x, data_y, 800 / 3.28, 200)
+
+        self.assertEqual(len(segments), 0)
+
+    def test_nan_separated_segments(self):
+        data_x = np.arange(6, dtype=float)
+        data_y = np.arange(6, dtype=float) * 10
+        segments = np.array([[0, 1], [3, 5]])
+
+        line_x, line_y = nan_separated_segments(data_x, data_y, segments)
+
+        np.testing.assert_array_equal(line_x, [0, 1, np.nan, 3, 4, 5, np.nan])
+        np.testing.assert_array_equal(line_y, [0, 10, np.nan, 30, 40, 50, np.nan])
+
+    def test_decimation_pyramid_preserves_peaks(self):
+        data_x = np.arange(100000, dtype=float)
+        data_y = np.zeros(100000)
+        data_y[12345] = 4000
+        data_y[54321] = -100
+        pyramid = DecimationPyramid(data_x, data_y)
+
+        view_x, view_y = pyramid.view(0, 100000, 1000)
+
+        self.assertLessEqual(len(view_x), 1000)
+        self.assertEqual(view_y.max(), 4000)
+        self.assertEqual(view_y.min(), -100)
+        self.assertEqual(view_x[view_y.argmax()], 12345)
+
+    def test_decimation_pyramid_returns_raw_samples_when_zoomed_in(self):
+        data_x = np.arange(100000, dtype=float)
+        data_y = np.sin(data_x)
+        pyramid = DecimationPyramid(data_x, data_y)
+
+        view_x, view_y = pyramid.view(100, 200, 1000)
+
+        np.testing.assert_array_equal(view_x, data_x[99:202])
+        np.testing.assert_array_equal(view_y, data_y[99:202])
+
+    def test_profile_cache_key_depends_on_geometry_and_parameters(self):
+        coordinates = np.array([[0.0, 0.0], [1.0, 1.0]])
+        key = ProfileCache.make_key("layer", "EPSG:4326", coordinates, "dem", 1000.0, "Nearest")
+
+        self.assertEqual(key, ProfileCache.make_key("layer", "EPSG:4326", coordinates.copy(), "dem", 1000.0, "Nearest"))
+        self.assertNotEqual(key, ProfileCache.make_key("layer", "EPSG:4326", coordinates + 1e-9, "dem", 1000.0, "Nearest"))
+        self.assertNotEqual(key, ProfileCache.make_key("layer", "EPSG:4326", coordinates, "dem", 1000.0, "Bilinear"))
+
+    def test_profile_cache_evicts_and_invalidates(self):
+        cache = ProfileCache(max_entries=2)
+        profile = ProfileResult(np.zeros(2), np.zeros(2), [0.0, 1.0], [])
+        keys = [ProfileCache.make_key(layer, "EPSG:4326", np.zeros((2, 2)), "dem", 1000.0, "Nearest")
+                for layer in ("a", "b", "c")]
+        for key in keys:
+            cache.put(key, profile)
+
+        self.assertIsNone(cache.get(keys[0]))
+        self.assertIs(cache.get(keys[1]), profile)
+
+        cache.invalidate_layer("b")
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIs(cache.get(keys[2]), profile)
+
+    def test_corridor_offsets_follow_resolution_and_are_capped(self):
+        along_offsets, cross_offsets = corridor_offsets(100, 200, 50)
+
+        np.testing.assert_allclose(along_offsets, [-100, -50, 0, 50, 100])
+        np.testing.assert_allclose(cross_offsets, [-100, -50, 0, 50, 100])
+
+        along_offsets, cross_offsets = corridor_offsets(5000, 1000, 1, max_grid_size=16)
+        self.assertEqual(len(along_offsets), 16)
+        self.assertEqual(len(cross_offsets), 16)
+        self.assertEqual(cross_offsets[-1], 5000)
+
+    def test_corridor_statistics_ignore_nodata(self):
+        window_values = np.array([
+            [100, 200, np.nan, 400],
+            [np.nan, np.nan, np.nan, np.nan],
+        ])
+
+        corridor_max, corridor_percentile = corridor_statistics(window_values, 50)
+
+        np.testing.assert_array_equal(corridor_max, [400, np.nan])
+        np.testing.assert_array_equal(corridor_percentile, [200, np.nan])
+
+    def test_minimum_altitude_profile_respects_rates_and_clearance(self):
+        # 60 km/h, so the rates in m/min are the gradients in m per km
+        data_x = np.arange(11) * 1000.0
+        terrain_y = np.array([0, 0, 0, 0, 0, 1000, 0, 0, 0, 0, np.nan])
+
+        altitudes = minimum_altitude_profile(data_x, terrain_y, 100, 300, 500, 60)
+
+        np.testing.assert_allclose(altitudes[:10], [100, 100, 200, 500, 800, 1100, 600, 100, 100, 100])
+        self.assertTrue(np.isnan(altitudes[10]))
+        self.assertTrue(np.all(altitudes[:10] >= terrain_y[:10] + 100))
+        self.assertTrue(np.all(np.diff(altitudes[:10]) <= 300))
+        self.assertTrue(np.all(np.diff(altitudes[:10]) >= -500))
+
+
+def run_all():
+    """Default function that is called by the runner if nothing else is specified"""
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestTopography))
+    unittest.TextTestRunner(verbosity=3, stream=sys.stdout).run(suite)
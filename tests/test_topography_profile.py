@@ -0,0 +1,97 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+from osgeo import gdal, osr
+from qgis.testing import unittest
+
+# noinspection PyUnresolvedReferences
+from ScienceFlightPlanner.topography_profile import compute_profile, write_profile
+
+DEM_PATH = "/vsimem/test_topography_profile_dem.tif"
+COARSE_DEM_PATH = "/vsimem/test_topography_profile_coarse_dem.tif"
+FINE_TILE_PATH = "/vsimem/test_topography_profile_fine_tile.tif"
+
+
+def create_dem(path, geo_transform, values, nodata=None):
+    dataset = gdal.GetDriverByName("GTiff").Create(path, values.shape[1], values.shape[0], 1, gdal.GDT_Float32)
+    dataset.SetGeoTransform(geo_transform)
+    spatial_reference = osr.SpatialReference()
+    spatial_reference.ImportFromEPSG(4326)
+    dataset.SetProjection(spatial_reference.ExportToWkt())
+    band = dataset.GetRasterBand(1)
+    if nodata is not None:
+        band.SetNoDataValue(nodata)
+    band.WriteArray(values.astype(np.float32))
+    dataset.FlushCache()
+
+
+class TestTopographyProfile(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # 0.01° pixels from 10°E to 12°E and 49°N to 50°N, the height rises by 10 m per pixel column to the east
+        create_dem(DEM_PATH, (10.0, 0.01, 0.0, 50.0, 0.0, -0.01), np.tile(np.arange(200) * 10, (100, 1)))
+        # a constant coarse fallback and a finer tile with a nodata hole in its western half
+        create_dem(COARSE_DEM_PATH, (0.0, 0.1, 0.0, 60.0, 0.0, -0.1), np.full((200, 300), 50))
+        fine_values = np.full((100, 100), 500)
+        fine_values[:, :50] = -9999
+        create_dem(FINE_TILE_PATH, (10.0, 0.005, 0.0, 50.0, 0.0, -0.005), fine_values, nodata=-9999)
+
+    @classmethod
+    def tearDownClass(cls):
+        for path in (DEM_PATH, COARSE_DEM_PATH, FINE_TILE_PATH):
+            gdal.Unlink(path)
+
+    def test_compute_profile(self):
+        points = np.array([[10.005, 49.5], [11.005, 49.5]])
+
+        profile = compute_profile(points, "EPSG:4326", DEM_PATH, interval=1000)
+
+        self.assertEqual(len(profile.waypoint_distances), 2)
+        self.assertAlmostEqual(profile.distances[-1], profile.waypoint_distances[-1])
+        self.assertEqual(profile.heights[0], 0)
+        self.assertEqual(profile.heights[-1], 1000)
+        self.assertTrue(np.all(np.diff(profile.heights) >= 0))
+        self.assertIsNone(profile.corridor_max)
+
+    def test_corridor_is_at_least_centerline(self):
+        points = np.array([[10.5, 49.2], [10.5, 49.8]])
+
+        profile = compute_profile(points, "EPSG:4326", DEM_PATH, interval=1000, corridor_half_width=2000)
+
+        # the swath reaches about three pixel columns further east than the centerline
+        self.assertTrue(np.all(profile.corridor_max >= profile.heights))
+        self.assertTrue(np.all(profile.corridor_max - profile.heights >= 20))
+
+    def test_mosaic_prefers_finest_tile_with_data(self):
+        # from the hole of the fine tile over the fine tile to the east of it
+        points = np.array([[10.1, 49.75], [10.4, 49.75], [10.8, 49.75]])
+
+        profile = compute_profile(points, "EPSG:4326", [COARSE_DEM_PATH, FINE_TILE_PATH], interval=1000)
+
+        in_hole = profile.lons < 10.25
+        on_fine_tile = (profile.lons > 10.25) & (profile.lons < 10.5)
+        outside_fine_tile = profile.lons > 10.5
+        self.assertTrue(np.all(profile.heights[in_hole] == 50))
+        self.assertTrue(np.all(profile.heights[on_fine_tile] == 500))
+        self.assertTrue(np.all(profile.heights[outside_fine_tile] == 50))
+
+    def test_write_profile_as_csv(self):
+        profile = compute_profile(np.array([[10.005, 49.5], [10.5, 49.5]]), "EPSG:4326", DEM_PATH)
+
+        with tempfile.TemporaryDirectory() as directory:
+            output_path = os.path.join(directory, "profile.csv")
+            write_profile(profile, output_path, "csv")
+            data = np.loadtxt(output_path, delimiter=",", skiprows=1)
+
+        np.testing.assert_allclose(data[:, 0], profile.distances, rtol=1e-7)
+        np.testing.assert_array_equal(data[:, 1], profile.heights)
+
+
+def run_all():
+    """Default function that is called by the runner if nothing else is specified"""
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestTopographyProfile))
+    unittest.TextTestRunner(verbosity=3, stream=sys.stdout).run(suite)
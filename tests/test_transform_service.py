@@ -0,0 +1,53 @@
+import sys
+
+import numpy as np
+from qgis.core import QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsPointXY, QgsProject
+from qgis.testing import unittest
+
+# noinspection PyUnresolvedReferences
+from ScienceFlightPlanner.utils import CoordinateTransformService
+
+WGS84_CRS = QgsCoordinateReferenceSystem("EPSG:4326")
+UTM_CRS = QgsCoordinateReferenceSystem("EPSG:32632")
+
+
+class TestTransformService(unittest.TestCase):
+
+    def setUp(self):
+        self.service = CoordinateTransformService()
+
+    def test_transforms_are_cached_per_crs_pair(self):
+        self.service.get_transform(WGS84_CRS, UTM_CRS)
+        self.service.get_transform(WGS84_CRS, UTM_CRS)
+        self.service.get_transform(UTM_CRS, WGS84_CRS)
+
+        self.assertEqual(len(self.service.transforms), 2)
+
+    def test_array_transform_matches_point_transform(self):
+        lons = np.array([[8.0, 8.5], [9.0, 9.5]])
+        lats = np.array([[48.0, 48.5], [49.0, 49.5]])
+        transform = QgsCoordinateTransform(WGS84_CRS, UTM_CRS, QgsProject.instance())
+
+        x, y = self.service.transform_coordinates(lons, lats, WGS84_CRS, UTM_CRS)
+
+        self.assertEqual(x.shape, lons.shape)
+        for i, j in np.ndindex(lons.shape):
+            point = transform.transform(QgsPointXY(lons[i, j], lats[i, j]))
+            self.assertAlmostEqual(x[i, j], point.x(), places=4)
+            self.assertAlmostEqual(y[i, j], point.y(), places=4)
+
+    def test_same_crs_and_empty_input(self):
+        x, y = self.service.transform_coordinates([1.0, 2.0], [3.0, 4.0], UTM_CRS, UTM_CRS)
+        np.testing.assert_array_equal(x, [1.0, 2.0])
+        np.testing.assert_array_equal(y, [3.0, 4.0])
+
+        x, y = self.service.transform_coordinates([], [], WGS84_CRS, UTM_CRS)
+        self.assertEqual(x.size, 0)
+        self.assertEqual(len(self.service.transforms), 0)
+
+
+def run_all():
+    """Default function that is called by the runner if nothing else is specified"""
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestTransformService))
+    unittest.TextTestRunner(verbosity=3, stream=sys.stdout).run(suite)
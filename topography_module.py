@@ -1,10 +1,11 @@
 import os
-import numpy as np
+from functools import partial
+from typing import List
 
-from osgeo import gdal
+import numpy as np
 
 from qgis.PyQt.QtGui import QColor
-from qgis.PyQt.QtCore import Qt
+from qgis.PyQt.QtCore import Qt, QTimer, QVariant, pyqtSignal
 from qgis.PyQt.QtWidgets import (
     QDockWidget,
     QWidget,
@@ -15,41 +16,85 @@ from qgis.PyQt.QtWidgets import (
     QLabel,
     QToolBar,
     QDialog,
-    QPushButton
+    QPushButton,
+    QComboBox,
+    QFormLayout
 )
 
 from qgis.core import (
-    QgsCoordinateTransform,
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransformContext,
+    QgsPointXY,
     QgsProject,
-    QgsDistanceArea,
     QgsTask,
     QgsApplication,
     LayerFilters,
     Qgis,
-    QgsGeometry
+    QgsGeometry,
+    QgsMapLayer,
+    QgsSettings
 )
 from qgis.gui import (
     QgisInterface,
+    QgsCheckableComboBox,
+    QgsFileWidget,
     QgsMapLayerComboBox,
     QgsRubberBand
 )
 
 from .constants import (
     PLUGIN_NAME,
-    ICON_DIRECTORY_PATH
+    PLUGIN_DEM_CACHE_SIZE_SETTINGS_PATH,
+    PLUGIN_SENSOR_SETTINGS_PATH,
+    SENSOR_COMBOBOX_DEFAULT_VALUE,
+    DEFAULT_PUSH_MESSAGE_DURATION,
+    ICON_DIRECTORY_PATH,
+    QGIS_FIELD_NAME_ALTITUDE
 )
 from .libs.pyqtgraph import (
-    PlotItem,
     AxisItem,
+    FillBetweenItem,
     PlotWidget,
+    mkBrush,
     mkPen
 )
 
-from .utils import LayerUtils
+from . import geodesic
+from .coverage_module import CoverageModule
+from .raster_sampling import (
+    BLOCK_CACHE,
+    DEFAULT_BLOCK_CACHE_SIZE_MB,
+    MosaicSampler,
+    INTERPOLATION_METHODS,
+    NEAREST_INTERPOLATION,
+    raster_paths_in_directory
+)
+from .profile_analysis import (
+    DecimationPyramid,
+    ProfileCache,
+    ProfileResult,
+    compute_danger_segments,
+    minimum_altitude_profile,
+    nan_separated_segments,
+    waypoint_marker_lines
+)
+from .topography_profile import (
+    CORRIDOR_PERCENTILE,
+    PROFILE_SAMPLE_INTERVAL,
+    profile_legs
+)
+from .utils import LayerUtils, transform_coordinates
+
+WGS84_CRS = QgsCoordinateReferenceSystem("EPSG:4326")
+MIN_LEVEL_OF_DETAIL_POINTS = 200
+DEFAULT_TERRAIN_CLEARANCE = 300  # in m
+DEFAULT_MAX_DESCENT_RATE = 1500  # in feet/min
+# legs streamed in are drawn in batches at most this often, in ms
+PROFILE_REDRAW_INTERVAL = 250
 
 
 class RasterSelectionDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, sensor_names=None):
         super().__init__(parent)
         self.setWindowTitle("Select Raster Layer")
         self.setModal(True)
@@ -62,6 +107,38 @@ class RasterSelectionDialog(QDialog):
         self.layer_combo.setFilters(LayerFilters.LayerFilter.RasterLayer)
         v_layout.addWidget(self.layer_combo)
 
+        # further DEM tiles are combined with the selected raster into one mosaic, the finest tile wins
+        tiles_layout = QFormLayout()
+        self.additional_layers_combo = QgsCheckableComboBox()
+        for layer in QgsProject.instance().mapLayers().values():
+            if layer.type() == QgsMapLayer.RasterLayer:
+                self.additional_layers_combo.addItem(layer.name(), layer.id())
+        tiles_layout.addRow("Additional DEM tiles:", self.additional_layers_combo)
+        self.folder_widget = QgsFileWidget()
+        self.folder_widget.setStorageMode(QgsFileWidget.GetDirectory)
+        tiles_layout.addRow("DEM tile folder:", self.folder_widget)
+        v_layout.addLayout(tiles_layout)
+
+        interpolation_layout = QHBoxLayout()
+        interpolation_layout.addWidget(QLabel("Interpolation:"))
+        self.interpolation_combo = QComboBox()
+        self.interpolation_combo.addItems(INTERPOLATION_METHODS)
+        self.interpolation_combo.setCurrentText(NEAREST_INTERPOLATION)
+        interpolation_layout.addWidget(self.interpolation_combo)
+        v_layout.addLayout(interpolation_layout)
+
+        # the swath of the selected sensor is sampled as corridor around the flight path
+        corridor_layout = QHBoxLayout()
+        corridor_layout.addWidget(QLabel("Corridor sensor:"))
+        self.corridor_sensor_combo = QComboBox()
+        self.corridor_sensor_combo.addItem(SENSOR_COMBOBOX_DEFAULT_VALUE)
+        self.corridor_sensor_combo.addItems(sensor_names or [])
+        self.corridor_sensor_combo.setToolTip(
+            f"Samples the maximum and the {CORRIDOR_PERCENTILE}th percentile of the terrain across the sensor swath"
+        )
+        corridor_layout.addWidget(self.corridor_sensor_combo)
+        v_layout.addLayout(corridor_layout)
+
         self.ok_button = QPushButton("OK")
         self.ok_button.clicked.connect(self.accept)  # Closes dialog with success
         self.ok_button.setDefault(True)
@@ -77,6 +154,74 @@ class RasterSelectionDialog(QDialog):
         """Returns the selected Raster Layer"""
         return self.layer_combo.currentLayer()
 
+    def get_selected_layers(self):
+        """Returns the selected Raster Layer together with all checked additional Raster Layers"""
+        layers = []
+        if self.layer_combo.currentLayer() is not None:
+            layers.append(self.layer_combo.currentLayer())
+        for layer_id in self.additional_layers_combo.checkedItemsData():
+            layer = QgsProject.instance().mapLayer(layer_id)
+            if layer is not None and layer not in layers:
+                layers.append(layer)
+        return layers
+
+    def get_raster_folder(self):
+        """Returns the selected folder of DEM tiles or an empty string"""
+        return self.folder_widget.filePath()
+
+    def get_interpolation(self):
+        """Returns the selected interpolation method for sampling the raster"""
+        return self.interpolation_combo.currentText()
+
+    def get_corridor_sensor(self):
+        """Returns the sensor whose swath is sampled as corridor or None for a centerline profile"""
+        sensor = self.corridor_sensor_combo.currentText()
+        if sensor == SENSOR_COMBOBOX_DEFAULT_VALUE or sensor == "":
+            return None
+        return sensor
+
+
+class MinimumAltitudeDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Minimum Altitude Profile")
+        self.setModal(True)
+
+        form_layout = QFormLayout(self)
+
+        terrain_clearance, _ = QgsProject.instance().readNumEntry(
+            PLUGIN_NAME, "terrain_clearance", DEFAULT_TERRAIN_CLEARANCE
+        )
+        self.clearance_spinbox = QSpinBox()
+        self.clearance_spinbox.setMaximum(9999)
+        self.clearance_spinbox.setSingleStep(10)
+        self.clearance_spinbox.setValue(terrain_clearance)
+        form_layout.addRow("Terrain clearance in m", self.clearance_spinbox)
+
+        max_descent_rate, _ = QgsProject.instance().readNumEntry(
+            PLUGIN_NAME, "max_descent_rate", DEFAULT_MAX_DESCENT_RATE
+        )
+        self.descent_rate_spinbox = QSpinBox()
+        self.descent_rate_spinbox.setMaximum(9999)
+        self.descent_rate_spinbox.setSingleStep(10)
+        self.descent_rate_spinbox.setValue(max_descent_rate)
+        form_layout.addRow("Maximum descent rate in feet/min", self.descent_rate_spinbox)
+
+        h_layout = QHBoxLayout()
+        self.ok_button = QPushButton("OK")
+        self.ok_button.clicked.connect(self.accept)
+        self.ok_button.setDefault(True)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.reject)
+        h_layout.addWidget(self.ok_button)
+        h_layout.addWidget(self.cancel_button)
+        form_layout.addRow(h_layout)
+
+    def accept(self):
+        QgsProject.instance().writeEntry(PLUGIN_NAME, "terrain_clearance", self.clearance_spinbox.value())
+        QgsProject.instance().writeEntry(PLUGIN_NAME, "max_descent_rate", self.descent_rate_spinbox.value())
+        super().accept()
+
 
 class CustomAxisTop(AxisItem):
     def __init__(self, wp_data_x):
@@ -95,79 +240,170 @@ def plot(
         data_x,
         data_y,
 ):
-    danger_points = []
-    for i in range(len(data_x) - 1):
-        x_distance = data_x[i + 1] - data_x[i]
-        max_height_gain = max_climbing_rate_meters / ((flight_speed_kmh * 1000 / 60) / x_distance)
-        y_distance = data_y[i + 1] - data_y[i]
-        if max_height_gain <= y_distance:
-            danger_points.append(i)
+    danger_segments = compute_danger_segments(data_x, data_y, max_climbing_rate_meters, flight_speed_kmh)
+    line_x, line_y = nan_separated_segments(data_x, data_y, danger_segments)
+    return danger_segments, line_x, line_y
+
+
+class TopographyProfileTask(QgsTask):
+    """Extracts the topography profile of a waypoint layer in the background. The profile is densified leg by leg
+    and every finished leg is emitted, so the plot can be filled while the remaining legs are computed. With a
+    corridor half width, the maximum and a percentile of the terrain across the swath are computed as well."""
+
+    waypoint_distances_computed = pyqtSignal(object)
+    # distances, heights, points and (corridor maximum, corridor percentile) or None
+    leg_computed = pyqtSignal(object, object, object, object)
+
+    def __init__(
+            self,
+            waypoints: List[QgsPointXY],
+            vector_layer_crs: QgsCoordinateReferenceSystem,
+            raster_paths: List[str],
+            interpolation: str,
+            transform_context: QgsCoordinateTransformContext,
+            corridor_half_width: float = 0.0,
+    ):
+        super().__init__("Create topography profile", QgsTask.CanCancel)
+        self.waypoints = waypoints
+        self.vector_layer_crs = vector_layer_crs
+        self.raster_paths = raster_paths
+        self.interpolation = interpolation
+        self.transform_context = transform_context
+        self.corridor_half_width = corridor_half_width
+        self.exception = None
+
+    def run(self) -> bool:
+        try:
+            return self._compute_profile()
+        except Exception as e:
+            self.exception = e
+            return False
+
+    def _compute_profile(self) -> bool:
+        # the transform service hands out copies of its cached transforms, so they can be used by this task
+        def transform_factory(raster_crs_wkt: str):
+            raster_crs = QgsCoordinateReferenceSystem.fromWkt(raster_crs_wkt)
+            return partial(
+                transform_coordinates,
+                source_crs=WGS84_CRS,
+                destination_crs=raster_crs,
+                context=self.transform_context,
+            )
+
+        dem_sampler = MosaicSampler(self.raster_paths, transform_factory)
+
+        lons, lats = transform_coordinates(
+            [p.x() for p in self.waypoints],
+            [p.y() for p in self.waypoints],
+            self.vector_layer_crs,
+            WGS84_CRS,
+            self.transform_context,
+        )
+        self.waypoint_distances_computed.emit(list(geodesic.legs(lons, lats).cumulative))
+
+        number_of_legs = len(self.waypoints) - 1
+        legs = profile_legs(
+            lons,
+            lats,
+            dem_sampler,
+            PROFILE_SAMPLE_INTERVAL,
+            self.interpolation,
+            self.corridor_half_width,
+        )
+        for i, leg in enumerate(legs):
+            points = [QgsPointXY(lon, lat) for lon, lat in zip(leg.lons, leg.lats)]
+            corridor = None
+            if leg.corridor_max is not None:
+                corridor = (leg.corridor_max, leg.corridor_percentile)
+
+            self.leg_computed.emit(leg.distances, leg.heights, points, corridor)
+            self.setProgress(100 * (i + 1) / number_of_legs)
 
-    lines = []
-    for i in danger_points:
-        x_1 = data_x[i]
-        x_2 = data_x[i + 1]
-        y_1 = data_y[i]
-        y_2 = data_y[i + 1]
-        lines.append(([x_1, x_2], [y_1, y_2]))
+            if self.isCanceled():
+                return False
 
-    return danger_points, lines
+        return True
 
 
 class PlotDock(QDockWidget):
     def __init__(self,
                  iface,
-                 data_x,
-                 data_y,
-                 wp_data_x,
                  max_climb_rate_spinbox,
-                 points,
-                 layer_crs
+                 layer_crs,
+                 title="Topography",
+                 waypoint_layer=None,
+                 waypoint_feature_ids=None
                  ):
-        super().__init__("Topography", iface.mainWindow())
+        super().__init__(title, iface.mainWindow())
 
         self.iface = iface
-        self.data_x = np.array(data_x)
-        self.x_max = self.data_x.max()
-        self.data_y = np.array(data_y)
-        self.y_max = self.data_y.max()
-        self.wp_data_x = wp_data_x
-        self.v_lines = []
-        self.danger_lines = []
+        self.layer_utils = LayerUtils(iface)
+        self.waypoint_layer = waypoint_layer
+        self.waypoint_feature_ids = waypoint_feature_ids or []
+        self.data_x = np.array([], dtype=float)
+        self.data_y = np.array([], dtype=float)
+        self.x_max = 0
+        self.y_max = 0
+        self.data_x_chunks = []
+        self.data_y_chunks = []
+        self.corridor_max = None
+        self.corridor_percentile = None
+        self.corridor_max_chunks = []
+        self.corridor_percentile_chunks = []
+        # plot items of the legs drawn while streaming and the number of legs drawn so far
+        self.leg_batch_items = []
+        self.drawn_legs = 0
+        # number of legs in data_x and data_y
+        self.concatenated_legs = 0
+        self.wp_data_x = []
+        self.pyramid = None
         self.max_climb_rate_spinbox = max_climb_rate_spinbox
-        self.points = points
-        self.rubber_bands = []
+        self.points = []
         self.layer_crs = layer_crs
-        self.graph = PlotItem()
+        self.profile_task = None
+        self.climb_rate_task = None
+        self.is_profile_complete = False
+        self.is_closed = False
 
         self.plot_widget = PlotWidget()
         self.plot_widget.showGrid(True, True, 0.5)
-        self.graph = self.plot_widget.plot(self.data_x, self.data_y)
+        self.graph = self.plot_widget.plot([], [], connect="finite")
+        # the whole profile is only set once it is complete, pyqtgraph decimates it until the pyramid is built
+        self.graph.setDownsampling(auto=True, method="peak")
+        self.graph.setClipToView(True)
+        # all waypoint markers are drawn by a single item, separated by NaN
+        self.waypoint_lines = self.plot_widget.plot([], [], pen=mkPen(color=(255, 255, 0, 100), width=1), connect="finite")
+        self.waypoint_lines.setVisible(False)
+        # the terrain across the sensor swath is drawn as band between its percentile and its maximum
+        self.corridor_pen = mkPen(color=(255, 170, 0, 150), width=1)
+        self.corridor_max_line = self.plot_widget.plot([], [], pen=self.corridor_pen, connect="finite")
+        self.corridor_percentile_line = self.plot_widget.plot([], [], pen=self.corridor_pen, connect="finite")
+        for corridor_line in (self.corridor_max_line, self.corridor_percentile_line):
+            corridor_line.setDownsampling(auto=True, method="peak")
+            corridor_line.setClipToView(True)
+        self.corridor_band = FillBetweenItem(
+            self.corridor_percentile_line, self.corridor_max_line, brush=mkBrush(255, 170, 0, 60)
+        )
+        self.plot_widget.addItem(self.corridor_band)
+        self.altitude_line = self.plot_widget.plot([], [], pen=mkPen(color=(0, 200, 0), width=1), connect="finite")
+        # all dangerous segments are drawn by a single item, separated by NaN
+        self.danger_line = self.plot_widget.plot([], [], pen=mkPen(color=(255, 0, 0), width=1), connect="finite")
 
-        #self.plot_widget.getViewBox().border = mkPen(color=(0, 0, 0), width=1)
+        self.redraw_timer = QTimer(self)
+        self.redraw_timer.setSingleShot(True)
+        self.redraw_timer.setInterval(PROFILE_REDRAW_INTERVAL)
+        self.redraw_timer.timeout.connect(self.draw_pending_legs)
 
-        x_axis_top = CustomAxisTop(wp_data_x)
-        self.plot_widget.setAxisItems({'top': x_axis_top})
-
-        plot_height = self.y_max + 100
+        self.rubber_band = QgsRubberBand(self.iface.mapCanvas(), Qgis.GeometryType.Line)
+        self.rubber_band.setColor(QColor(255, 0, 0, 150))  # Semi-transparent red
+        self.rubber_band.setWidth(7)  # Line width
 
-        self.plot_widget.getViewBox().setLimits(xMin=-10000, yMin=0, yMax=plot_height)
-        self.plot_widget.getViewBox().setRange(xRange=(0, self.x_max), yRange=(0, self.y_max))
+        #self.plot_widget.getViewBox().border = mkPen(color=(0, 0, 0), width=1)
 
         self.plot_widget.getAxis("left").setLabel("Height", "m")
-        self.plot_widget.getAxis("top").setLabel("Waypoint ID")
         self.plot_widget.getAxis("bottom").setLabel("Distance", "m")
         self.plot_widget.getAxis("bottom").enableAutoSIPrefix(False)
 
-        self.v_lines = []
-        for x in self.wp_data_x:
-            line_x = [x, x]
-            line_y = [0, plot_height]  # Full height of the plot
-
-            v_line = self.plot_widget.plot(line_x, line_y, pen=mkPen(color=(255, 255, 0, 100), width=1))
-            v_line.setVisible(False)
-            self.v_lines.append(v_line)
-
         dock_widget = QWidget()
         v_layout = QVBoxLayout(dock_widget)
         h_layout = QHBoxLayout(dock_widget)
@@ -179,6 +415,14 @@ class PlotDock(QDockWidget):
         self.check_box.stateChanged.connect(lambda: self.toggle_line())
         h_layout.addWidget(self.check_box, 0, Qt.AlignLeft)
 
+        self.altitude_button = QPushButton("Minimum Altitude")
+        self.altitude_button.setToolTip(
+            "Computes the lowest flyable altitude profile and writes the waypoint altitudes to the layer"
+        )
+        self.altitude_button.setEnabled(False)
+        self.altitude_button.clicked.connect(self.compute_minimum_altitude)
+        h_layout.addWidget(self.altitude_button, 0, Qt.AlignLeft)
+
         self.plot_widget.plotItem.autoBtn.setImageFile(os.path.join(":resources", "icons_for_dark_mode", "icon_scale_up_or_down.png"))
         self.plot_widget.plotItem.autoBtn._width = 32
         self.plot_widget.plotItem.autoBtn.update()
@@ -203,18 +447,172 @@ class PlotDock(QDockWidget):
         #     self.plot_task
         # )
 
+    def compute_profile(self, task: TopographyProfileTask):
+        """Starts the given profile task and streams its results into the plot"""
+        self.profile_task = task
+        task.waypoint_distances_computed.connect(self.set_waypoint_distances)
+        task.leg_computed.connect(self.add_leg)
+        task.taskCompleted.connect(self.profile_completed)
+        task.taskTerminated.connect(self.profile_terminated)
+        QgsApplication.taskManager().addTask(task)
+
+    def show_profile(self, profile: ProfileResult):
+        """Shows an already computed profile without starting a task"""
+        self.set_waypoint_distances(profile.wp_data_x)
+        corridor = None
+        if profile.corridor_max is not None:
+            corridor = (profile.corridor_max, profile.corridor_percentile)
+        self.add_leg(profile.data_x, profile.data_y, profile.points, corridor)
+        self.profile_completed()
+
+    def profile_result(self) -> ProfileResult:
+        """Returns the computed profile, so it can be cached"""
+        self._concatenate_legs()
+        return ProfileResult(
+            self.data_x, self.data_y, self.wp_data_x, list(self.points), self.corridor_max, self.corridor_percentile
+        )
+
+    def set_waypoint_distances(self, wp_data_x):
+        """Sets the distances of the waypoints along the profile, used for the waypoint axis and lines"""
+        self.wp_data_x = wp_data_x
+        self.x_max = wp_data_x[-1]
+
+        x_axis_top = CustomAxisTop(wp_data_x)
+        self.plot_widget.setAxisItems({'top': x_axis_top})
+        self.plot_widget.getAxis("top").setLabel("Waypoint ID")
+        self.plot_widget.getViewBox().setRange(xRange=(0, self.x_max))
+
+    def add_leg(self, data_x, data_y, points, corridor=None):
+        """Appends the samples of a computed leg and optionally the corridor statistics to the profile. The leg is
+        drawn with the next batch, the whole profile is only put together once it is complete."""
+        self.data_x_chunks.append(data_x)
+        self.data_y_chunks.append(data_y)
+        self.points.extend(points)
+
+        highest_values = data_y
+        if corridor is not None:
+            self.corridor_max_chunks.append(corridor[0])
+            self.corridor_percentile_chunks.append(corridor[1])
+            highest_values = corridor[0]
+
+        if np.isfinite(highest_values).any():
+            self.y_max = max(self.y_max, np.nanmax(highest_values))
+        if not self.redraw_timer.isActive():
+            self.redraw_timer.start()
+
+    def _concatenate_legs(self):
+        """Puts the profile together from the legs, once all of them are computed"""
+        if self.concatenated_legs == len(self.data_x_chunks):
+            return
+        self.data_x = np.concatenate(self.data_x_chunks)
+        self.data_y = np.concatenate(self.data_y_chunks)
+        if self.corridor_max_chunks:
+            self.corridor_max = np.concatenate(self.corridor_max_chunks)
+            self.corridor_percentile = np.concatenate(self.corridor_percentile_chunks)
+        self.concatenated_legs = len(self.data_x_chunks)
+
+    def _pending_samples(self, chunks):
+        """Returns the samples of the legs not drawn yet, starting at the last sample drawn so the batches connect"""
+        pending = chunks[self.drawn_legs:]
+        if self.drawn_legs > 0:
+            pending = [chunks[self.drawn_legs - 1][-1:]] + pending
+        return np.concatenate(pending)
+
+    def draw_pending_legs(self):
+        """Draws the legs received since the last batch as new plot items, legs drawn before are not touched"""
+        if self.is_closed or self.drawn_legs == len(self.data_x_chunks):
+            return
+        batch_x = self._pending_samples(self.data_x_chunks)
+        self.leg_batch_items.append(
+            self._plot_batch(batch_x, self._pending_samples(self.data_y_chunks), self.graph.opts["pen"])
+        )
+        if self.corridor_max_chunks:
+            corridor_max_line = self._plot_batch(
+                batch_x, self._pending_samples(self.corridor_max_chunks), self.corridor_pen
+            )
+            corridor_percentile_line = self._plot_batch(
+                batch_x, self._pending_samples(self.corridor_percentile_chunks), self.corridor_pen
+            )
+            corridor_band = FillBetweenItem(corridor_percentile_line, corridor_max_line, brush=mkBrush(255, 170, 0, 60))
+            self.plot_widget.addItem(corridor_band)
+            self.leg_batch_items.extend([corridor_max_line, corridor_percentile_line, corridor_band])
+        self.drawn_legs = len(self.data_x_chunks)
+        self.update_view_limits()
+
+    def _plot_batch(self, data_x, data_y, pen):
+        """Plots the samples of a batch of legs, decimated by pyqtgraph while the profile is streamed in"""
+        item = self.plot_widget.plot(data_x, data_y, pen=pen, connect="finite")
+        item.setDownsampling(auto=True, method="peak")
+        item.setClipToView(True)
+        return item
+
+    def remove_leg_batches(self):
+        """Removes the plot items drawn while the legs were streamed in"""
+        self.redraw_timer.stop()
+        for item in self.leg_batch_items:
+            self.plot_widget.removeItem(item)
+        self.leg_batch_items = []
+        self.drawn_legs = 0
+
+    def update_view_limits(self):
+        plot_height = self.y_max + 100
+        self.plot_widget.getViewBox().setLimits(xMin=-10000, yMin=0, yMax=plot_height)
+        self.plot_widget.getViewBox().setRange(xRange=(0, self.x_max), yRange=(0, self.y_max))
+
+    def profile_completed(self):
+        """Draws the waypoint lines and checks the climb rate once all legs are computed"""
+        self.profile_task = None
+        if self.is_closed:
+            return
+        self.is_profile_complete = True
+
+        # the streamed batches are replaced by the whole profile, concatenated once
+        self.remove_leg_batches()
+        self._concatenate_legs()
+        self.graph.setData(self.data_x, self.data_y, connect="finite")
+        if self.corridor_max is not None:
+            self.corridor_max_line.setData(self.data_x, self.corridor_max, connect="finite")
+            self.corridor_percentile_line.setData(self.data_x, self.corridor_percentile, connect="finite")
+        self.update_view_limits()
+
+        self.waypoint_lines.setData(*waypoint_marker_lines(self.wp_data_x, self.y_max + 100), connect="finite")
+
+        # the decimation pyramid is built once, afterwards every zoom level draws about one point per pixel
+        self.pyramid = DecimationPyramid(self.data_x, self.data_y)
+        self.graph.setDownsampling(ds=1, auto=False)
+        self.graph.setClipToView(False)
+        self.plot_widget.getViewBox().sigXRangeChanged.connect(self.update_level_of_detail)
+        self.update_level_of_detail()
+        self.altitude_button.setEnabled(self.waypoint_layer is not None)
+
+        self.plot_task()
+
+    def profile_terminated(self):
+        task = self.profile_task
+        self.profile_task = None
+        # the legs computed until then stay visible
+        self.redraw_timer.stop()
+        self.draw_pending_legs()
+        if task is not None and task.exception is not None:
+            self.iface.messageBar().pushMessage(
+                "Couldn't create topography profile",
+                str(task.exception),
+                level=Qgis.MessageLevel.Warning,
+                duration=DEFAULT_PUSH_MESSAGE_DURATION,
+            )
+
     def plot_task(self):
+        if not self.is_profile_complete:
+            return
+
         max_climbing_rate_feet = self.max_climb_rate_spinbox.value()
         max_climbing_rate_meters = max_climbing_rate_feet / 3.28
         flight_speed_kmh, _ = QgsProject.instance().readDoubleEntry(
             PLUGIN_NAME, "flight_speed", 200
         )
 
-        for line in self.danger_lines:
-            self.plot_widget.removeItem(line)
-
-        # globals()['task'] is needed because QgsTask is weird when used within function scopes
-        globals()['task'] = QgsTask.fromFunction(
+        # the reference to the task is kept, otherwise it is garbage collected before it runs
+        self.climb_rate_task = QgsTask.fromFunction(
             "plot",
             plot,
             on_finished=self.task_completed,
@@ -224,44 +622,107 @@ class PlotDock(QDockWidget):
             data_y=self.data_y
         )
 
-        QgsApplication.taskManager().addTask(globals()['task'])
+        QgsApplication.taskManager().addTask(self.climb_rate_task)
 
     def task_completed(self, exception, result=None):
         if exception is not None:
             raise exception
+        if self.is_closed:
+            return
 
-        danger_points, lines = result
-        for line_x, line_y in lines:
-            line = self.plot_widget.plot(line_x, line_y, pen=mkPen(color=(255, 0, 0), width=1))
-            self.danger_lines.append(line)
+        danger_segments, line_x, line_y = result
+        self.danger_line.setData(line_x, line_y, connect="finite")
 
-        for rubber_band in self.rubber_bands:
-            rubber_band.reset()
+        polylines = [self.points[start:end + 1] for start, end in danger_segments]
 
-        map_canvas = self.iface.mapCanvas()
-        for i in danger_points:
-            point_tuple = [self.points[i], self.points[i + 1]]
-            geom = QgsGeometry.fromPolylineXY(point_tuple)
-            rubber_band = QgsRubberBand(map_canvas, Qgis.GeometryType.Line)  # False = LineString
-            rubber_band.setColor(QColor(255, 0, 0, 150))  # Semi-transparent red
-            rubber_band.setWidth(7)  # Line width
+        self.rubber_band.reset(Qgis.GeometryType.Line)
+        if polylines:
+            self.rubber_band.setToGeometry(QgsGeometry.fromMultiPolylineXY(polylines), self.layer_crs)
+
+    def compute_minimum_altitude(self):
+        """Computes the lowest altitude profile within the climb and descent rates and writes the altitudes of the
+        waypoints to the waypoint layer"""
+        if not self.is_profile_complete:
+            return
+        dialog = MinimumAltitudeDialog(self.iface.mainWindow())
+        if dialog.exec_() != QDialog.Accepted:
+            return
+
+        flight_speed_kmh, _ = QgsProject.instance().readDoubleEntry(
+            PLUGIN_NAME, "flight_speed", 200
+        )
+        # the highest terrain across the swath is used if a corridor was sampled
+        terrain_y = self.corridor_max if self.corridor_max is not None else self.data_y
+        altitudes = minimum_altitude_profile(
+            self.data_x,
+            terrain_y,
+            dialog.clearance_spinbox.value(),
+            self.max_climb_rate_spinbox.value() / 3.28,
+            dialog.descent_rate_spinbox.value() / 3.28,
+            flight_speed_kmh,
+        )
+        self.altitude_line.setData(self.data_x, altitudes, connect="finite")
+
+        waypoint_altitudes = np.interp(self.wp_data_x, self.data_x, altitudes)
+        self.write_waypoint_altitudes(waypoint_altitudes)
+
+    def write_waypoint_altitudes(self, waypoint_altitudes: np.ndarray):
+        """Writes the altitudes to the altitude field of the waypoint layer"""
+        layer = self.waypoint_layer
+        if layer is None or len(waypoint_altitudes) != len(self.waypoint_feature_ids):
+            return
+
+        if layer.fields().indexFromName(QGIS_FIELD_NAME_ALTITUDE) == -1:
+            added = self.layer_utils.add_field_to_layer(
+                layer,
+                QGIS_FIELD_NAME_ALTITUDE,
+                QVariant.Double,
+                None,
+                message="The minimum altitudes (MSL) in m are stored in this field.",
+            )
+            if not added:
+                return
 
-            rubber_band.setToGeometry(geom, self.layer_crs)
-            self.rubber_bands.append(rubber_band)
+        field_id = layer.fields().indexFromName(QGIS_FIELD_NAME_ALTITUDE)
+        attr_map = {
+            feature_id: {field_id: None if np.isnan(altitude) else round(float(altitude), 1)}
+            for feature_id, altitude in zip(self.waypoint_feature_ids, waypoint_altitudes)
+        }
+        if not layer.dataProvider().changeAttributeValues(attr_map):
+            self.iface.messageBar().pushMessage(
+                f"Couldn't write the waypoint altitudes to layer {layer.name()}",
+                level=Qgis.MessageLevel.Warning,
+                duration=DEFAULT_PUSH_MESSAGE_DURATION,
+            )
+            return
+        layer.triggerRepaint()
+
+    def update_level_of_detail(self):
+        """Draws the level of the decimation pyramid that matches the visible range and the width of the plot"""
+        if self.pyramid is None:
+            return
+        view_box = self.plot_widget.getViewBox()
+        x_min, x_max = view_box.viewRange()[0]
+        max_points = max(int(view_box.width()), MIN_LEVEL_OF_DETAIL_POINTS)
+        view_x, view_y = self.pyramid.view(x_min, x_max, max_points)
+        self.graph.setData(view_x, view_y, connect="finite")
 
     def toggle_line(self):
         """ Show/Hide the vertical line when the button is clicked """
-        for v_line in self.v_lines:
-            v_line.setVisible(not v_line.isVisible())
+        self.waypoint_lines.setVisible(not self.waypoint_lines.isVisible())
 
     def closeWidget(self):
         super().close()
 
     def closeEvent(self, event):
+        self.is_closed = True
+        self.redraw_timer.stop()
+        if self.profile_task is not None:
+            self.profile_task.cancel()
+
         map_canvas = self.iface.mapCanvas()
-        for rubber_band in self.rubber_bands:
-            rubber_band.reset()
-            map_canvas.scene().removeItem(rubber_band)
+        self.rubber_band.reset()
+        map_canvas.scene().removeItem(self.rubber_band)
 
         try:
             self.max_climb_rate_spinbox.editingFinished.disconnect(self.plot_task)
@@ -272,10 +733,15 @@ class PlotDock(QDockWidget):
 
 
 class TopographyModule:
-    def __init__(self, iface: QgisInterface):
+    def __init__(self, iface: QgisInterface, coverage_module: CoverageModule):
         self.iface = iface
+        self.coverage_module = coverage_module
         self.layer_utils = LayerUtils(iface)
-        self.plot_dock_widget = None
+        self.settings = QgsSettings()
+        self.plot_dock_widgets = {}
+        # computed profiles by route geometry, DEM and sampling parameters, so reopening a profile is instant
+        self.profile_cache = ProfileCache()
+        self.cache_invalidation_slots = {}
         self.max_climb_rate_widget = QWidget()
         self.max_climb_rate_spinbox = QSpinBox()
 
@@ -291,113 +757,152 @@ class TopographyModule:
         toolbar.addWidget(self.max_climb_rate_widget)
 
     def tmp(self):
-        self.close()
-
         vector_layer = self.iface.layerTreeView().currentLayer()
         if not vector_layer.isValid():
             print("Error: Could not load vector layer")
             exit()
 
-        dialog = RasterSelectionDialog(self.iface.mainWindow())
+        try:
+            sensor_names = list(self.settings.value(PLUGIN_SENSOR_SETTINGS_PATH, {}).keys())
+        except:
+            sensor_names = []
+        dialog = RasterSelectionDialog(self.iface.mainWindow(), sensor_names)
         result = dialog.exec_()
 
         if result == QDialog.Accepted:
-            raster_layer = dialog.get_selected_layer()
-            if raster_layer is None:
+            raster_layers = dialog.get_selected_layers()
+            raster_folder = dialog.get_raster_folder()
+            if not raster_layers and not raster_folder:
                 print("Error: No raster selected")
                 return
+            interpolation = dialog.get_interpolation()
+            corridor_sensor = dialog.get_corridor_sensor()
         else:
-            self.close()
             return
 
-        vector_layer_crs = vector_layer.crs()
-        raster_path = raster_layer.dataProvider().dataSourceUri().split('|')[0]
-        raster_ds = gdal.Open(raster_path)
-        gdal_raster = gdal.Open(raster_path)
-        band_number = 1
-        band = gdal_raster.GetRasterBand(band_number)
-        gt = raster_ds.GetGeoTransform()
-        transform_to_raster_crs = QgsCoordinateTransform(vector_layer_crs, raster_layer.crs(), QgsProject.instance())
-        distance_area = QgsDistanceArea()
-        distance_area.setEllipsoid('WGS84')
-        distance_area.setSourceCrs(vector_layer_crs, QgsProject.instance().transformContext())
-
-        data_x = []
-        data_y = []
-        wp_data_x = []
-
-        points = []
-
-        features = list(vector_layer.getFeatures())
-
-        sample_interval = 100.0  # every 100 meters
-
-        total_distance = 0
-
-        for i in range(len(features) - 1):
-            current_feature = features[i]
-            next_feature = features[i + 1]
-            current_feature_geom = current_feature.geometry()
-            next_feature_geom = next_feature.geometry()
-            current_point = current_feature_geom.asPoint()
-            next_point = next_feature_geom.asPoint()
-
-            distance = distance_area.measureLine(current_point, next_point)
-            wp_data_x.append(total_distance)
-            total_distance += distance
-
-            line = distance_area.geodesicLine(current_point, next_point, sample_interval)
-            points_every_kilometre = line[0][:-1:10]
-
-            for point in points_every_kilometre:
-                points.append(point)
-
-        wp_data_x.append(total_distance)
-        points.append(features[-1].geometry().asPoint())
-
-        total_distance = 0
-        transformed_points = [transform_to_raster_crs.transform(p) for p in points]
-
-        for i in range(len(transformed_points) - 1):
-            current_point = points[i]
-            next_point = points[i + 1]
-            distance = distance_area.measureLine(current_point, next_point)
-
-            current_point = transformed_points[i]
-            px, py = world_to_pixel(current_point.x(), current_point.y(), gt)
-
-            raster_value = band.ReadAsArray(px, py, 1, 1)[0][0]
-
-            data_x.append(total_distance)
-            data_y.append(raster_value)
+        corridor_half_width = 0.0
+        if corridor_sensor is not None:
+            # the swath of the sensor at the flight altitude of the toolbar
+            corridor_half_width = self.coverage_module.get_sensor_coverage_in_meters(corridor_sensor)
+            if corridor_half_width is None:
+                self.iface.messageBar().pushMessage(
+                    f"Couldn't read sensor options for sensor {corridor_sensor}",
+                    level=Qgis.MessageLevel.Warning,
+                    duration=DEFAULT_PUSH_MESSAGE_DURATION,
+                )
+                return
 
-            total_distance += distance
+        waypoint_features = list(vector_layer.getFeatures())
+        waypoints = [feature.geometry().asPoint() for feature in waypoint_features]
+        if len(waypoints) < 2:
+            self.iface.messageBar().pushMessage(
+                "The topography profile needs at least two waypoints",
+                level=Qgis.MessageLevel.Warning,
+                duration=DEFAULT_PUSH_MESSAGE_DURATION,
+            )
+            return
 
-        current_point = transformed_points[-1]
-        px, py = world_to_pixel(current_point.x(), current_point.y(), gt)
+        raster_paths = [layer.dataProvider().dataSourceUri().split('|')[0] for layer in raster_layers]
+        if raster_folder:
+            raster_paths.extend(raster_paths_in_directory(raster_folder))
+        if not raster_paths:
+            self.iface.messageBar().pushMessage(
+                f"No raster found in {raster_folder}",
+                level=Qgis.MessageLevel.Warning,
+                duration=DEFAULT_PUSH_MESSAGE_DURATION,
+            )
+            return
 
-        raster_value = band.ReadAsArray(px, py, 1, 1)[0][0]
+        # a new profile of the same layer replaces the previous one, profiles of other layers stay open
+        self.close_plot_dock(vector_layer.id())
 
-        data_x.append(total_distance)
-        data_y.append(raster_value)
+        # blocks read for previous profiles are reused, so re-profiling only reads blocks near changed legs
+        BLOCK_CACHE.set_max_bytes(
+            int(self.settings.value(PLUGIN_DEM_CACHE_SIZE_SETTINGS_PATH, DEFAULT_BLOCK_CACHE_SIZE_MB)) * 1024 * 1024
+        )
 
-        self.plot_dock_widget = PlotDock(
+        plot_dock_widget = PlotDock(
             self.iface,
-            data_x,
-            data_y,
-            wp_data_x,
             self.max_climb_rate_spinbox,
-            points,
-            vector_layer.crs()
+            WGS84_CRS,  # the profile points are computed in WGS84
+            f"Topography - {vector_layer.name()}",
+            vector_layer,
+            [feature.id() for feature in waypoint_features]
+        )
+        self.plot_dock_widgets[vector_layer.id()] = plot_dock_widget
+
+        cache_key = ProfileCache.make_key(
+            vector_layer.id(),
+            vector_layer.crs().authid(),
+            np.array([(p.x(), p.y()) for p in waypoints]),
+            "|".join(sorted(set(raster_paths))),
+            PROFILE_SAMPLE_INTERVAL,
+            interpolation,
+            corridor_half_width,
+        )
+        cached_profile = self.profile_cache.get(cache_key)
+        if cached_profile is not None:
+            plot_dock_widget.show_profile(cached_profile)
+            return
+
+        self.connect_cache_invalidation(vector_layer)
+        task = TopographyProfileTask(
+            waypoints,
+            vector_layer.crs(),
+            raster_paths,
+            interpolation,
+            QgsProject.instance().transformContext(),
+            corridor_half_width,
         )
-        self.plot_dock_widget.plot_task()
 
-    def close(self):
-        if self.plot_dock_widget is not None:
-            self.plot_dock_widget.closeWidget()
+        task.taskCompleted.connect(
+            lambda: self.profile_cache.put(cache_key, plot_dock_widget.profile_result())
+        )
+        plot_dock_widget.compute_profile(task)
 
+    def connect_cache_invalidation(self, vector_layer):
+        """Drops the cached profiles of the layer as soon as its waypoints change"""
+        if vector_layer.id() in self.cache_invalidation_slots:
+            return
+        slot = partial(self.invalidate_cached_profiles, vector_layer.id())
+        vector_layer.geometryChanged.connect(slot)
+        vector_layer.featureAdded.connect(slot)
+        vector_layer.featureDeleted.connect(slot)
+        vector_layer.crsChanged.connect(slot)
+        vector_layer.willBeDeleted.connect(slot)
+        self.cache_invalidation_slots[vector_layer.id()] = (vector_layer, slot)
+
+    def invalidate_cached_profiles(self, layer_id: str, *args):
+        self.profile_cache.invalidate_layer(layer_id)
+        vector_layer, slot = self.cache_invalidation_slots.pop(layer_id, (None, None))
+        if vector_layer is not None:
+            self.disconnect_cache_invalidation(vector_layer, slot)
+
+    @staticmethod
+    def disconnect_cache_invalidation(vector_layer, slot):
+        for signal in (
+                vector_layer.geometryChanged,
+                vector_layer.featureAdded,
+                vector_layer.featureDeleted,
+                vector_layer.crsChanged,
+                vector_layer.willBeDeleted,
+        ):
+            try:
+                signal.disconnect(slot)
+            except (TypeError, RuntimeError):
+                pass
+
+    def close_plot_dock(self, layer_id: str):
+        """Closes the topography profile of the given layer"""
+        plot_dock_widget = self.plot_dock_widgets.pop(layer_id, None)
+        if plot_dock_widget is not None:
+            plot_dock_widget.closeWidget()
+
+    def close(self):
+        for layer_id in list(self.plot_dock_widgets):
+            self.close_plot_dock(layer_id)
+        for vector_layer, slot in self.cache_invalidation_slots.values():
+            self.disconnect_cache_invalidation(vector_layer, slot)
+        self.cache_invalidation_slots.clear()
+        self.profile_cache.clear()
 
-def world_to_pixel(x, y, gt):
-    px = int((x - gt[0]) / gt[1])
-    py = int((y - gt[3]) / gt[5])  # Negative y resolution
-    return px, py
@@ -0,0 +1,237 @@
+"""Qt-free computation of topography profiles, used by the topography dock and the command line interface.
+
+Usage:
+    python -m ScienceFlightPlanner.topography_profile DEM_PATH_OR_DIRECTORY WAYPOINT_DIRECTORY OUTPUT_DIRECTORY
+        [--interval METERS] [--interpolation {Nearest,Bilinear}] [--corridor-half-width METERS] [--format {csv,npz}]
+"""
+import argparse
+import glob
+import os
+import sys
+from typing import Iterator, List, NamedTuple, Tuple, Union
+
+import numpy as np
+
+from osgeo import ogr, osr
+
+from . import geodesic
+from .profile_analysis import corridor_offsets, corridor_statistics
+from .raster_sampling import (
+    CoordinateTransform,
+    INTERPOLATION_METHODS,
+    MosaicSampler,
+    NEAREST_INTERPOLATION,
+    raster_paths_in_directory
+)
+
+PROFILE_SAMPLE_INTERVAL = 1000.0  # one profile point per kilometre
+CORRIDOR_PERCENTILE = 90
+
+PROFILE_FORMATS = ["csv", "npz"]
+
+
+class ProfileLeg(NamedTuple):
+    distances: np.ndarray  # distance of every sample from the first waypoint in m
+    heights: np.ndarray
+    lons: np.ndarray
+    lats: np.ndarray
+    corridor_max: Union[np.ndarray, None]
+    corridor_percentile: Union[np.ndarray, None]
+
+
+class Profile(NamedTuple):
+    distances: np.ndarray
+    heights: np.ndarray
+    lons: np.ndarray
+    lats: np.ndarray
+    waypoint_distances: np.ndarray
+    corridor_max: Union[np.ndarray, None]
+    corridor_percentile: Union[np.ndarray, None]
+
+
+def _spatial_reference(crs: str) -> osr.SpatialReference:
+    """Returns the spatial reference for a CRS given as WKT, PROJ string or authority identifier (e.g. EPSG:4326)
+    with longitude/easting as first axis"""
+    spatial_reference = osr.SpatialReference()
+    if spatial_reference.SetFromUserInput(crs) != 0:
+        raise ValueError(f"Unknown CRS {crs}")
+    spatial_reference.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+    return spatial_reference
+
+
+def coordinate_transform(source_crs: str, destination_crs: str) -> CoordinateTransform:
+    """Returns a function that transforms coordinate arrays between the given CRS"""
+    source = _spatial_reference(source_crs)
+    destination = _spatial_reference(destination_crs)
+    if source.IsSame(destination):
+        return lambda x, y: (np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+
+    transformation = osr.CoordinateTransformation(source, destination)
+
+    def transform(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if x.size == 0:
+            return x, y
+        transformed = np.array(transformation.TransformPoints(np.column_stack((x, y)).tolist()))
+        return transformed[:, 0].reshape(x.shape), transformed[:, 1].reshape(y.shape)
+
+    return transform
+
+
+def dem_paths(dem_path: Union[str, List[str]]) -> List[str]:
+    """Returns the raster paths of a DEM given as file, directory of tiles or list of files"""
+    if isinstance(dem_path, str):
+        return raster_paths_in_directory(dem_path) if os.path.isdir(dem_path) else [dem_path]
+    return list(dem_path)
+
+
+def profile_legs(
+        lons: np.ndarray,
+        lats: np.ndarray,
+        dem_sampler: MosaicSampler,
+        interval: float = PROFILE_SAMPLE_INTERVAL,
+        interpolation: str = NEAREST_INTERPOLATION,
+        corridor_half_width: float = 0.0,
+) -> Iterator[ProfileLeg]:
+    """Yields the profile of a route given by WGS84 waypoints leg by leg. Every leg is densified along the geodesic
+    every interval meters and sampled from the DEM mosaic. With a corridor half width, the maximum and a
+    percentile of the terrain across the swath are computed as well."""
+    line = geodesic.densify(lons, lats, interval)
+    if corridor_half_width > 0:
+        along_offsets, cross_offsets = corridor_offsets(
+            corridor_half_width, interval, dem_sampler.resolution_in_meters()
+        )
+
+    number_of_legs = len(lons) - 1
+    leg_boundaries = np.searchsorted(line.leg_indices, np.arange(number_of_legs + 1))
+    for i in range(number_of_legs):
+        leg = slice(leg_boundaries[i], leg_boundaries[i + 1])
+        heights = dem_sampler.sample(line.lons[leg], line.lats[leg], interpolation)
+
+        corridor_max = corridor_percentile = None
+        if corridor_half_width > 0:
+            # all windows of the leg are sampled at once and reduced row by row
+            grid_lons, grid_lats = geodesic.offset_grid(
+                line.lons[leg], line.lats[leg], line.azimuths[leg], along_offsets, cross_offsets
+            )
+            window_values = dem_sampler.sample(grid_lons, grid_lats, interpolation)
+            corridor_max, corridor_percentile = corridor_statistics(window_values, CORRIDOR_PERCENTILE)
+
+        yield ProfileLeg(
+            line.distances[leg], heights, line.lons[leg], line.lats[leg], corridor_max, corridor_percentile
+        )
+
+
+def compute_profile(
+        points: np.ndarray,
+        crs: str,
+        dem_path: Union[str, List[str]],
+        interval: float = PROFILE_SAMPLE_INTERVAL,
+        interpolation: str = NEAREST_INTERPOLATION,
+        corridor_half_width: float = 0.0,
+) -> Profile:
+    """Returns the topography profile of the route through the given waypoints ((n, 2) array of x/y in the given
+    CRS) sampled every interval meters from the DEM, which may be a raster file, a directory of tiles or a list of
+    raster files"""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(points) < 2:
+        raise ValueError("The topography profile needs at least two waypoints")
+
+    dem_sampler = MosaicSampler(
+        dem_paths(dem_path), lambda raster_crs: coordinate_transform("EPSG:4326", raster_crs)
+    )
+    lons, lats = coordinate_transform(crs, "EPSG:4326")(points[:, 0], points[:, 1])
+
+    legs = list(profile_legs(lons, lats, dem_sampler, interval, interpolation, corridor_half_width))
+
+    def concatenate(values: List[Union[np.ndarray, None]]) -> Union[np.ndarray, None]:
+        return None if values[0] is None else np.concatenate(values)
+
+    return Profile(
+        np.concatenate([leg.distances for leg in legs]),
+        np.concatenate([leg.heights for leg in legs]),
+        np.concatenate([leg.lons for leg in legs]),
+        np.concatenate([leg.lats for leg in legs]),
+        geodesic.legs(lons, lats).cumulative,
+        concatenate([leg.corridor_max for leg in legs]),
+        concatenate([leg.corridor_percentile for leg in legs]),
+    )
+
+
+def read_waypoints(shapefile_path: str) -> Tuple[np.ndarray, str]:
+    """Returns the waypoints of a point shapefile in feature order together with the CRS of the layer as WKT"""
+    data_source = ogr.Open(shapefile_path)
+    if data_source is None:
+        raise IOError(f"Could not open {shapefile_path}")
+    layer = data_source.GetLayer()
+    spatial_reference = layer.GetSpatialRef()
+    if spatial_reference is None:
+        raise ValueError(f"{shapefile_path} has no CRS")
+
+    points = []
+    for feature in layer:
+        geometry = feature.GetGeometryRef()
+        if geometry is not None:
+            points.append((geometry.GetX(), geometry.GetY()))
+    return np.array(points, dtype=np.float64).reshape(-1, 2), spatial_reference.ExportToWkt()
+
+
+def write_profile(profile: Profile, output_path: str, profile_format: str):
+    """Writes the profile as CSV (one row per sample) or as NPZ archive of all arrays"""
+    columns = {
+        "distance": profile.distances,
+        "height": profile.heights,
+        "lon": profile.lons,
+        "lat": profile.lats,
+    }
+    if profile.corridor_max is not None:
+        columns["corridor_max"] = profile.corridor_max
+        columns[f"corridor_p{CORRIDOR_PERCENTILE}"] = profile.corridor_percentile
+
+    if profile_format == "npz":
+        np.savez_compressed(output_path, waypoint_distances=profile.waypoint_distances, **columns)
+    else:
+        np.savetxt(
+            output_path,
+            np.column_stack(list(columns.values())),
+            delimiter=",",
+            header=",".join(columns),
+            comments="",
+            fmt="%.8g",
+        )
+
+
+def main(argv: Union[List[str], None] = None) -> int:
+    parser = argparse.ArgumentParser(description="Computes topography profiles of all waypoint shapefiles in a directory")
+    parser.add_argument("dem_path", help="DEM raster or directory of DEM tiles")
+    parser.add_argument("waypoint_directory", help="directory of point shapefiles")
+    parser.add_argument("output_directory", help="directory for the profiles")
+    parser.add_argument("--interval", type=float, default=PROFILE_SAMPLE_INTERVAL, help="sample interval in m")
+    parser.add_argument("--interpolation", choices=INTERPOLATION_METHODS, default=NEAREST_INTERPOLATION)
+    parser.add_argument("--corridor-half-width", type=float, default=0.0, help="half swath width in m")
+    parser.add_argument("--format", choices=PROFILE_FORMATS, default=PROFILE_FORMATS[0])
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_directory, exist_ok=True)
+    failed = 0
+    for shapefile_path in sorted(glob.glob(os.path.join(args.waypoint_directory, "*.shp"))):
+        name = os.path.splitext(os.path.basename(shapefile_path))[0]
+        try:
+            points, crs = read_waypoints(shapefile_path)
+            profile = compute_profile(
+                points, crs, args.dem_path, args.interval, args.interpolation, args.corridor_half_width
+            )
+        except Exception as e:
+            print(f"{name}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+
+        output_path = os.path.join(args.output_directory, f"{name}.{args.format}")
+        write_profile(profile, output_path, args.format)
+        print(f"{name}: {len(profile.distances)} samples, {profile.waypoint_distances[-1] / 1000:.1f} km")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
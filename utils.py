@@ -1,7 +1,10 @@
 import os
 import subprocess
 import sys
-from typing import List, Tuple, Union, cast
+import threading
+from typing import Dict, List, Tuple, Union, cast
+
+import numpy as np
 
 from qgis.core import (
     Qgis,
@@ -14,6 +17,7 @@ from qgis.core import (
     QgsField,
     QgsFields,
     QgsGeometry,
+    QgsLineString,
     QgsMapLayer,
     QgsPointXY,
     QgsProject,
@@ -227,12 +231,7 @@ class LayerUtils:
 
         # transform waypoints in correct coordinate reference system
         destination_crs = QgsCoordinateReferenceSystem("EPSG:4326")
-        crs_translator = QgsCoordinateTransform(
-            source_crs, destination_crs, QgsProject.instance()
-        )
-
-        for index in range(len(waypoints)):
-            waypoints[index] = crs_translator.transform(waypoints[index])
+        waypoints[:] = transform_points(waypoints, source_crs, destination_crs)
 
         fields = QgsFields()
         id_field = QgsField(QGIS_FIELD_NAME_ID, QVariant.Int)
@@ -433,6 +432,117 @@ def show_checkable_info_message_box(
     return show_info
 
 
+class CoordinateTransformService:
+    """Plugin-wide cache of coordinate transforms per pair of CRS and transform context. Transforms are created once
+    and handed out as (implicitly shared) copies, so the service can be used from the main thread and from tasks."""
+
+    def __init__(self) -> None:
+        self.transforms: Dict[Tuple, QgsCoordinateTransform] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _crs_key(crs: QgsCoordinateReferenceSystem) -> str:
+        return crs.authid() or crs.toWkt()
+
+    @staticmethod
+    def _context_key(context: QgsCoordinateTransformContext) -> Tuple:
+        return tuple(sorted((str(crs_pair), operation) for crs_pair, operation in context.coordinateOperations().items()))
+
+    def get_transform(
+            self,
+            source_crs: QgsCoordinateReferenceSystem,
+            destination_crs: QgsCoordinateReferenceSystem,
+            context: Union[QgsCoordinateTransformContext, None] = None,
+    ) -> QgsCoordinateTransform:
+        """Returns the transform between the given CRS, by default within the transform context of the project"""
+        if context is None:
+            context = QgsProject.instance().transformContext()
+        key = (self._crs_key(source_crs), self._crs_key(destination_crs), self._context_key(context))
+        with self.lock:
+            transform = self.transforms.get(key)
+            if transform is None:
+                transform = QgsCoordinateTransform(source_crs, destination_crs, context)
+                self.transforms[key] = transform
+            return QgsCoordinateTransform(transform)
+
+    def transform_coordinates(
+            self,
+            x: np.ndarray,
+            y: np.ndarray,
+            source_crs: QgsCoordinateReferenceSystem,
+            destination_crs: QgsCoordinateReferenceSystem,
+            context: Union[QgsCoordinateTransformContext, None] = None,
+            direction: Qgis.TransformDirection = Qgis.TransformDirection.Forward,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Transforms whole coordinate arrays at once. The coordinates are passed to QGIS as one line string, so the
+        projection runs in a single call instead of once per point."""
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if x.size == 0 or source_crs == destination_crs:
+            return x.copy(), y.copy()
+
+        transform = self.get_transform(source_crs, destination_crs, context)
+        line = QgsLineString(x.ravel().tolist(), y.ravel().tolist())
+        line.transform(transform, direction)
+        if hasattr(line, "xVector"):
+            transformed_x = np.array(line.xVector(), dtype=np.float64)
+            transformed_y = np.array(line.yVector(), dtype=np.float64)
+        else:
+            transformed_x = np.array([line.xAt(i) for i in range(line.numPoints())], dtype=np.float64)
+            transformed_y = np.array([line.yAt(i) for i in range(line.numPoints())], dtype=np.float64)
+        return transformed_x.reshape(x.shape), transformed_y.reshape(y.shape)
+
+    def transform_points(
+            self,
+            points: List[QgsPointXY],
+            source_crs: QgsCoordinateReferenceSystem,
+            destination_crs: QgsCoordinateReferenceSystem,
+            context: Union[QgsCoordinateTransformContext, None] = None,
+    ) -> List[QgsPointXY]:
+        """Transforms a list of points at once"""
+        x, y = self.transform_coordinates(
+            [point.x() for point in points], [point.y() for point in points], source_crs, destination_crs, context
+        )
+        return [QgsPointXY(point_x, point_y) for point_x, point_y in zip(x.tolist(), y.tolist())]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.transforms.clear()
+
+
+TRANSFORM_SERVICE = CoordinateTransformService()
+
+
+def get_transform(
+        source_crs: QgsCoordinateReferenceSystem,
+        destination_crs: QgsCoordinateReferenceSystem,
+        context: Union[QgsCoordinateTransformContext, None] = None,
+) -> QgsCoordinateTransform:
+    """Returns the cached transform between the given CRS of the plugin-wide transform service"""
+    return TRANSFORM_SERVICE.get_transform(source_crs, destination_crs, context)
+
+
+def transform_coordinates(
+        x: np.ndarray,
+        y: np.ndarray,
+        source_crs: QgsCoordinateReferenceSystem,
+        destination_crs: QgsCoordinateReferenceSystem,
+        context: Union[QgsCoordinateTransformContext, None] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Transforms coordinate arrays with the plugin-wide transform service"""
+    return TRANSFORM_SERVICE.transform_coordinates(x, y, source_crs, destination_crs, context)
+
+
+def transform_points(
+        points: List[QgsPointXY],
+        source_crs: QgsCoordinateReferenceSystem,
+        destination_crs: QgsCoordinateReferenceSystem,
+        context: Union[QgsCoordinateTransformContext, None] = None,
+) -> List[QgsPointXY]:
+    """Transforms a list of points with the plugin-wide transform service"""
+    return TRANSFORM_SERVICE.transform_points(points, source_crs, destination_crs, context)
+
+
 """Methods for automatic external library installation"""
 
 